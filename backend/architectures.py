@@ -3,10 +3,27 @@ PyTorch Model Architectures for the 4th Down Bot
 Multi-output 4th Down Engine and Deep Win Probability Calculator.
 """
 
+import os
+
 import torch
 import torch.nn as nn
 import torch.nn.functional as F
 
+def mlp_layers(input_dim, hidden_dims, dropouts):
+    """
+    Linear -> BatchNorm -> ReLU (-> Dropout when rate > 0) per hidden layer.
+    Layer order matches the original hand-written stacks, so saved
+    state_dicts keep their keys.
+    """
+    layers = []
+    prev = input_dim
+    for width, rate in zip(hidden_dims, dropouts):
+        layers += [nn.Linear(prev, width), nn.BatchNorm1d(width), nn.ReLU()]
+        if rate > 0:
+            layers.append(nn.Dropout(rate))
+        prev = width
+    return layers
+
 class FourthDownDecisionModel(nn.Module):
     """
     Multi-output regression/classification model.
@@ -15,24 +32,16 @@ class FourthDownDecisionModel(nn.Module):
     - fg_success_prob (sigmoid)
     - expected_epa (linear)
     """
-    def __init__(self, input_dim):
+    def __init__(self, input_dim, hidden_dims=(64, 32), dropouts=(0.2, 0.0)):
         super(FourthDownDecisionModel, self).__init__()
         
         # Shared Layers
-        self.shared = nn.Sequential(
-            nn.Linear(input_dim, 64),
-            nn.BatchNorm1d(64),
-            nn.ReLU(),
-            nn.Dropout(0.2),
-            nn.Linear(64, 32),
-            nn.BatchNorm1d(32),
-            nn.ReLU()
-        )
+        self.shared = nn.Sequential(*mlp_layers(input_dim, hidden_dims, dropouts))
         
         # Output Heads
-        self.conversion_head = nn.Linear(32, 1)
-        self.fg_head = nn.Linear(32, 1)
-        self.epa_head = nn.Linear(32, 1)
+        self.conversion_head = nn.Linear(hidden_dims[-1], 1)
+        self.fg_head = nn.Linear(hidden_dims[-1], 1)
+        self.epa_head = nn.Linear(hidden_dims[-1], 1)
 
     def forward(self, x):
         features = self.shared(x)
@@ -47,55 +56,35 @@ class WinProbabilityModel(nn.Module):
     """
     Deep 5-layer classification network for real-time Win Probability.
     """
-    def __init__(self, input_dim):
+    def __init__(self, input_dim, hidden_dims=(128, 64, 32, 16), dropouts=(0.3, 0.2, 0.1, 0.0)):
         super(WinProbabilityModel, self).__init__()
         
         self.net = nn.Sequential(
-            nn.Linear(input_dim, 128),
-            nn.BatchNorm1d(128),
-            nn.ReLU(),
-            nn.Dropout(0.3),
-            
-            nn.Linear(128, 64),
-            nn.BatchNorm1d(64),
-            nn.ReLU(),
-            nn.Dropout(0.2),
-            
-            nn.Linear(64, 32),
-            nn.BatchNorm1d(32),
-            nn.ReLU(),
-            nn.Dropout(0.1),
-            
-            nn.Linear(32, 16),
-            nn.BatchNorm1d(16),
-            nn.ReLU(),
-            
-            nn.Linear(16, 1)
+            *mlp_layers(input_dim, hidden_dims, dropouts),
+            nn.Linear(hidden_dims[-1], 1)
         )
 
     def forward(self, x):
         return torch.sigmoid(self.net(x))
 
+class WinProbabilityStudent(WinProbabilityModel):
+    """
+    Distilled Win Probability model (see distill.py): two narrow layers
+    trained on the deep network's soft outputs.
+    """
+    def __init__(self, input_dim, hidden_dims=(16, 8), dropouts=(0.0, 0.0)):
+        super(WinProbabilityStudent, self).__init__(input_dim, hidden_dims, dropouts)
+
 class OffensivePlayCallerModel(nn.Module):
     """
     Multi-class classification for Offensive Play Calling.
     Predicts: Pass, Run, Play Action, Screen, Draw (5 classes)
     """
-    def __init__(self, input_dim, num_classes=5):
+    def __init__(self, input_dim, num_classes=5, hidden_dims=(128, 64, 32), dropouts=(0.3, 0.2, 0.0)):
         super(OffensivePlayCallerModel, self).__init__()
         self.net = nn.Sequential(
-            nn.Linear(input_dim, 128),
-            nn.BatchNorm1d(128),
-            nn.ReLU(),
-            nn.Dropout(0.3),
-            nn.Linear(128, 64),
-            nn.BatchNorm1d(64),
-            nn.ReLU(),
-            nn.Dropout(0.2),
-            nn.Linear(64, 32),
-            nn.BatchNorm1d(32),
-            nn.ReLU(),
-            nn.Linear(32, num_classes)
+            *mlp_layers(input_dim, hidden_dims, dropouts),
+            nn.Linear(hidden_dims[-1], num_classes)
         )
 
     def forward(self, x):
@@ -106,21 +95,11 @@ class DefensiveCoordinatorModel(nn.Module):
     Binary classification for Defensive Prediction.
     Predicts: Pass (1) or Run (0)
     """
-    def __init__(self, input_dim):
+    def __init__(self, input_dim, hidden_dims=(96, 48, 24), dropouts=(0.25, 0.15, 0.0)):
         super(DefensiveCoordinatorModel, self).__init__()
         self.net = nn.Sequential(
-            nn.Linear(input_dim, 96),
-            nn.BatchNorm1d(96),
-            nn.ReLU(),
-            nn.Dropout(0.25),
-            nn.Linear(96, 48),
-            nn.BatchNorm1d(48),
-            nn.ReLU(),
-            nn.Dropout(0.15),
-            nn.Linear(48, 24),
-            nn.BatchNorm1d(24),
-            nn.ReLU(),
-            nn.Linear(24, 1)
+            *mlp_layers(input_dim, hidden_dims, dropouts),
+            nn.Linear(hidden_dims[-1], 1)
         )
 
     def forward(self, x):
@@ -131,30 +110,61 @@ class PersonnelOptimizerModel(nn.Module):
     Multi-class classification for Personnel Grouping.
     Predicts: 11, 12, 21, 13, 22, etc. (mapped to indices)
     """
-    def __init__(self, input_dim, num_classes):
+    def __init__(self, input_dim, num_classes, hidden_dims=(96, 48, 24), dropouts=(0.25, 0.15, 0.0)):
         super(PersonnelOptimizerModel, self).__init__()
         self.net = nn.Sequential(
-            nn.Linear(input_dim, 96),
-            nn.BatchNorm1d(96),
-            nn.ReLU(),
-            nn.Dropout(0.25),
-            nn.Linear(96, 48),
-            nn.BatchNorm1d(48),
-            nn.ReLU(),
-            nn.Dropout(0.15),
-            nn.Linear(48, 24),
-            nn.BatchNorm1d(24),
-            nn.ReLU(),
-            nn.Linear(24, num_classes)
+            *mlp_layers(input_dim, hidden_dims, dropouts),
+            nn.Linear(hidden_dims[-1], num_classes)
         )
 
     def forward(self, x):
         return self.net(x) # Returns logits
 
+class SituationalMultiTaskModel(nn.Module):
+    """
+    Shared-trunk replacement for the offensive, defensive and personnel nets.
+    One forward pass over the offensive feature set yields:
+    - play-call logits
+    - pass probability (sigmoid)
+    - personnel logits
+    """
+    def __init__(self, input_dim, num_play_calls, num_personnel,
+                 hidden_dims=(128, 64), dropouts=(0.3, 0.2), head_dim=32):
+        super(SituationalMultiTaskModel, self).__init__()
+        
+        # Shared Trunk
+        self.trunk = nn.Sequential(*mlp_layers(input_dim, hidden_dims, dropouts))
+        
+        # Task Heads
+        def head(out_dim):
+            return nn.Sequential(nn.Linear(hidden_dims[-1], head_dim), nn.ReLU(), nn.Linear(head_dim, out_dim))
+        self.play_call_head = head(num_play_calls)
+        self.pass_head = head(1)
+        self.personnel_head = head(num_personnel)
+
+    def forward(self, x):
+        features = self.trunk(x)
+        
+        play_logits = self.play_call_head(features)
+        pass_prob = torch.sigmoid(self.pass_head(features))
+        personnel_logits = self.personnel_head(features)
+        
+        return play_logits, pass_prob, personnel_logits
+
 def save_model(model, path):
-    torch.save(model.state_dict(), path)
+    # Write then rename so a reader (e.g. the API) never sees a partial file
+    tmp_path = f"{path}.tmp"
+    torch.save(model.state_dict(), tmp_path)
+    os.replace(tmp_path, path)
     print(f"Model saved to {path}")
 
+def quantize_int8(model):
+    """
+    Post-training dynamic quantization: int8 Linear weights, fp32 activations.
+    Returns an eval-mode copy; BatchNorm layers stay fp32.
+    """
+    return torch.ao.quantization.quantize_dynamic(model.eval(), {nn.Linear}, dtype=torch.qint8)
+
 def load_model(model, path):
     model.load_state_dict(torch.load(path))
     model.eval()
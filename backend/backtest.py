@@ -0,0 +1,231 @@
+"""
+Vectorized Historical Backtest
+Scores every historical play with every trained model in large no-grad
+batches and reports accuracy, log-loss, Brier score and calibration curves
+overall and by season, week and team. Replaces the row-at-a-time
+resources/nfl/backend/validate_historical.py (10 plays, batch-of-1 forwards).
+
+Results are written as partitioned parquet under data/backtest/:
+    metrics/model=<key>/level=<overall|season|week|team>/
+    calibration/model=<key>/level=<...>/
+    predictions/model=<key>/season=<year>/      (--predictions)
+
+Usage:
+    python backtest.py
+    python backtest.py --models win_prob,offensive --predictions
+"""
+
+import argparse
+import shutil
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+import torch
+
+from data_loader import NFLDataLoader
+from feature_engineering import NFLFeatureEngineer
+from model_registry import MODEL_DIR, DATA_DIR, OUTPUT_HEADS, load_artifact_set, head_outputs
+from streaming import PBP_COLUMNS
+from train import build_feature_set
+
+OUT_DIR = DATA_DIR / "backtest"
+BACKTEST_COLUMNS = PBP_COLUMNS + ['season', 'week']
+PREDICT_BATCH = 65536
+CALIBRATION_BINS = 10
+EPS = 1e-7
+
+# Grouping keys per reporting level
+LEVELS = {
+    'overall': [],
+    'season': ['season'],
+    'week': ['season', 'week'],
+    'team': ['season', 'team'],
+}
+
+def load_pbp(years):
+    """Cached pbp projected to the columns the feature builders read (downloads on first use)"""
+    loader = NFLDataLoader()
+    path = loader.pbp_cache_file(years)
+    if not path.exists():
+        return loader.load_play_by_play(years)
+    available = pq.ParquetFile(path).schema_arrow.names
+    return pd.read_parquet(path, columns=[c for c in BACKTEST_COLUMNS if c in available])
+
+def predict(key, model, X):
+    """head_outputs() for a scaled float32 matrix, concatenated over large batches"""
+    chunks = []
+    with torch.no_grad():
+        for start in range(0, len(X), PREDICT_BATCH):
+            chunks.append(head_outputs(key, model(torch.from_numpy(X[start:start + PREDICT_BATCH]))))
+    return [(head, kind, np.concatenate([c[i][2] for c in chunks]))
+            for i, (head, kind) in enumerate(OUTPUT_HEADS[key])]
+
+def class_index(labels, encoder):
+    """Labels -> encoder class indices; labels the encoder never saw become -1"""
+    return pd.Categorical(labels, categories=encoder.classes_).codes.astype(np.int64)
+
+def head_targets(key, y, encoders):
+    """Ground truth per head, aligned with OUTPUT_HEADS[key]"""
+    if key == 'fourth_down':
+        return {'conversion': y['converted'].values, 'field_goal': y['fg_made'].values,
+                'epa': np.clip(y['epa'].values, -5, 5)}
+    if key == 'win_prob':
+        return {'win': y.values}
+    if key == 'offensive':
+        return {'play_call': class_index(y, encoders['offensive'])}
+    if key == 'defensive':
+        return {'pass': y.values}
+    if key == 'personnel':
+        return {'personnel': class_index(y, encoders['personnel'])}
+    sit = encoders['situational']
+    return {'play_call': class_index(y['play_category'], sit['play_call']),
+            'pass': y['is_pass'].values,
+            'personnel': class_index(y['personnel_group'], sit['personnel'])}
+
+def row_scores(kind, pred, truth):
+    """
+    Per-play score columns. prob: threshold at 0.5; logits: argmax with the
+    top-class probability as confidence; value: absolute/squared error.
+    Returns (valid mask, {column: array}).
+    """
+    if kind == 'value':
+        valid = ~np.isnan(truth)
+        err = pred.ravel() - truth
+        return valid, {'prediction': pred.ravel(), 'abs_err': np.abs(err), 'sq_err': err ** 2}
+    if kind == 'prob':
+        p = np.clip(pred.ravel(), EPS, 1 - EPS)
+        t = truth.astype(np.float64)
+        return ~np.isnan(t), {
+            'prediction': p, 'confidence': p, 'outcome': t,
+            'correct': ((p >= 0.5) == (t == 1)).astype(np.float64),
+            'log_loss': -(t * np.log(p) + (1 - t) * np.log(1 - p)),
+            'brier': (p - t) ** 2,
+        }
+    valid = truth >= 0
+    t = np.where(valid, truth, 0)
+    rows = np.arange(len(t))
+    onehot = np.zeros_like(pred)
+    onehot[rows, t] = 1.0
+    top = pred.argmax(axis=1)
+    correct = (top == t).astype(np.float64)
+    return valid, {
+        'prediction': top, 'confidence': pred[rows, top], 'outcome': correct, 'correct': correct,
+        'log_loss': -np.log(np.clip(pred[rows, t], EPS, 1.0)),
+        'brier': ((pred - onehot) ** 2).sum(axis=1),
+    }
+
+def aggregate(scores, keys):
+    """Mean metrics per group (one vectorized groupby)"""
+    metric_cols = [c for c in ('correct', 'log_loss', 'brier', 'abs_err', 'sq_err') if c in scores]
+    grouped = scores.groupby(keys, sort=True) if keys else scores.assign(_all=0).groupby('_all')
+    out = grouped[metric_cols].mean()
+    out.insert(0, 'n', grouped.size())
+    out = out.rename(columns={'correct': 'accuracy', 'abs_err': 'mae', 'sq_err': 'mse'})
+    if 'mse' in out:
+        out['rmse'] = np.sqrt(out.pop('mse'))
+    return out.reset_index(drop=not keys)
+
+def calibration(scores, keys, bins=CALIBRATION_BINS):
+    """Reliability curve per group: mean confidence vs observed rate in each confidence bin"""
+    binned = scores.assign(bin=np.clip((scores['confidence'] * bins).astype(int), 0, bins - 1))
+    curve = binned.groupby(keys + ['bin'], sort=True).agg(
+        n=('outcome', 'size'), predicted=('confidence', 'mean'), observed=('outcome', 'mean')).reset_index()
+    curve['bin_low'] = curve['bin'] / bins
+    return curve
+
+def backtest_model(key, model, extractor, X, y, meta, encoders):
+    """Score every play for one model; returns (metrics, calibration, predictions) frames"""
+    scaled = extractor.scale_inplace(X.to_numpy(dtype=np.float32, copy=True))
+    targets = head_targets(key, y, encoders)
+    metrics, curves, predictions = [], [], []
+    for head, kind, pred in predict(key, model, scaled):
+        valid, cols = row_scores(kind, pred, targets[head])
+        scores = meta.assign(**cols)[valid]
+        for level, keys in LEVELS.items():
+            m = aggregate(scores, keys).assign(head=head, level=level)
+            metrics.append(m)
+            if kind != 'value':
+                curves.append(calibration(scores, keys).assign(head=head, level=level))
+        predictions.append(scores[['game_id', 'season', 'week', 'team', 'prediction']
+                                  + (['confidence'] if 'confidence' in scores else [])].assign(head=head))
+    return (pd.concat(metrics, ignore_index=True),
+            pd.concat(curves, ignore_index=True) if curves else None,
+            pd.concat(predictions, ignore_index=True))
+
+def write_partitioned(frames, root, partition_cols):
+    """Replace root with a hive-partitioned parquet dataset"""
+    frames = [f for f in frames if f is not None and len(f)]
+    if not frames:
+        return
+    if root.exists():
+        shutil.rmtree(root)
+    table = pa.Table.from_pandas(pd.concat(frames, ignore_index=True), preserve_index=False)
+    pq.write_to_dataset(table, root, partition_cols=partition_cols)
+
+def print_summary(metrics):
+    for (model, head), rows in metrics[metrics['level'].isin(['overall', 'season'])].groupby(['model', 'head'], sort=False):
+        print(f"\n📊 {model}.{head}")
+        for _, r in rows.iterrows():
+            label = 'all' if r['level'] == 'overall' else int(r['season'])
+            if pd.notna(r.get('accuracy')):
+                print(f"  {label:>5} | n {int(r['n']):>8,} | acc {r['accuracy']:.3f} | "
+                      f"log-loss {r['log_loss']:.4f} | brier {r['brier']:.4f}")
+            else:
+                print(f"  {label:>5} | n {int(r['n']):>8,} | mae {r['mae']:.3f} | rmse {r['rmse']:.3f}")
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--models", default=None, help="Comma list of feature keys (default: every trained model)")
+    parser.add_argument("--start-year", type=int, default=2018)
+    parser.add_argument("--end-year", type=int, default=2024)
+    parser.add_argument("--win-prob-model", default="teacher", choices=["teacher", "student"])
+    parser.add_argument("--predictions", action="store_true", help="Also write per-play predictions")
+    parser.add_argument("--threads", type=int, default=None)
+    parser.add_argument("--out", default=str(OUT_DIR))
+    args = parser.parse_args()
+    if args.threads:
+        torch.set_num_threads(args.threads)
+    out_dir = Path(args.out)
+
+    start = time.perf_counter()
+    art = load_artifact_set("backtest", MODEL_DIR, DATA_DIR, win_prob_model=args.win_prob_model)
+    keys = [k.strip() for k in args.models.split(",")] if args.models else \
+        [name[:-len('_model')] for name in art.models]
+
+    engineer = NFLFeatureEngineer()
+    clean = engineer.clean_pbp(load_pbp(range(args.start_year, args.end_year + 1)))
+    print(f"⏱️ Loaded {len(clean):,} plays in {time.perf_counter() - start:.1f}s")
+
+    metrics, curves, predictions = [], [], []
+    for key in keys:
+        if f"{key}_model" not in art.models:
+            print(f"⚠️ {key}: no trained model, skipping")
+            continue
+        t = time.perf_counter()
+        X, y = build_feature_set(engineer, key, clean)
+        meta = clean.loc[X.index, ['game_id', 'season', 'week', 'posteam']].rename(columns={'posteam': 'team'})
+        meta = meta.reset_index(drop=True)
+        y = y.reset_index(drop=True)
+        m, c, p = backtest_model(key, art.models[f"{key}_model"], art.extractors[key], X, y, meta, art.encoders)
+        metrics.append(m.assign(model=key))
+        curves.append(c if c is None else c.assign(model=key))
+        if args.predictions:
+            predictions.append(p.assign(model=key))
+        print(f"✅ {key}: {len(X):,} plays scored in {time.perf_counter() - t:.2f}s")
+
+    if not metrics:
+        print("❌ Nothing to backtest")
+        return
+    write_partitioned(metrics, out_dir / "metrics", ['model', 'level'])
+    write_partitioned(curves, out_dir / "calibration", ['model', 'level'])
+    if args.predictions:
+        write_partitioned(predictions, out_dir / "predictions", ['model', 'season'])
+    print_summary(pd.concat(metrics, ignore_index=True))
+    print(f"\n💾 Results written to {out_dir} ({time.perf_counter() - start:.1f}s total)")
+
+if __name__ == "__main__":
+    main()
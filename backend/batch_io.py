@@ -0,0 +1,117 @@
+"""
+Columnar Batch Codecs
+Request/response encoding for /predict/batch.arrow: feature columns arrive as
+an Arrow IPC stream or as raw little-endian float32 with a small header, and
+model outputs leave as one Arrow record batch. No per-row Python objects.
+
+Raw float32 layout:
+    uint32 (LE) header length, JSON header {"columns": [...], "rows": n},
+    then rows * len(columns) float32 values in row-major order.
+"""
+
+import json
+import struct
+
+import numpy as np
+import pyarrow as pa
+
+from model_registry import decisions
+
+ARROW_STREAM = "application/vnd.apache.arrow.stream"
+ARROW_FILE = "application/vnd.apache.arrow.file"
+RAW_FLOAT32 = "application/octet-stream"
+HEADER_LEN = struct.Struct("<I")
+
+class BatchFormatError(ValueError):
+    """Malformed or incomplete batch payload"""
+
+def encode_raw(columns, values):
+    """Client helper: (rows, len(columns)) array -> raw float32 payload"""
+    values = np.ascontiguousarray(values, dtype='<f4')
+    if values.ndim != 2 or values.shape[1] != len(columns):
+        raise BatchFormatError(f"Expected a (rows, {len(columns)}) array, got {values.shape}")
+    header = json.dumps({"columns": list(columns), "rows": values.shape[0]}).encode()
+    return HEADER_LEN.pack(len(header)) + header + values.tobytes()
+
+def decode_raw(body):
+    """Raw float32 payload -> ({column: float32 view}, rows)"""
+    if len(body) < HEADER_LEN.size:
+        raise BatchFormatError("Payload too short for a header")
+    (n,) = HEADER_LEN.unpack_from(body)
+    try:
+        header = json.loads(body[HEADER_LEN.size:HEADER_LEN.size + n])
+        columns, rows = list(header["columns"]), int(header["rows"])
+    except (ValueError, KeyError, TypeError) as e:
+        raise BatchFormatError(f"Bad header: {e}")
+    offset = HEADER_LEN.size + n
+    expected = rows * len(columns) * 4
+    if len(body) - offset != expected:
+        raise BatchFormatError(f"Expected {expected} data bytes for {rows}x{len(columns)}, got {len(body) - offset}")
+    values = np.frombuffer(body, dtype='<f4', offset=offset).reshape(rows, len(columns))
+    return {c: values[:, i] for i, c in enumerate(columns)}, rows
+
+def decode_arrow(body, file_format=False):
+    """Arrow IPC stream (or file) -> ({column: pyarrow column}, rows)"""
+    try:
+        reader = pa.ipc.open_file(body) if file_format else pa.ipc.open_stream(body)
+        table = reader.read_all()
+    except pa.ArrowInvalid as e:
+        raise BatchFormatError(f"Not an Arrow IPC {'file' if file_format else 'stream'}: {e}")
+    return {name: table.column(name) for name in table.column_names}, table.num_rows
+
+def decode_batch(body, content_type):
+    """Dispatch on Content-Type; Arrow stream is the default"""
+    content_type = (content_type or ARROW_STREAM).split(";")[0].strip()
+    if content_type == RAW_FLOAT32:
+        return decode_raw(body)
+    if content_type == ARROW_FILE:
+        return decode_arrow(body, file_format=True)
+    return decode_arrow(body)
+
+def feature_matrix(columns, rows, names):
+    """Stack the named columns into a (rows, len(names)) float32 matrix"""
+    X = np.empty((rows, len(names)), dtype=np.float32)
+    for i, name in enumerate(names):
+        col = columns[name]
+        arrow = isinstance(col, (pa.Array, pa.ChunkedArray))
+        if arrow and col.null_count:
+            raise BatchFormatError(f"Column '{name}' contains nulls")
+        try:
+            X[:, i] = col.to_numpy() if arrow else col
+        except (pa.ArrowInvalid, pa.ArrowNotImplementedError, TypeError, ValueError) as e:
+            # e.g. a string or struct column
+            raise BatchFormatError(f"Column '{name}' is not numeric ({col.type if arrow else type(col).__name__}): {e}")
+    return X
+
+def head_classes(encoders, key, head):
+    """Class labels for a logits head, in output order"""
+    encoder = encoders[key][head] if key == 'situational' else encoders[key]
+    return [str(c) for c in encoder.classes_]
+
+def output_columns(key, heads, encoders):
+    """
+    head_outputs() of one model -> Arrow columns. prob/value heads become one
+    float32 column `<model>.<head>`; class heads become the argmax label plus
+    one probability column per class `<model>.<head>.<class>`.
+    """
+    columns = {}
+    for head, kind, values in heads:
+        name = f"{key}.{head}"
+        if kind != 'logits':
+            columns[name] = pa.array(values.ravel().astype(np.float32))
+            continue
+        classes = head_classes(encoders, key, head)
+        # dictionary-encoded: one int32 index per row, labels stored once
+        columns[name] = pa.DictionaryArray.from_arrays(
+            pa.array(decisions(kind, values), pa.int32()), pa.array(classes))
+        for i, cls in enumerate(classes):
+            columns[f"{name}.{cls}"] = pa.array(values[:, i].astype(np.float32))
+    return columns
+
+def encode_arrow(columns, metadata=None):
+    """{name: pyarrow array} -> Arrow IPC stream bytes (one record batch)"""
+    batch = pa.RecordBatch.from_pydict(columns, metadata=metadata)
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, batch.schema) as writer:
+        writer.write_batch(batch)
+    return sink.getvalue().to_pybytes()
@@ -0,0 +1,7 @@
+"""
+Benchmarks for the NFL AI Coach backend.
+Run from backend/, e.g. `python -m benchmarks.loaders`.
+`python -m benchmarks.suite` runs the inference and endpoint benchmarks,
+writes a JSON report and compares it with benchmarks/baseline.json, a
+per-machine baseline recorded with --save-baseline (not committed).
+"""
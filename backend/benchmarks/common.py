@@ -0,0 +1,101 @@
+"""
+Shared helpers for the serving benchmarks: the API's own model loading,
+a held-out pbp sample per model and timing utilities.
+"""
+
+import io
+import statistics
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import torch
+
+sys.path.append(str(Path(__file__).parent.parent))
+import main
+from model_registry import OUTPUT_HEADS, load_artifact_set, head_outputs, decisions
+from data_loader import NFLDataLoader
+from feature_engineering import NFLFeatureEngineer
+from streaming import is_validation_game
+from train import build_feature_set
+
+def load_serving_models():
+    """
+    Load the artifact set the API would serve, as fp32 eager models.
+    Returns ({feature key: model}, extractors).
+    """
+    options = {**main.registry.options, 'quantize': False, 'runtime': 'eager'}
+    art = load_artifact_set("benchmark", main.registry.model_dir, main.registry.data_dir, **options)
+    return {name[:-len('_model')]: model for name, model in art.models.items()}, art.extractors
+
+def held_out_features(names, extractors, rows=20000, seed=0):
+    """Scaled float32 features per model from held-out games of the pbp cache"""
+    engineer = NFLFeatureEngineer()
+    pbp = NFLDataLoader().load_play_by_play()
+    clean = engineer.clean_pbp(pbp[is_validation_game(pbp['game_id'])])
+    del pbp
+    features = {}
+    for name in names:
+        X, _ = build_feature_set(engineer, name, clean)
+        if len(X) > rows:
+            X = X.sample(rows, random_state=seed)
+        features[name] = torch.from_numpy(extractors[name].transform_array(X.values).copy())
+    return features
+
+def batch_of(X, batch):
+    """First `batch` rows, tiled when the sample is smaller"""
+    reps = -(-batch // len(X))
+    return X.repeat(reps, 1)[:batch] if reps > 1 else X[:batch]
+
+def time_samples(fn, repeats, warmup=10):
+    """Wall time of each of `repeats` fn() calls in seconds, after warmup"""
+    for _ in range(warmup):
+        fn()
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return timings
+
+def time_call(fn, repeats, warmup=10):
+    """Median wall time of fn() in seconds"""
+    return statistics.median(time_samples(fn, repeats, warmup))
+
+def adaptive_repeats(fn, budget_s, max_repeats, min_repeats=20):
+    """Repeat count that keeps one measurement near `budget_s` seconds"""
+    fn()
+    start = time.perf_counter()
+    fn()
+    once = max(time.perf_counter() - start, 1e-7)
+    return int(min(max(budget_s / once, min_repeats), max_repeats))
+
+def latency_stats(timings, rows=1):
+    """p50/p95/p99/mean in µs and rows per second (at the median) for a list of timings"""
+    t = np.sort(np.asarray(timings)) * 1e6
+    p50 = float(np.percentile(t, 50))
+    return {'p50_us': p50, 'p95_us': float(np.percentile(t, 95)), 'p99_us': float(np.percentile(t, 99)),
+            'mean_us': float(t.mean()), 'rows_per_s': rows / (p50 / 1e6) if p50 else float('inf')}
+
+def weight_bytes(model):
+    """Serialized state_dict size (packed int8 weights count as stored)"""
+    buf = io.BytesIO()
+    torch.save(model.state_dict(), buf)
+    return buf.tell()
+
+def activation_bytes(model, x):
+    """Bytes of every intermediate tensor produced by one forward pass"""
+    total = 0
+    def hook(module, inputs, output):
+        nonlocal total
+        for out in (output if isinstance(output, tuple) else (output,)):
+            total += out.nelement() * out.element_size()
+    handles = [m.register_forward_hook(hook) for m in model.modules() if not list(m.children())]
+    try:
+        with torch.no_grad():
+            model(x)
+    finally:
+        for h in handles:
+            h.remove()
+    return total
@@ -0,0 +1,138 @@
+"""
+End-to-End Endpoint Benchmark
+Drives every backend/main.py endpoint through an in-process ASGI client
+(httpx.ASGITransport, no sockets), so routing, validation, inference and
+serialization are all timed. Reports sequential latency percentiles and
+throughput with several requests in flight. /analyze/play is skipped (it
+calls Gemini).
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import time
+
+import httpx
+import numpy as np
+
+from benchmarks.common import latency_stats
+from batch_io import encode_raw, RAW_FLOAT32
+from demo_scenarios import get_demo_scenarios
+from feature_specs import FEATURE_SPECS
+import main as api
+
+BATCH_ROWS = 1024
+
+def game_states(n, seed=0):
+    """Varied but valid GameState payloads"""
+    rng = random.Random(seed)
+    states = []
+    for i in range(n):
+        secs = rng.randint(0, 3600)
+        yardline = rng.randint(1, 99)
+        states.append({
+            'game_id': f"bench_{i % 16}", 'qtr': min(4, 4 - secs // 900) or 1, 'time_remaining': secs % 900,
+            'score_home': rng.randint(0, 35), 'score_away': rng.randint(0, 35),
+            'down': rng.randint(1, 4), 'ydstogo': rng.randint(1, 15), 'yardline_100': yardline,
+            'score_differential': rng.randint(-21, 21), 'game_seconds_remaining': secs,
+            'half_seconds_remaining': secs % 1800, 'red_zone': int(yardline <= 20),
+            'goal_to_go': int(yardline <= 10), 'two_min_drill': int(secs % 1800 <= 120),
+            'posteam_timeouts_remaining': rng.randint(0, 3), 'defteam_timeouts_remaining': rng.randint(0, 3),
+        })
+    return states
+
+def batch_payload(rows=BATCH_ROWS, seed=0):
+    columns = sorted({c for spec in FEATURE_SPECS.values() for c in spec})
+    X = np.random.default_rng(seed).uniform(0, 10, (rows, len(columns))).astype(np.float32)
+    return encode_raw(columns, X)
+
+def endpoint_requests(states):
+    """name -> (method, path, kwargs factory(i)); payloads cycle through `states`"""
+    n = len(states)
+    state = lambda i: {'json': states[i % n]}
+    body = batch_payload()
+    scenario = get_demo_scenarios()[0]['id']
+    return {
+        'health': ('GET', '/health', lambda i: {}),
+        'fourth-down': ('POST', '/predict/fourth-down', state),
+        'offensive': ('POST', '/predict/offensive', state),
+        'defensive': ('POST', '/predict/defensive', state),
+        'personnel': ('POST', '/predict/personnel', state),
+        'situational': ('POST', '/predict/situational', state),
+        'formation': ('POST', '/predict/formation', lambda i: {'json': {'ydstogo': 1 + i % 12}}),
+        'demo-scenarios': ('GET', '/demo/scenarios', lambda i: {}),
+        'demo-load': ('GET', f"/demo/load/{scenario}", lambda i: {}),
+        'simulate-step': ('POST', '/simulate/step',
+                          lambda i: {'json': {'current_state': states[i % n], 'action_taken': ('Pass', 'Run')[i % 2]}}),
+        f'batch-arrow-{BATCH_ROWS}': ('POST', '/predict/batch.arrow',
+                                      lambda i: {'content': body, 'headers': {'content-type': RAW_FLOAT32}}),
+    }
+
+async def measure(client, method, path, kwargs, requests, concurrency):
+    """Sequential per-request timings, then wall-clock throughput with `concurrency` in flight"""
+    for i in range(10):
+        (await client.request(method, path, **kwargs(i))).raise_for_status()
+    timings = []
+    for i in range(requests):
+        start = time.perf_counter()
+        response = await client.request(method, path, **kwargs(i))
+        timings.append(time.perf_counter() - start)
+        response.raise_for_status()
+
+    semaphore = asyncio.Semaphore(concurrency)
+    async def one(i):
+        async with semaphore:
+            await client.request(method, path, **kwargs(i))
+    start = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(requests)))
+    return timings, requests / (time.perf_counter() - start)
+
+async def run_async(names=None, requests=300, concurrency=8):
+    if api.registry.current is None:
+        api.registry.reload()
+    calls = endpoint_requests(game_states(256))
+    results = []
+    transport = httpx.ASGITransport(app=api.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        for name, (method, path, kwargs) in calls.items():
+            if names and name not in names:
+                continue
+            try:
+                timings, throughput = await measure(client, method, path, kwargs, requests, concurrency)
+            except httpx.HTTPStatusError as e:
+                print(f"  ⚠️ {name}: {e.response.status_code} {e.response.text[:120]}")
+                continue
+            row = {'endpoint': name, 'method': method, 'path': path, 'requests': requests,
+                   'concurrency': concurrency, **latency_stats(timings), 'req_per_s': throughput}
+            row.pop('rows_per_s')
+            results.append(row)
+            print(f"  {name:20} | p50 {row['p50_us']:9.1f} µs | p95 {row['p95_us']:9.1f} µs | "
+                  f"p99 {row['p99_us']:9.1f} µs | {throughput:8,.0f} req/s @ {concurrency}")
+    return results
+
+def run(names=None, requests=300, concurrency=8):
+    return asyncio.run(run_async(names, requests, concurrency))
+
+def add_arguments(parser):
+    parser.add_argument("--endpoints", default=None, help="Comma list of endpoint names (default: all)")
+    parser.add_argument("--requests", type=int, default=300)
+    parser.add_argument("--concurrency", type=int, default=8)
+
+def run_from_args(args):
+    names = [n.strip() for n in args.endpoints.split(",")] if args.endpoints else None
+    return run(names, args.requests, args.concurrency)
+
+def main():
+    parser = argparse.ArgumentParser()
+    add_arguments(parser)
+    parser.add_argument("--json", default=None, help="Also write the results to this path")
+    args = parser.parse_args()
+    results = run_from_args(args)
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"\n💾 Results saved to {args.json}")
+
+if __name__ == "__main__":
+    main()
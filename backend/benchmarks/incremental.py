@@ -0,0 +1,128 @@
+"""
+Incremental Inference Benchmark
+Replays live-game-like update streams (a new snap, then clock ticks that
+move game_seconds_remaining / half_seconds_remaining, then play-clock-only
+updates while the clock is stopped) through every loaded model, once with a
+full forward per update and once through incremental.SessionStore. Reports
+per-update latency by update kind, the speed-up and the largest output
+difference between the two paths.
+
+Usage:
+    python -m benchmarks.incremental
+    python -m benchmarks.incremental --games 16 --snaps 40 --ticks 20 --json incremental.json
+"""
+
+import argparse
+import json
+import time
+
+import numpy as np
+import torch
+
+from benchmarks.common import latency_stats
+from benchmarks.endpoints import game_states
+from incremental import SessionStore
+from model_registry import load_artifact_set
+import main as api
+
+UPDATE_KINDS = ('snap', 'clock', 'play_clock')
+
+def update_stream(n_games, snaps, ticks, play_clock_ticks, seed=0):
+    """(kind, GameState) in arrival order, games interleaved round-robin"""
+    per_game = []
+    for g in range(n_games):
+        updates = []
+        for snap in game_states(snaps, seed + g):
+            state = {**snap, 'game_id': f"live_{g}", 'play_clock': 40}
+            updates.append(('snap', dict(state)))
+            for _ in range(ticks):
+                state['game_seconds_remaining'] = max(0, state['game_seconds_remaining'] - 1)
+                state['half_seconds_remaining'] = max(0, state['half_seconds_remaining'] - 1)
+                state['time_remaining'] = max(0, state['time_remaining'] - 1)
+                state['play_clock'] = max(0, state['play_clock'] - 1)
+                updates.append(('clock', dict(state)))
+            state['clock_running'] = False
+            for _ in range(play_clock_ticks):
+                state['play_clock'] = max(0, state['play_clock'] - 1)
+                updates.append(('play_clock', dict(state)))
+        per_game.append([(kind, api.GameState(**s)) for kind, s in updates])
+    return [u for round_ in zip(*per_game) for u in round_]
+
+def flatten(outputs):
+    outputs = outputs if isinstance(outputs, tuple) else (outputs,)
+    return np.concatenate([o.numpy().ravel() for o in outputs])
+
+def full_forward(art, key, state):
+    with torch.no_grad():
+        return art.models[f"{key}_model"](torch.from_numpy(art.extractors[key].transform_one(state)))
+
+def run(n_games=16, snaps=20, ticks=10, play_clock_ticks=5, seed=0):
+    options = {**api.registry.options, 'quantize': False, 'runtime': 'eager'}
+    art = load_artifact_set("benchmark", api.registry.model_dir, api.registry.data_dir, **options)
+    keys = [name[:-len('_model')] for name in art.models]
+    if not keys:
+        raise SystemExit("❌ No models loaded; train first (python train.py)")
+
+    stream = update_stream(n_games, snaps, ticks, play_clock_ticks, seed)
+    store = SessionStore()
+    paths = {'full': lambda key, state: full_forward(art, key, state),
+             'incremental': lambda key, state: store.forward(art, key, state)}
+
+    # Warm up both paths with a throwaway store so the measured sessions start cold
+    warm = SessionStore()
+    for kind, state in update_stream(2, 2, 2, 1, seed + 100):
+        for key in keys:
+            full_forward(art, key, state)
+            warm.forward(art, key, state)
+
+    timings = {(path, kind): [] for path in paths for kind in UPDATE_KINDS}
+    max_dev = 0.0
+    for kind, state in stream:
+        outputs = {}
+        for path, forward in paths.items():
+            start = time.perf_counter()
+            outputs[path] = [forward(key, state) for key in keys]
+            timings[(path, kind)].append(time.perf_counter() - start)
+        for full, inc in zip(outputs['full'], outputs['incremental']):
+            max_dev = max(max_dev, float(np.abs(flatten(full) - flatten(inc)).max()))
+
+    results = []
+    print(f"⚡ {len(stream):,} updates over {n_games} games, models: {', '.join(keys)}")
+    for kind in UPDATE_KINDS + ('all',):
+        kinds = UPDATE_KINDS if kind == 'all' else (kind,)
+        row = {'kind': kind}
+        for path in paths:
+            samples = [t for k in kinds for t in timings[(path, k)]]
+            if not samples:
+                break
+            row[path] = latency_stats(samples)
+        if len(row) == 1:
+            continue
+        row['speedup_p50'] = row['full']['p50_us'] / row['incremental']['p50_us']
+        results.append(row)
+        print(f"  {kind:>10} | full p50 {row['full']['p50_us']:7.1f} µs p95 {row['full']['p95_us']:7.1f} µs | "
+              f"incremental p50 {row['incremental']['p50_us']:7.1f} µs p95 {row['incremental']['p95_us']:7.1f} µs | "
+              f"{row['speedup_p50']:.2f}x")
+    print(f"  session paths: {store.summary()}")
+    print(f"  max |full - incremental| over all outputs: {max_dev:.2e}")
+    return {'updates': len(stream), 'models': keys, 'max_abs_diff': max_dev,
+            'paths': store.summary(), 'results': results}
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--games", type=int, default=16)
+    parser.add_argument("--snaps", type=int, default=20, help="Snaps per game")
+    parser.add_argument("--ticks", type=int, default=10, help="Clock ticks after each snap")
+    parser.add_argument("--play-clock-ticks", type=int, default=5, help="Play-clock-only updates after the ticks")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", default=None, help="Also write the results to this path")
+    args = parser.parse_args()
+    torch.set_num_threads(1)
+    report = run(args.games, args.snaps, args.ticks, args.play_clock_ticks, args.seed)
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"\n💾 Results saved to {args.json}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""
+Inference Micro-Benchmark
+Latency percentiles and throughput of every architecture in architectures.py
+across batch sizes, torch thread counts and runtimes (eager, frozen
+TorchScript, int8 dynamic quantization, torch.compile).
+
+Untrained nets of the serving shapes are timed by default (they cost the same
+to run as trained ones); --trained times the artifacts the API would load.
+"""
+
+import argparse
+import json
+
+import torch
+
+from benchmarks.common import load_serving_models, batch_of, time_samples, adaptive_repeats, latency_stats
+from benchmarks.runtimes import build_runtime
+from architectures import (
+    FourthDownDecisionModel, WinProbabilityModel, WinProbabilityStudent,
+    OffensivePlayCallerModel, DefensiveCoordinatorModel, PersonnelOptimizerModel,
+    SituationalMultiTaskModel
+)
+from feature_specs import FEATURE_SPECS
+
+RUNTIMES = ('eager', 'torchscript', 'int8', 'compile')
+BATCH_SIZES = (1, 8, 64, 256, 1024, 4096)
+
+# Class counts of the trained encoders (play categories, personnel groups)
+PLAY_CALLS, PERSONNEL_GROUPS = 5, 3
+
+# name -> (feature key, factory(input_dim))
+ARCHITECTURES = {
+    'fourth_down': ('fourth_down', lambda d: FourthDownDecisionModel(d)),
+    'win_prob': ('win_prob', lambda d: WinProbabilityModel(d)),
+    'win_prob_student': ('win_prob', lambda d: WinProbabilityStudent(d)),
+    'offensive': ('offensive', lambda d: OffensivePlayCallerModel(d, num_classes=PLAY_CALLS)),
+    'defensive': ('defensive', lambda d: DefensiveCoordinatorModel(d)),
+    'personnel': ('personnel', lambda d: PersonnelOptimizerModel(d, num_classes=PERSONNEL_GROUPS)),
+    'situational': ('situational', lambda d: SituationalMultiTaskModel(d, PLAY_CALLS, PERSONNEL_GROUPS)),
+}
+
+def benchmark_models(trained=False):
+    """{name: (eval-mode model, input_dim)}"""
+    if trained:
+        models, _ = load_serving_models()
+        return {name: (model, len(FEATURE_SPECS[name])) for name, model in models.items()}
+    torch.manual_seed(0)
+    return {name: (factory(len(FEATURE_SPECS[key])).eval(), len(FEATURE_SPECS[key]))
+            for name, (key, factory) in ARCHITECTURES.items()}
+
+def run(names=None, runtimes=RUNTIMES, batch_sizes=BATCH_SIZES, threads=(1,), budget_s=0.25,
+        max_repeats=2000, trained=False):
+    """One result row per (model, runtime, threads, batch)"""
+    results = []
+    models = benchmark_models(trained)
+    for name, (model, input_dim) in models.items():
+        if names and name not in names:
+            continue
+        X = torch.randn(max(batch_sizes), input_dim)
+        for n_threads in threads:
+            torch.set_num_threads(n_threads)
+            for runtime in runtimes:
+                try:
+                    fn = build_runtime(runtime, model, input_dim)
+                except Exception as e:
+                    print(f"  ⚠️ {name}: {runtime} unavailable ({type(e).__name__}: {e})")
+                    continue
+                for batch in batch_sizes:
+                    xb = batch_of(X, batch)
+                    call = lambda: fn(xb)
+                    try:
+                        with torch.no_grad():
+                            repeats = adaptive_repeats(call, budget_s, max_repeats)
+                            timings = time_samples(call, repeats)
+                    except Exception as e:
+                        # torch.compile only fails on first call (e.g. no C++ toolchain)
+                        print(f"  ⚠️ {name}: {runtime} failed ({type(e).__name__}: {e})")
+                        break
+                    row = {'model': name, 'runtime': runtime, 'threads': n_threads, 'batch': batch,
+                           'repeats': repeats, **latency_stats(timings, rows=batch)}
+                    results.append(row)
+                    print(f"  {name:16} {runtime:11} {n_threads:>2}t {batch:>5} | p50 {row['p50_us']:9.1f} µs "
+                          f"| p99 {row['p99_us']:9.1f} µs | {row['rows_per_s']:12,.0f} rows/s")
+    return results
+
+def parse_list(text, cast=str):
+    return tuple(cast(x.strip()) for x in text.split(",") if x.strip())
+
+def add_arguments(parser):
+    parser.add_argument("--models", default=None, help="Comma list (default: every architecture)")
+    parser.add_argument("--runtimes", default=",".join(RUNTIMES))
+    parser.add_argument("--batch-sizes", default=",".join(map(str, BATCH_SIZES)))
+    parser.add_argument("--threads", default="1", help="Comma list of torch thread counts")
+    parser.add_argument("--budget", type=float, default=0.25, help="Seconds of timing per measurement")
+    parser.add_argument("--trained", action="store_true", help="Time the served artifacts instead")
+
+def run_from_args(args):
+    return run(parse_list(args.models) if args.models else None, parse_list(args.runtimes),
+               parse_list(args.batch_sizes, int), parse_list(args.threads, int), args.budget,
+               trained=args.trained)
+
+def main():
+    parser = argparse.ArgumentParser()
+    add_arguments(parser)
+    parser.add_argument("--json", default=None, help="Also write the results to this path")
+    args = parser.parse_args()
+    results = run_from_args(args)
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"\n💾 Results saved to {args.json}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""
+Training Loader Benchmark
+Compares TensorDataset/random_split/DataLoader against TensorBatcher on
+in-memory tensors shaped like the win-prob training set.
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import torch
+import torch.nn as nn
+from torch.utils.data import DataLoader, TensorDataset, random_split
+
+sys.path.append(str(Path(__file__).parent.parent))
+from architectures import WinProbabilityModel
+from train import BATCH_SIZE, split_batchers
+
+def dataloader_pair(X, y, batch_size):
+    dataset = TensorDataset(X, y)
+    train_size = int(0.8 * len(dataset))
+    train_ds, val_ds = random_split(dataset, [train_size, len(dataset) - train_size])
+    return DataLoader(train_ds, batch_size=batch_size, shuffle=True), DataLoader(val_ds, batch_size=batch_size)
+
+def time_epoch(loader, model=None, optimizer=None):
+    """Iterate one epoch; with a model, include the forward/backward step"""
+    criterion = nn.BCELoss()
+    rows = 0
+    start = time.perf_counter()
+    for batch_X, batch_y in loader:
+        if model is not None and len(batch_X) > 1:
+            optimizer.zero_grad()
+            criterion(model(batch_X), batch_y).backward()
+            optimizer.step()
+        rows += len(batch_X)
+    return rows / (time.perf_counter() - start)
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--features", type=int, default=8)
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    parser.add_argument("--epochs", type=int, default=2)
+    args = parser.parse_args()
+
+    X = torch.randn(args.rows, args.features)
+    y = (torch.rand(args.rows, 1) > 0.5).float()
+    print(f"📊 {args.rows:,} rows x {args.features} features, batch {args.batch_size}")
+
+    candidates = {
+        'DataLoader': dataloader_pair(X, y, args.batch_size)[0],
+        'TensorBatcher': split_batchers(X, y, batch_size=args.batch_size)[0],
+    }
+    results = {}
+    for name, loader in candidates.items():
+        iterate = max(time_epoch(loader) for _ in range(args.epochs))
+        model = WinProbabilityModel(args.features)
+        optimizer = torch.optim.Adam(model.parameters(), lr=0.001)
+        train = max(time_epoch(loader, model, optimizer) for _ in range(args.epochs))
+        results[name] = (iterate, train)
+        print(f"  {name:14} iterate only: {iterate:>12,.0f} samples/s | with train step: {train:>10,.0f} samples/s")
+
+    base, fast = results['DataLoader'], results['TensorBatcher']
+    print(f"\n⚡ Speedup: {fast[0] / base[0]:.1f}x iterate, {fast[1] / base[1]:.1f}x end-to-end epoch")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,162 @@
+"""
+Multi-Task Serving Benchmark
+Compares the shared-trunk situational model against the separate offensive,
+defensive and personnel models: per-snap serving cost (extract + forward)
+and per-task validation accuracy.
+
+Without trained artifacts only serving cost is reported (randomly
+initialised nets of the same shapes cost the same to run).
+"""
+
+import argparse
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+import joblib
+import numpy as np
+import pandas as pd
+import torch
+import torch.nn as nn
+
+sys.path.append(str(Path(__file__).parent.parent))
+from architectures import (
+    OffensivePlayCallerModel, DefensiveCoordinatorModel, PersonnelOptimizerModel,
+    SituationalMultiTaskModel
+)
+from feature_specs import FEATURE_SPECS, FeatureExtractor, feature_columns
+from feature_engineering import NFLFeatureEngineer
+from data_loader import NFLDataLoader
+from train import DATA_DIR, MODEL_DIR, SEED
+from benchmarks.common import time_call
+
+SEPARATE = ('offensive', 'defensive', 'personnel')
+
+def load_models(model_dir, data_dir):
+    """Trained nets + extractors when artifacts exist, else fresh nets (cost only)"""
+    scalers = joblib.load(data_dir / "scalers.pkl") if (data_dir / "scalers.pkl").exists() else {}
+    encoders = joblib.load(data_dir / "encoders.pkl") if (data_dir / "encoders.pkl").exists() else {}
+    sit = encoders.get('situational', {})
+    n_play = len(encoders['offensive'].classes_) if 'offensive' in encoders else 5
+    n_pers = len(encoders['personnel'].classes_) if 'personnel' in encoders else 3
+
+    nets = {
+        'offensive': OffensivePlayCallerModel(len(FEATURE_SPECS['offensive']), num_classes=n_play),
+        'defensive': DefensiveCoordinatorModel(len(FEATURE_SPECS['defensive'])),
+        'personnel': PersonnelOptimizerModel(len(FEATURE_SPECS['personnel']), num_classes=n_pers),
+        'situational': SituationalMultiTaskModel(
+            len(FEATURE_SPECS['situational']),
+            len(sit['play_call'].classes_) if sit else n_play,
+            len(sit['personnel'].classes_) if sit else n_pers),
+    }
+    trained = True
+    for name, net in nets.items():
+        path = model_dir / f"{name}_model.pt"
+        if path.exists() and name in scalers:
+            net.load_state_dict(torch.load(path, map_location='cpu'))
+        else:
+            trained = False
+        net.eval()
+    extractors = {name: FeatureExtractor(name, scalers.get(name)) for name in nets}
+    return nets, extractors, encoders, trained
+
+def count_macs(model):
+    """Multiply-accumulates per row (Linear layers dominate these MLPs)"""
+    return sum(m.in_features * m.out_features for m in model.modules() if isinstance(m, nn.Linear))
+
+def serve_separate(nets, extractors, states):
+    with torch.no_grad():
+        play = torch.softmax(nets['offensive'](torch.from_numpy(extractors['offensive'].transform(states))), dim=1)
+        pass_prob = nets['defensive'](torch.from_numpy(extractors['defensive'].transform(states)))
+        personnel = torch.softmax(nets['personnel'](torch.from_numpy(extractors['personnel'].transform(states))), dim=1)
+    return play, pass_prob, personnel
+
+def serve_multitask(nets, extractors, states):
+    with torch.no_grad():
+        play, pass_prob, personnel = nets['situational'](torch.from_numpy(extractors['situational'].transform(states)))
+        return torch.softmax(play, dim=1), pass_prob, torch.softmax(personnel, dim=1)
+
+def validation_rows(pbp):
+    """Situational features/targets for the multi-task model's validation split"""
+    engineer = NFLFeatureEngineer()
+    X, y = engineer.get_situational_features(engineer.clean_pbp(pbp))
+    # Same seeded permutation as train.split_batchers
+    perm = torch.randperm(len(X), generator=torch.Generator().manual_seed(SEED)).numpy()
+    val_idx = np.sort(perm[int(0.8 * len(X)):])
+    return X.iloc[val_idx], y.iloc[val_idx]
+
+def accuracy(nets, extractors, encoders, X, y):
+    """Per-task accuracy, comparing decoded labels so encoders may differ"""
+    def scaled(name):
+        return torch.from_numpy(extractors[name].transform_array(X[feature_columns(name)].values).copy())
+
+    with torch.no_grad():
+        off = nets['offensive'](scaled('offensive')).argmax(dim=1).numpy()
+        dfn = nets['defensive'](scaled('defensive')).view(-1).numpy()
+        pers = nets['personnel'](scaled('personnel')).argmax(dim=1).numpy()
+        m_play, m_pass, m_pers = nets['situational'](scaled('situational'))
+
+    sit = encoders['situational']
+    play_true, pass_true, pers_true = (y['play_category'].values, y['is_pass'].values,
+                                       y['personnel_group'].values)
+    return {
+        'separate': (
+            np.mean(encoders['offensive'].classes_[off] == play_true),
+            np.mean((dfn >= 0.5) == pass_true),
+            np.mean(encoders['personnel'].classes_[pers] == pers_true),
+        ),
+        'multitask': (
+            np.mean(sit['play_call'].classes_[m_play.argmax(dim=1).numpy()] == play_true),
+            np.mean((m_pass.view(-1).numpy() >= 0.5) == pass_true),
+            np.mean(sit['personnel'].classes_[m_pers.argmax(dim=1).numpy()] == pers_true),
+        ),
+    }
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--model-dir", type=Path, default=MODEL_DIR)
+    parser.add_argument("--data-dir", type=Path, default=DATA_DIR, help="Where scalers.pkl / encoders.pkl live")
+    parser.add_argument("--batch-sizes", default="1,64", help="Snaps per serving call")
+    parser.add_argument("--repeats", type=int, default=500)
+    parser.add_argument("--threads", type=int, default=1)
+    parser.add_argument("--no-accuracy", action="store_true", help="Skip loading pbp for the accuracy table")
+    args = parser.parse_args()
+    torch.set_num_threads(args.threads)
+
+    nets, extractors, encoders, trained = load_models(args.model_dir, args.data_dir)
+    if not trained:
+        print("⚠️ Trained artifacts incomplete (need train.py --multitask); timing fresh nets, no accuracy")
+
+    X_val = y_val = None
+    if trained and not args.no_accuracy:
+        X_val, y_val = validation_rows(NFLDataLoader().load_play_by_play())
+        rows = X_val
+    else:
+        rng = np.random.default_rng(SEED)
+        rows = pd.DataFrame(rng.integers(0, 10, (4096, len(FEATURE_SPECS['situational']))),
+                            columns=feature_columns('situational'))
+    states = [SimpleNamespace(**r) for r in rows.head(4096).to_dict('records')]
+
+    params = {name: sum(p.numel() for p in net.parameters()) for name, net in nets.items()}
+    macs = {name: count_macs(net) for name, net in nets.items()}
+    print(f"🧮 Separate: {sum(params[n] for n in SEPARATE):,} params, {sum(macs[n] for n in SEPARATE):,} MACs/snap | "
+          f"Multi-task: {params['situational']:,} params, {macs['situational']:,} MACs/snap")
+
+    print(f"\n⏱️ Serving cost ({args.threads} thread(s), median of {args.repeats}):")
+    for batch in (int(b) for b in args.batch_sizes.split(",")):
+        batch_states = states[:batch]
+        sep = time_call(lambda: serve_separate(nets, extractors, batch_states), args.repeats)
+        multi = time_call(lambda: serve_multitask(nets, extractors, batch_states), args.repeats)
+        print(f"  batch {batch:>5} | separate {sep / batch * 1e6:8.1f} µs/snap | "
+              f"multi-task {multi / batch * 1e6:8.1f} µs/snap | {sep / multi:.2f}x")
+
+    if X_val is not None:
+        acc = accuracy(nets, extractors, encoders, X_val, y_val)
+        print(f"\n🎯 Validation accuracy on {len(X_val):,} snaps (multi-task split; separate models "
+              f"used their own split, so some of these rows may be in their training data):")
+        print(f"  {'':10} {'play call':>10} {'pass/run':>10} {'personnel':>10}")
+        for name, (play, pass_run, pers) in acc.items():
+            print(f"  {name:10} {play:10.4f} {pass_run:10.4f} {pers:10.4f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""
+Dynamic Int8 Quantization Harness
+Runs every served model in fp32 and with int8 Linear weights over a held-out
+pbp sample and reports output deviation, decision flip rate, latency and
+memory per batch size. Serve int8 with QUANTIZE_MODELS=1.
+"""
+
+import argparse
+import json
+
+import numpy as np
+import torch
+
+from benchmarks.common import (
+    load_serving_models, held_out_features, head_outputs, decisions,
+    batch_of, time_call, weight_bytes, activation_bytes
+)
+from architectures import quantize_int8
+
+def compare_outputs(name, fp32, int8, X):
+    """Per-head max/mean absolute deviation and decision flip rate"""
+    with torch.no_grad():
+        ref, quant = head_outputs(name, fp32(X)), head_outputs(name, int8(X))
+    rows = []
+    for (head, kind, a), (_, _, b) in zip(ref, quant):
+        diff = np.abs(a - b)
+        d_a, d_b = decisions(kind, a), decisions(kind, b)
+        rows.append({
+            'head': head, 'kind': kind,
+            'max_dev': float(diff.max()), 'mean_dev': float(diff.mean()),
+            'flip_rate': None if d_a is None else float(np.mean(d_a != d_b)),
+        })
+    return rows
+
+def profile(model, X, batch_sizes, repeats):
+    results = []
+    for batch in batch_sizes:
+        xb = batch_of(X, batch)
+        with torch.no_grad():
+            seconds = time_call(lambda: model(xb), repeats)
+        results.append({'batch': batch, 'us_per_call': seconds * 1e6,
+                        'activation_bytes': activation_bytes(model, xb)})
+    return results
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=20000, help="Held-out rows per model")
+    parser.add_argument("--batch-sizes", default="1,32,1024")
+    parser.add_argument("--repeats", type=int, default=200)
+    parser.add_argument("--threads", type=int, default=1)
+    parser.add_argument("--json", default=None, help="Also write the report to this path")
+    args = parser.parse_args()
+    torch.set_num_threads(args.threads)
+    batch_sizes = [int(b) for b in args.batch_sizes.split(",")]
+
+    models, extractors = load_serving_models()
+    features = held_out_features(models, extractors, args.rows)
+    report = {}
+    for name, fp32 in models.items():
+        int8 = quantize_int8(fp32)
+        X = features[name]
+        report[name] = {
+            'rows': len(X),
+            'heads': compare_outputs(name, fp32, int8, X),
+            'fp32': {'weight_bytes': weight_bytes(fp32), 'batches': profile(fp32, X, batch_sizes, args.repeats)},
+            'int8': {'weight_bytes': weight_bytes(int8), 'batches': profile(int8, X, batch_sizes, args.repeats)},
+        }
+
+    for name, r in report.items():
+        print(f"\n🔢 {name} ({r['rows']:,} held-out rows) | weights "
+              f"{r['fp32']['weight_bytes'] / 1024:.1f} KB fp32 -> {r['int8']['weight_bytes'] / 1024:.1f} KB int8")
+        for h in r['heads']:
+            flip = "n/a" if h['flip_rate'] is None else f"{h['flip_rate']:.4%}"
+            print(f"  {h['head']:>11} | max dev {h['max_dev']:.5f} | mean dev {h['mean_dev']:.5f} | flips {flip}")
+        for a, b in zip(r['fp32']['batches'], r['int8']['batches']):
+            print(f"  batch {a['batch']:>5} | fp32 {a['us_per_call']:9.1f} µs | int8 {b['us_per_call']:9.1f} µs | "
+                  f"{a['us_per_call'] / b['us_per_call']:.2f}x | activations {a['activation_bytes'] / 1024:.1f} KB "
+                  f"/ {b['activation_bytes'] / 1024:.1f} KB")
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"\n💾 Report saved to {args.json}")
+
+if __name__ == "__main__":
+    main()
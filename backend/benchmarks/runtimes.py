@@ -0,0 +1,71 @@
+"""
+Serving Runtime Benchmark
+Forward latency of every served model as eager PyTorch, frozen TorchScript
+(what export.py writes) and torch.compile, at several batch sizes.
+"""
+
+import argparse
+
+import torch
+
+from benchmarks.common import load_serving_models, batch_of, time_call
+from architectures import quantize_int8
+from export import freeze
+from feature_specs import FEATURE_SPECS
+
+RUNTIMES = ('eager', 'torchscript', 'compile')
+
+def build_runtime(runtime, model, input_dim):
+    if runtime == 'eager':
+        return model
+    if runtime == 'torchscript':
+        return freeze(model, input_dim)
+    if runtime == 'int8':
+        return quantize_int8(model)
+    return torch.compile(model)
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--batch-sizes", default="1,32,1024")
+    parser.add_argument("--runtimes", default=",".join(RUNTIMES))
+    parser.add_argument("--repeats", type=int, default=300)
+    parser.add_argument("--threads", type=int, default=1)
+    args = parser.parse_args()
+    torch.set_num_threads(args.threads)
+    batch_sizes = [int(b) for b in args.batch_sizes.split(",")]
+    runtimes = [r.strip() for r in args.runtimes.split(",")]
+
+    models, _ = load_serving_models()
+    print(f"\n⏱️ Median µs per forward ({args.threads} thread(s), {args.repeats} repeats)")
+    print(f"  {'model':12} {'batch':>6} " + " ".join(f"{r:>12}" for r in runtimes) + "   best vs eager")
+    for name, model in models.items():
+        input_dim = len(FEATURE_SPECS[name])
+        X = torch.randn(max(batch_sizes), input_dim)
+        built = {}
+        for runtime in runtimes:
+            try:
+                built[runtime] = build_runtime(runtime, model, input_dim)
+            except Exception as e:
+                print(f"  ⚠️ {name}: {runtime} unavailable ({type(e).__name__}: {e})")
+        for batch in batch_sizes:
+            xb = batch_of(X, batch)
+            row = {}
+            for runtime in runtimes:
+                if runtime not in built:
+                    continue
+                fn = built[runtime]
+                try:
+                    with torch.no_grad():
+                        # torch.compile specialises per shape; the warmup calls absorb that compile
+                        row[runtime] = time_call(lambda: fn(xb), args.repeats) * 1e6
+                except Exception as e:
+                    # torch.compile only fails on first call (e.g. no C++ toolchain)
+                    print(f"  ⚠️ {name}: {runtime} failed ({type(e).__name__}: {e})")
+                    del built[runtime]
+            cells = " ".join(f"{row[r]:12.1f}" if r in row else f"{'-':>12}" for r in runtimes)
+            best = min(row, key=row.get)
+            speedup = row['eager'] / row[best] if 'eager' in row else float('nan')
+            print(f"  {name:12} {batch:>6} {cells}   {best} {speedup:.2f}x")
+
+if __name__ == "__main__":
+    main()
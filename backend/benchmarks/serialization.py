@@ -0,0 +1,93 @@
+"""
+Response Serialization Benchmark
+Share of per-request handler latency spent building and encoding JSON, for
+the orjson / pre-encoded path the API now uses versus the previous
+FastAPI default (jsonable_encoder + stdlib json) on the same payloads.
+"""
+
+import argparse
+import asyncio
+import time
+
+import orjson
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from benchmarks.common import time_call
+import fast_json
+import main as api
+
+STATE = dict(qtr=3, time_remaining=900, score_home=0, score_away=0, down=4, ydstogo=1,
+             yardline_100=45, score_differential=0, game_seconds_remaining=900,
+             posteam_timeouts_remaining=3, defteam_timeouts_remaining=3)
+
+def endpoints():
+    state = api.GameState(**STATE)
+    calls = {
+        'fourth-down': lambda: api.predict_fourth_down(state),
+        'offensive': lambda: api.predict_offensive(state),
+        'defensive': lambda: api.predict_defensive(state),
+        'personnel': lambda: api.predict_personnel(state),
+        'situational': lambda: api.predict_situational(state),
+        'formation': lambda: api.predict_formation(api.FormationRequest()),
+        'demo/scenarios': lambda: api.list_demo_scenarios(),
+    }
+    needs = {'fourth-down': 'fourth_down_model', 'offensive': 'offensive_model', 'defensive': 'defensive_model',
+             'personnel': 'personnel_model', 'situational': 'situational_model'}
+    return {name: fn for name, fn in calls.items()
+            if name not in needs or needs[name] in api.registry.current.models}
+
+class EncodeTimer:
+    """Accumulates time spent in splice() and FastJSONResponse.render while a handler runs"""
+    def __init__(self):
+        self.seconds = 0.0
+
+    def wrap(self, fn):
+        def timed(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                self.seconds += time.perf_counter() - start
+        return timed
+
+def legacy_encode(obj):
+    """What FastAPI did with a returned dict before: jsonable_encoder, then json.dumps"""
+    return JSONResponse(jsonable_encoder(obj)).body
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeats", type=int, default=2000)
+    args = parser.parse_args()
+
+    api.registry.reload()
+    loop = asyncio.new_event_loop()
+    def run(fn):
+        result = fn()
+        return loop.run_until_complete(result) if asyncio.iscoroutine(result) else result
+
+    timer = EncodeTimer()
+    api.splice = timer.wrap(fast_json.splice)
+    render = fast_json.FastJSONResponse.render
+    fast_json.FastJSONResponse.render = timer.wrap(render)
+
+    print(f"\n🧾 Median µs per call ({args.repeats} repeats); ser% = share of handler latency spent on JSON")
+    print(f"  {'endpoint':15} {'handler':>9} {'compute':>9} | {'before ser':>10} {'ser%':>6} | {'after ser':>9} {'ser%':>6} | speedup")
+    for name, fn in endpoints().items():
+        obj = orjson.loads(run(fn).body)
+        handler = time_call(lambda: run(fn), args.repeats)
+        timer.seconds = 0.0
+        for _ in range(args.repeats):
+            run(fn)
+        after = timer.seconds / args.repeats
+        compute = max(handler - after, 0.0)
+        before = time_call(lambda: legacy_encode(obj), args.repeats)
+        print(f"  {name:15} {handler * 1e6:9.1f} {compute * 1e6:9.1f} | {before * 1e6:10.1f} "
+              f"{before / (compute + before):6.1%} | {after * 1e6:9.1f} {after / handler:6.1%} | "
+              f"{(compute + before) / handler:.2f}x")
+
+    fast_json.FastJSONResponse.render = render
+    loop.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+"""
+Benchmark Suite
+Runs the inference micro-benchmarks and the end-to-end endpoint benchmarks,
+writes one machine-readable JSON report and compares it with a stored
+baseline, flagging p50/p95 latencies that regressed beyond a threshold.
+
+Usage (from backend/):
+    python -m benchmarks.suite --save-baseline          # record on the reference machine
+    python -m benchmarks.suite --fail-on-regression     # exit 1 on any regression
+    python -m benchmarks.suite --only inference --batch-sizes 1,64 --runtimes eager,torchscript
+Baselines are only comparable on the same machine and thread settings; the
+report's meta block records both so a mismatch is called out. For that reason
+no baseline is committed: benchmarks/baseline.json is git-ignored and is
+recorded once on each machine that compares (e.g. the CI runner, before the
+change under test), and --fail-on-regression refuses to pass without one.
+"""
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import torch
+
+from benchmarks import inference, endpoints
+
+BENCH_DIR = Path(__file__).parent
+BASELINE_PATH = BENCH_DIR / "baseline.json"
+REPORT_PATH = BENCH_DIR / "latest.json"
+COMPARED = ('p50_us', 'p95_us')
+THRESHOLD = 0.20
+
+# Fields that identify a row, per section
+ROW_KEYS = {
+    'inference': ('model', 'runtime', 'threads', 'batch'),
+    'endpoints': ('endpoint',),
+}
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=BENCH_DIR).stdout.strip() or None
+    except OSError:
+        return None
+
+def run_meta():
+    return {
+        'created': time.strftime('%Y-%m-%d %H:%M:%S'), 'commit': git_commit(),
+        'python': platform.python_version(), 'torch': torch.__version__,
+        'machine': platform.machine(), 'processor': platform.processor(), 'cpus': os.cpu_count(),
+        'torch_threads': torch.get_num_threads(),
+    }
+
+def row_id(section, row):
+    return " ".join(f"{k}={row[k]}" for k in ROW_KEYS[section])
+
+def compare(report, baseline, threshold):
+    """Rows of {section, id, metric, baseline, current, change} whose change exceeds `threshold`"""
+    regressions, improvements = [], []
+    for section in ROW_KEYS:
+        before = {row_id(section, r): r for r in baseline.get(section, [])}
+        for row in report.get(section, []):
+            old = before.get(row_id(section, row))
+            if old is None:
+                continue
+            for metric in COMPARED:
+                if not old.get(metric):
+                    continue
+                change = row[metric] / old[metric] - 1
+                entry = {'section': section, 'id': row_id(section, row), 'metric': metric,
+                         'baseline': old[metric], 'current': row[metric], 'change': change}
+                if change > threshold:
+                    regressions.append(entry)
+                elif change < -threshold:
+                    improvements.append(entry)
+    return regressions, improvements
+
+def print_comparison(regressions, improvements, baseline, current, threshold):
+    meta = baseline.get('meta', {})
+    print(f"\n📏 Against baseline {meta.get('commit')} ({meta.get('created')}), threshold {threshold:.0%}")
+    for field in ('machine', 'cpus', 'torch', 'torch_threads'):
+        if field in meta and meta[field] != current[field]:
+            print(f"  ⚠️ {field} differs from the baseline ({meta[field]} -> {current[field]}); timings may not compare")
+    for label, rows in (("❌ Regressed", regressions), ("🚀 Improved", improvements)):
+        for r in rows:
+            print(f"  {label} {r['section']}: {r['id']} {r['metric']} "
+                  f"{r['baseline']:.1f} -> {r['current']:.1f} µs ({r['change']:+.0%})")
+    if not regressions and not improvements:
+        print("  ✅ No changes beyond the threshold")
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--only", choices=list(ROW_KEYS), default=None, help="Run one section only")
+    inference.add_arguments(parser)
+    endpoints.add_arguments(parser)
+    parser.add_argument("--out", type=Path, default=REPORT_PATH, help="JSON report path")
+    parser.add_argument("--baseline", type=Path, default=BASELINE_PATH)
+    parser.add_argument("--save-baseline", action="store_true", help="Write this run as the new baseline")
+    parser.add_argument("--threshold", type=float, default=THRESHOLD, help="Relative latency change to flag")
+    parser.add_argument("--fail-on-regression", action="store_true")
+    args = parser.parse_args()
+
+    report = {'meta': run_meta()}
+    if args.only in (None, 'inference'):
+        print("⏱️ Inference micro-benchmarks")
+        report['inference'] = inference.run_from_args(args)
+    if args.only in (None, 'endpoints'):
+        print("\n⏱️ Endpoint benchmarks")
+        report['endpoints'] = endpoints.run_from_args(args)
+
+    with open(args.out, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"\n💾 Report saved to {args.out}")
+
+    if args.save_baseline:
+        with open(args.baseline, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"💾 Baseline saved to {args.baseline}")
+        return
+    if not args.baseline.exists():
+        print(f"ℹ️ No baseline at {args.baseline}; run with --save-baseline to record one")
+        if args.fail_on_regression:
+            # Nothing was compared, so a pass would be meaningless
+            sys.exit(2)
+        return
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    regressions, improvements = compare(report, baseline, args.threshold)
+    print_comparison(regressions, improvements, baseline, report['meta'], args.threshold)
+    if regressions and args.fail_on_regression:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
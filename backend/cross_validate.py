@@ -0,0 +1,255 @@
+"""
+Season-Fold Cross-Validation
+Measures out-of-season behaviour: each fold holds out one whole season and
+trains on the others (or, with --scheme forward, only on earlier seasons).
+Folds are assigned per game_id, so no game's plays straddle the split, and
+run as parallel processes over one memory-mapped copy of the features.
+
+Usage:
+    python cross_validate.py --model win_prob
+    python cross_validate.py --model offensive --scheme forward --workers 4
+"""
+
+import argparse
+import json
+import math
+import os
+import statistics
+import tempfile
+import time
+import multiprocessing as mp
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+import torch
+import torch.nn as nn
+import torch.optim as optim
+from sklearn.preprocessing import LabelEncoder
+
+import train
+from train import DATA_DIR, ENCODED_TARGETS, PATIENCE, SEED, TensorBatcher, build_feature_set, build_model
+from backtest import row_scores
+from data_loader import NFLDataLoader
+from feature_engineering import NFLFeatureEngineer
+from hparam_search import SEARCHABLE
+from model_registry import OUTPUT_HEADS, head_outputs
+from streaming import is_validation_game
+
+EVAL_CHUNK = 65536
+
+# Inherited by forked fold workers: memmap paths and dataset shape
+_CV = {}
+
+def prepare_dataset(name, workdir):
+    """
+    Build one target's raw (unscaled) features, labels, per-row season and
+    early-stopping mask once and write them as .npy files for the folds to map.
+    Scalers are fit per fold on that fold's training rows only.
+    """
+    engineer = NFLFeatureEngineer()
+    print("📥 Loading Data...")
+    clean_pbp = engineer.clean_pbp(NFLDataLoader().load_play_by_play())
+    X, y = build_feature_set(engineer, name, clean_pbp)
+
+    # A game's season comes from its first play, so every play of a game shares one fold
+    game_ids = clean_pbp.loc[X.index, 'game_id']
+    game_season = clean_pbp.groupby('game_id')['season'].first()
+    season = game_ids.map(game_season).to_numpy(dtype=np.int16)
+    del clean_pbp
+
+    num_classes = None
+    if name in ENCODED_TARGETS:
+        encoder = LabelEncoder()
+        y = encoder.fit_transform(y)
+        num_classes = len(encoder.classes_)
+    else:
+        y = y.values
+    arrays = {
+        'X': X.to_numpy(dtype=np.float32),
+        'y': np.asarray(y, dtype=np.float32).reshape(-1, 1),
+        'season': season,
+        # Early-stopping rows inside the training seasons, held out by game
+        'stop': np.asarray(is_validation_game(game_ids.reset_index(drop=True))),
+    }
+    paths = {}
+    for key, arr in arrays.items():
+        paths[key] = os.path.join(workdir, f"{key}.npy")
+        np.save(paths[key], arr)
+    seasons = sorted(int(s) for s in np.unique(season))
+    print(f"🗂️ {name}: {len(X)} rows, {X.shape[1]} features, seasons {seasons} -> {workdir}")
+    return {'paths': paths, 'input_dim': X.shape[1], 'num_classes': num_classes, 'seasons': seasons}
+
+def fold_masks(season, test_season, scheme):
+    """(train, test) row masks for one fold"""
+    test = season == test_season
+    train_rows = season < test_season if scheme == 'forward' else ~test
+    return train_rows, test
+
+def _predict(model, X):
+    """Comparable head outputs (probabilities) in large no-grad slices"""
+    model.eval()
+    name = _CV['name']
+    with torch.no_grad():
+        return np.concatenate([head_outputs(name, model(torch.from_numpy(X[s:s + EVAL_CHUNK])))[0][2]
+                               for s in range(0, len(X), EVAL_CHUNK)])
+
+def season_range(seasons):
+    """'2016-2022' style label for the seasons a fold trained on"""
+    seasons = np.unique(seasons)
+    return f"{seasons.min()}-{seasons.max()}" if len(seasons) else "none"
+
+def run_fold(test_season):
+    """Train on the fold's seasons, early-stop on held-out games, score the test season"""
+    torch.set_num_threads(1)
+    torch.manual_seed(SEED + test_season)
+    name, epochs = _CV['name'], _CV['epochs']
+    data = {key: np.load(path, mmap_mode='r') for key, path in _CV['paths'].items()}
+    binary = _CV['num_classes'] is None
+    kind = OUTPUT_HEADS[name][0][1]
+
+    start = time.perf_counter()
+    season = np.asarray(data['season'])
+    train_rows, test_rows = fold_masks(season, test_season, _CV['scheme'])
+    trained_on = season_range(season[train_rows])
+    stop = np.asarray(data['stop'])
+    fit_idx, stop_idx = np.flatnonzero(train_rows & ~stop), np.flatnonzero(train_rows & stop)
+    test_idx = np.flatnonzero(test_rows)
+
+    # Copy the fold's rows out of the shared map and scale with training-row statistics only
+    X_fit = np.array(data['X'][fit_idx])
+    mean, std = X_fit.mean(axis=0), X_fit.std(axis=0)
+    std[std == 0] = 1.0
+    scale = lambda X: ((X - mean) / std).astype(np.float32)
+    X_fit, X_stop, X_test = scale(X_fit), scale(np.array(data['X'][stop_idx])), scale(np.array(data['X'][test_idx]))
+    y_fit, y_stop, y_test = (np.array(data['y'][idx]) for idx in (fit_idx, stop_idx, test_idx))
+
+    model = build_model(name, _CV['input_dim'], _CV['num_classes'])
+    criterion = nn.BCELoss() if binary else nn.CrossEntropyLoss()
+    target = (lambda b: b) if binary else (lambda b: b.long().view(-1))
+    optimizer = optim.Adam(model.parameters(), lr=train.LEARNING_RATE)
+    scheduler = optim.lr_scheduler.ReduceLROnPlateau(optimizer, 'min', patience=5, factor=0.5)
+    batches = TensorBatcher(torch.from_numpy(X_fit), torch.from_numpy(y_fit), batch_size=train.BATCH_SIZE, shuffle=True)
+    stop_X, stop_y = torch.from_numpy(X_stop), target(torch.from_numpy(y_stop))
+
+    best_val, best_state, bad_epochs, epoch = math.inf, None, 0, 0
+    for epoch in range(1, epochs + 1):
+        model.train()
+        for b_X, b_y in batches:
+            if len(b_X) < 2:  # BatchNorm cannot train on a single row
+                continue
+            optimizer.zero_grad()
+            loss = criterion(model(b_X), target(b_y))
+            loss.backward()
+            optimizer.step()
+        model.eval()
+        with torch.no_grad():
+            val_loss = criterion(model(stop_X), stop_y).item() if len(stop_X) else 0.0
+        scheduler.step(val_loss)
+        if val_loss < best_val:
+            best_val, bad_epochs = val_loss, 0
+            best_state = {k: v.clone() for k, v in model.state_dict().items()}
+        else:
+            bad_epochs += 1
+            if bad_epochs >= PATIENCE:
+                break
+    if best_state is None:
+        # Stop loss never finite (e.g. NaN on a degenerate fold): no weights worth scoring
+        return {'test_season': test_season, 'train_seasons': trained_on, 'status': 'failed',
+                'error': f"stop loss never finite (last {val_loss}) after {epoch} epochs"}
+    model.load_state_dict(best_state)
+    fit_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    truth = y_test.ravel() if binary else y_test.ravel().astype(np.int64)
+    valid, scores = row_scores(kind, _predict(model, X_test), truth)
+    return {
+        'test_season': test_season, 'train_seasons': trained_on, 'status': 'ok',
+        'train_rows': len(fit_idx), 'stop_rows': len(stop_idx),
+        'test_rows': int(valid.sum()), 'epochs': epoch, 'stop_loss': best_val,
+        'accuracy': float(scores['correct'][valid].mean()),
+        'log_loss': float(scores['log_loss'][valid].mean()),
+        'brier': float(scores['brier'][valid].mean()),
+        'fit_seconds': fit_seconds, 'eval_seconds': time.perf_counter() - start,
+    }
+
+def summarise(folds):
+    """Mean/std across folds plus the test-row-weighted (pooled) value per metric"""
+    n = np.array([f['test_rows'] for f in folds], dtype=np.float64)
+    summary = {}
+    for metric in ('accuracy', 'log_loss', 'brier'):
+        values = [f[metric] for f in folds]
+        summary[metric] = {
+            'mean': statistics.mean(values),
+            'std': statistics.stdev(values) if len(values) > 1 else 0.0,
+            'pooled': float(np.dot(values, n) / n.sum()),
+            'worst_season': (max if metric != 'accuracy' else min)(folds, key=lambda f: f[metric])['test_season'],
+        }
+    return summary
+
+def cross_validate(name, scheme='loso', workers=None, epochs=train.EPOCHS, seasons=None, out_path=None):
+    ctx = mp.get_context('fork') if 'fork' in mp.get_all_start_methods() else mp.get_context()
+    wall_start = time.perf_counter()
+
+    with tempfile.TemporaryDirectory(prefix=f"cv_{name}_") as workdir:
+        dataset = prepare_dataset(name, workdir)
+        test_seasons = [s for s in dataset['seasons'] if not seasons or s in seasons]
+        if scheme == 'forward':
+            # The first season has nothing earlier to train on
+            test_seasons = [s for s in test_seasons if s > dataset['seasons'][0]]
+        n_workers = max(1, min(workers or os.cpu_count() or 1, len(test_seasons)))
+        _CV.update(dataset, name=name, epochs=epochs, scheme=scheme)
+        print(f"🔁 {len(test_seasons)} {scheme} folds on {n_workers} processes (up to {epochs} epochs each)")
+
+        folds = []
+        try:
+            with ProcessPoolExecutor(max_workers=n_workers, mp_context=ctx) as pool:
+                futures = {pool.submit(run_fold, s): s for s in test_seasons}
+                for future in as_completed(futures):
+                    try:
+                        f = future.result()
+                    except Exception as e:
+                        f = {'test_season': futures[future], 'status': 'failed', 'error': repr(e)}
+                    folds.append(f)
+                    if f['status'] == 'failed':
+                        print(f"  🔥 {f['test_season']} (trained on {f.get('train_seasons', '?')}) "
+                              f"skipped: {f['error']}")
+                        continue
+                    print(f"  ✅ {f['test_season']} | train {f['train_rows']:>7} rows | acc {f['accuracy']:.4f} | "
+                          f"log-loss {f['log_loss']:.4f} | brier {f['brier']:.4f} | {f['epochs']} ep "
+                          f"in {f['fit_seconds']:.1f}s")
+        finally:
+            _CV.clear()
+
+    folds.sort(key=lambda f: f['test_season'])
+    wall = time.perf_counter() - wall_start
+    scored = [f for f in folds if f['status'] == 'ok']
+    fold_seconds = sum(f['fit_seconds'] + f['eval_seconds'] for f in scored)
+    summary = summarise(scored) if scored else {}
+    report = {'model': name, 'scheme': scheme, 'epochs': epochs, 'workers': n_workers,
+              'folds': folds, 'summary': summary,
+              'timing': {'wall_seconds': wall, 'fold_seconds': fold_seconds}}
+
+    out_path = out_path or DATA_DIR / f"cv_{name}_{scheme}.json"
+    with open(out_path, 'w') as f:
+        json.dump(report, f, indent=2)
+
+    print(f"\n📈 {name} out-of-season ({scheme}, {len(scored)} of {len(folds)} folds scored):")
+    for metric, s in summary.items():
+        print(f"  {metric:>9} | mean {s['mean']:.4f} ± {s['std']:.4f} | pooled {s['pooled']:.4f} | "
+              f"worst {s['worst_season']}")
+    print(f"⏱️ {wall:.1f}s wall for {fold_seconds:.1f}s of fold work ({fold_seconds / wall:.1f}x)")
+    print(f"💾 Results saved to {out_path}")
+    return report
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--model", choices=SEARCHABLE, required=True)
+    parser.add_argument("--scheme", choices=["loso", "forward"], default="loso",
+                        help="loso: train on every other season; forward: only on earlier seasons")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--epochs", type=int, default=train.EPOCHS)
+    parser.add_argument("--seasons", default=None, help="Comma list of test seasons (default: all)")
+    parser.add_argument("--out", default=None)
+    args = parser.parse_args()
+    seasons = [int(s) for s in args.seasons.split(",")] if args.seasons else None
+    cross_validate(args.model, args.scheme, args.workers, args.epochs, seasons, args.out)
@@ -19,11 +19,15 @@ class NFLDataLoader:
         self.cache_dir = Path(cache_dir)
         self.cache_dir.mkdir(exist_ok=True)
 
+    def pbp_cache_file(self, years=range(2018, 2025)):
+        """Path of the cached play-by-play parquet for a year range"""
+        return self.cache_dir / f"pbp_{years.start}_{years.stop-1}.parquet"
+
     def load_play_by_play(self, years=range(2018, 2025), force_reload=False):
         """
         Load play-by-play data with local parquet caching.
         """
-        cache_file = self.cache_dir / f"pbp_{years.start}_{years.stop-1}.parquet"
+        cache_file = self.pbp_cache_file(years)
 
         if cache_file.exists() and not force_reload:
             print(f"Loading cached play-by-play data from {cache_file}")
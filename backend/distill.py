@@ -0,0 +1,153 @@
+"""
+Win Probability Distillation
+Trains the small WinProbabilityStudent on the deep WinProbabilityModel's soft
+outputs over every pbp state, then reports how closely and how well
+calibrated the student follows its teacher.
+
+Usage:
+    python distill.py                     # needs trained win_prob_model.pt + scalers.pkl
+    python distill.py --epochs 20
+Serve the student with WIN_PROB_MODEL=student (see main.py).
+"""
+
+import argparse
+import json
+import statistics
+import time
+
+import joblib
+import numpy as np
+import torch
+import torch.nn as nn
+import torch.optim as optim
+
+import train
+from train import DATA_DIR, MODEL_DIR, DEVICE, TensorBatcher, train_generic_model
+from architectures import WinProbabilityModel, WinProbabilityStudent
+from data_loader import NFLDataLoader
+from feature_engineering import NFLFeatureEngineer
+from feature_specs import FEATURE_SPECS
+from streaming import is_validation_game
+
+STUDENT_FILE = "win_prob_student"
+REPORT_PATH = DATA_DIR / "distill_report.json"
+CALIBRATION_BINS = 10
+PREDICT_BATCH = 65536
+
+def predict(model, X):
+    """Probabilities for a float32 matrix, in large no-grad batches"""
+    model.eval()
+    out = []
+    with torch.no_grad():
+        for start in range(0, len(X), PREDICT_BATCH):
+            out.append(model(torch.from_numpy(X[start:start + PREDICT_BATCH]).to(DEVICE)).cpu().numpy())
+    return np.concatenate(out).ravel()
+
+def brier_score(p, target):
+    return float(np.mean((p - target) ** 2))
+
+def calibration_table(p, target, bins=CALIBRATION_BINS):
+    """Per-bin mean prediction vs mean target, and the count-weighted gap (ECE)"""
+    edges = np.linspace(0, 1, bins + 1)
+    idx = np.clip(np.digitize(p, edges[1:-1]), 0, bins - 1)
+    table, ece = [], 0.0
+    for b in range(bins):
+        mask = idx == b
+        if not mask.any():
+            continue
+        mean_p, mean_t = float(p[mask].mean()), float(target[mask].mean())
+        ece += mask.mean() * abs(mean_p - mean_t)
+        table.append({'bin': f"{edges[b]:.1f}-{edges[b + 1]:.1f}", 'n': int(mask.sum()),
+                      'predicted': mean_p, 'observed': mean_t})
+    return float(ece), table
+
+def single_row_latency(model, input_dim, repeats=500):
+    """Median batch-1 forward time in microseconds on CPU"""
+    model = model.cpu().eval()
+    x = torch.randn(1, input_dim)
+    timings = []
+    with torch.no_grad():
+        for _ in range(repeats):
+            start = time.perf_counter()
+            model(x)
+            timings.append(time.perf_counter() - start)
+    return statistics.median(timings) * 1e6
+
+def load_teacher():
+    scalers = joblib.load(DATA_DIR / "scalers.pkl")
+    teacher = WinProbabilityModel(len(FEATURE_SPECS['win_prob']))
+    teacher.load_state_dict(torch.load(MODEL_DIR / "win_prob_model.pt", map_location='cpu'))
+    return teacher.to(DEVICE).eval(), scalers['win_prob']
+
+def distill(epochs=train.EPOCHS, resume=False):
+    teacher, scaler = load_teacher()
+    loader = NFLDataLoader()
+    engineer = NFLFeatureEngineer()
+
+    print("📥 Loading Data...")
+    clean_pbp = engineer.clean_pbp(loader.load_play_by_play())
+    X, outcome = engineer.get_win_prob_features(clean_pbp)
+    is_val = is_validation_game(clean_pbp.loc[X.index, 'game_id'])
+    del clean_pbp
+
+    X_s = scaler.transform(X.values).astype(np.float32)
+    outcome = outcome.values.astype(np.float32)
+    soft = predict(teacher, X_s).astype(np.float32)
+    print(f"🎓 Teacher labelled {len(X_s):,} states ({is_val.sum():,} in held-out games)")
+
+    # Soft targets in, BCE against the teacher's probabilities
+    def batcher(mask, shuffle):
+        return TensorBatcher(torch.from_numpy(X_s[mask]).to(DEVICE),
+                             torch.from_numpy(soft[mask]).view(-1, 1).to(DEVICE),
+                             shuffle=shuffle)
+    student = WinProbabilityStudent(X_s.shape[1]).to(DEVICE)
+    optimizer = optim.Adam(student.parameters(), lr=train.LEARNING_RATE)
+    scheduler = optim.lr_scheduler.ReduceLROnPlateau(optimizer, 'min', patience=5, factor=0.5)
+    saved_epochs, train.EPOCHS = train.EPOCHS, epochs
+    try:
+        train_generic_model(student, batcher(~is_val, True), batcher(is_val, False), nn.BCELoss(),
+                            optimizer, scheduler, STUDENT_FILE, resume=resume)
+    finally:
+        train.EPOCHS = saved_epochs
+
+    # Held-out games only
+    t_val, y_val = soft[is_val], outcome[is_val]
+    s_val = predict(student, X_s[is_val])
+    t_ece, _ = calibration_table(t_val, y_val)
+    s_ece, s_table = calibration_table(s_val, y_val)
+    fidelity_ece, fidelity_table = calibration_table(s_val, t_val)
+
+    input_dim = X_s.shape[1]
+    report = {
+        'states': int(len(X_s)),
+        'held_out_states': int(is_val.sum()),
+        'brier_vs_teacher': brier_score(s_val, t_val),
+        'max_abs_diff_vs_teacher': float(np.max(np.abs(s_val - t_val))),
+        'ece_vs_teacher': fidelity_ece,
+        'teacher': {'brier': brier_score(t_val, y_val), 'ece': t_ece,
+                    'params': sum(p.numel() for p in teacher.parameters()),
+                    'latency_us': single_row_latency(teacher, input_dim)},
+        'student': {'brier': brier_score(s_val, y_val), 'ece': s_ece,
+                    'params': sum(p.numel() for p in student.parameters()),
+                    'latency_us': single_row_latency(student, input_dim)},
+        'student_calibration': s_table,
+        'student_vs_teacher_calibration': fidelity_table,
+    }
+    with open(REPORT_PATH, 'w') as f:
+        json.dump(report, f, indent=2)
+
+    print(f"\n📏 Student vs teacher (held-out games): Brier {report['brier_vs_teacher']:.5f} | "
+          f"ECE {fidelity_ece:.4f} | max |Δ| {report['max_abs_diff_vs_teacher']:.4f}")
+    print(f"  {'':8} {'Brier':>8} {'ECE':>8} {'params':>8} {'µs/row':>8}   (vs actual outcomes)")
+    for name in ('teacher', 'student'):
+        r = report[name]
+        print(f"  {name:8} {r['brier']:8.4f} {r['ece']:8.4f} {r['params']:8,} {r['latency_us']:8.1f}")
+    print(f"💾 Report saved to {REPORT_PATH}. Serve the student with WIN_PROB_MODEL=student")
+    return report
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--epochs", type=int, default=train.EPOCHS)
+    parser.add_argument("--resume", action="store_true")
+    args = parser.parse_args()
+    distill(epochs=args.epochs, resume=args.resume)
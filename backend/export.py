@@ -0,0 +1,76 @@
+"""
+TorchScript Export for Serving
+Traces every trained model in eval mode, freezes it (weights inlined as
+constants, BatchNorm folded into the graph) and saves standalone graphs to
+models/compiled/ that the API can load without the Python class definitions.
+
+Usage:
+    python export.py          # after train.py; then serve with MODEL_RUNTIME=torchscript
+"""
+
+import argparse
+import sys
+import warnings
+from pathlib import Path
+
+import torch
+
+sys.path.append(str(Path(__file__).parent))
+from model_registry import MODEL_DIR, DATA_DIR, load_artifact_set
+from architectures import WinProbabilityStudent
+from feature_specs import FEATURE_SPECS
+
+def freeze(model, input_dim):
+    """Traced + frozen TorchScript graph of an eval-mode model"""
+    model.eval()
+    example = torch.randn(2, input_dim)
+    with torch.no_grad(), warnings.catch_warnings():
+        warnings.simplefilter("ignore", torch.jit.TracerWarning)
+        return torch.jit.freeze(torch.jit.trace(model, example))
+
+def export_model(model, name, input_dim, out_dir, atol=1e-5):
+    """Trace + freeze one model, check it against eager, save atomically"""
+    frozen = freeze(model, input_dim)
+
+    # Traced graphs must not depend on the example's batch size
+    for batch in (1, 1024):
+        x = torch.randn(batch, input_dim)
+        with torch.no_grad():
+            expected, actual = model(x), frozen(x)
+        expected = expected if isinstance(expected, tuple) else (expected,)
+        actual = actual if isinstance(actual, tuple) else (actual,)
+        for e, a in zip(expected, actual):
+            if not torch.allclose(e, a, atol=atol):
+                raise ValueError(f"{name}: scripted output differs from eager at batch {batch}")
+
+    out_dir.mkdir(parents=True, exist_ok=True)
+    path = out_dir / f"{name}.pt"
+    tmp_path = out_dir / f"{name}.pt.tmp"
+    torch.jit.save(frozen, str(tmp_path))
+    tmp_path.replace(path)
+    print(f"📦 Exported {name} -> {path}")
+    return path
+
+def export_all(model_dir=MODEL_DIR, data_dir=DATA_DIR, out_dir=None):
+    out_dir = out_dir or model_dir / "compiled"
+    # Plain fp32 eager weights, whatever the serving env asks for
+    art = load_artifact_set("export", model_dir, data_dir)
+
+    exported = []
+    for name, model in art.models.items():
+        key = name[:-len('_model')]
+        exported.append(export_model(model, name, len(FEATURE_SPECS[key]), out_dir))
+
+    student_path = model_dir / "win_prob_student.pt"
+    if student_path.exists():
+        student = WinProbabilityStudent(len(FEATURE_SPECS['win_prob']))
+        student.load_state_dict(torch.load(student_path, map_location='cpu'))
+        exported.append(export_model(student, "win_prob_student", len(FEATURE_SPECS['win_prob']), out_dir))
+    return exported
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--out-dir", type=Path, default=None, help="Defaults to models/compiled/")
+    args = parser.parse_args()
+    paths = export_all(out_dir=args.out_dir)
+    print(f"✅ {len(paths)} graphs exported. Serve them with MODEL_RUNTIME=torchscript")
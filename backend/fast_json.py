@@ -0,0 +1,56 @@
+"""
+Fast JSON Responses
+orjson encoding for the prediction endpoints. Static payloads (formation
+templates, demo scenarios) are encoded once at import and spliced into
+responses as bytes; class probabilities are encoded straight from the
+model's float32 output without per-class float() conversion.
+"""
+
+from functools import lru_cache
+
+import orjson
+from fastapi.responses import Response
+
+from demo_scenarios import get_demo_scenarios
+from formation_logic import FORMATION_TEMPLATES
+
+OPTIONS = orjson.OPT_SERIALIZE_NUMPY
+
+class FastJSONResponse(Response):
+    """JSON response that passes pre-encoded bytes through and orjson-encodes anything else"""
+    media_type = "application/json"
+
+    def render(self, content):
+        return content if isinstance(content, bytes) else orjson.dumps(content, option=OPTIONS)
+
+def splice(obj, **fragments):
+    """Encode obj, then append already-encoded JSON values under the given keys"""
+    body = orjson.dumps(obj, option=OPTIONS)
+    if not fragments:
+        return body
+    tail = b",".join(orjson.dumps(key) + b":" + value for key, value in fragments.items())
+    return body[:-1] + (b"," if len(body) > 2 else b"") + tail + b"}"
+
+@lru_cache(maxsize=32)
+def class_keys(encoder):
+    """LabelEncoder classes as plain str (orjson rejects numpy.str_ keys); cached per loaded encoder"""
+    return tuple(str(c) for c in encoder.classes_)
+
+def class_probs(encoder, probs):
+    """{class: probability} with numpy float32 values, encoded by orjson without float() calls"""
+    return dict(zip(class_keys(encoder), probs))
+
+# --- Pre-encoded static payloads ---
+
+FORMATION_JSON = {
+    name: orjson.dumps({"formation_name": name, "players": players})
+    for name, players in FORMATION_TEMPLATES.items()
+}
+
+def formation_json(name):
+    """{"formation_name", "players"} for a formation, as bytes"""
+    cached = FORMATION_JSON.get(name)
+    return cached if cached is not None else orjson.dumps({"formation_name": name, "players": []})
+
+SCENARIOS_JSON = orjson.dumps(get_demo_scenarios())
+SCENARIO_JSON = {s["id"]: orjson.dumps(s) for s in get_demo_scenarios()}
@@ -9,6 +9,8 @@ from sklearn.preprocessing import StandardScaler
 from pathlib import Path
 import joblib
 
+from feature_specs import feature_columns
+
 DATA_DIR = Path(__file__).parent.parent / "data"
 
 class NFLFeatureEngineer:
@@ -34,19 +36,13 @@ class NFLFeatureEngineer:
         """Extract features and targets for 4th down decision model"""
         fd = pbp[pbp['down'] == 4].copy()
         
-        # Define Decision Target
-        def get_decision(row):
-            if row.get('field_goal_attempt') == 1: return 'kick'
-            if row.get('punt_attempt') == 1: return 'punt'
-            return 'go'
-        
-        fd['decision'] = fd.apply(get_decision, axis=1)
+        # Define Decision Target (kick, else punt, else go)
+        fg_attempt = fd['field_goal_attempt'] == 1 if 'field_goal_attempt' in fd else False
+        punt_attempt = fd['punt_attempt'] == 1 if 'punt_attempt' in fd else False
+        fd['decision'] = np.select([fg_attempt, punt_attempt], ['kick', 'punt'], default='go')
         
         # Feature columns per Architecture Diagram
-        features = [
-            'ydstogo', 'yardline_100', 'score_differential',
-            'qtr', 'game_seconds_remaining', 'posteam_timeouts_remaining'
-        ]
+        features = feature_columns('fourth_down')
         
         # Targets: Conversion (binary), FG Success (binary), EPA (float)
         fd['converted'] = ((fd['series_success'] == 1) & (fd['decision'] == 'go')).astype(int)
@@ -55,30 +51,32 @@ class NFLFeatureEngineer:
         df_clean = fd[features + ['decision', 'converted', 'fg_made', 'epa']].dropna(subset=features)
         return df_clean[features], df_clean[['decision', 'converted', 'fg_made', 'epa']]
 
-    def get_win_prob_features(self, pbp):
-        """Extract features and targets for Win Probability model"""
-        # Calculate game winners
-        outcomes = pbp.groupby('game_id').agg({
+    def game_outcomes(self, pbp):
+        """Final score per game -> Series of home_win (1/0) indexed by game_id"""
+        finals = pbp.groupby('game_id').agg({
             'total_home_score': 'last',
-            'total_away_score': 'last',
-            'home_team': 'first'
-        }).reset_index()
-        
-        outcomes['home_win'] = (outcomes['total_home_score'] > outcomes['total_away_score']).astype(int)
-        
-        # Merge back to PBP
-        df = pbp.merge(outcomes[['game_id', 'home_win']], on='game_id', how='left')
+            'total_away_score': 'last'
+        })
+        return (finals['total_home_score'] > finals['total_away_score']).astype(int)
+
+    def get_win_prob_features(self, pbp, outcomes=None):
+        """
+        Extract features and targets for Win Probability model.
+        Pass precomputed `outcomes` (see game_outcomes) when pbp is only a
+        slice of the season, e.g. a streamed chunk.
+        """
+        if outcomes is None:
+            outcomes = self.game_outcomes(pbp)
+        
+        # Map game winners back onto each play (keeps the pbp index, no merged copy)
+        home_win = pbp['game_id'].map(outcomes)
         
         # Target: Did the possession team win?
-        df['posteam_won'] = np.where(df['posteam'] == df['home_team'], df['home_win'], 1 - df['home_win'])
-        
-        features = [
-            'score_differential', 'qtr', 'game_seconds_remaining',
-            'yardline_100', 'down', 'ydstogo',
-            'posteam_timeouts_remaining', 'defteam_timeouts_remaining'
-        ]
+        features = feature_columns('win_prob')
+        df = pbp[features].copy()
+        df['posteam_won'] = np.where(pbp['posteam'] == pbp['home_team'], home_win, 1 - home_win)
         
-        df_clean = df[features + ['posteam_won']].dropna()
+        df_clean = df.dropna()
         return df_clean[features], df_clean['posteam_won']
 
     def get_offensive_features(self, pbp):
@@ -86,22 +84,16 @@ class NFLFeatureEngineer:
         # Filter for relevant plays
         plays = pbp[pbp['play_type'].isin(['run', 'pass'])].copy()
         
-        # Categorize Target
-        def categorize(row):
-            if row['play_type'] == 'run': return 'run'
-            desc = str(row.get('desc', '')).lower()
-            if 'screen' in desc: return 'screen'
-            if 'draw' in desc: return 'draw'
-            if 'play action' in desc or 'play-action' in desc: return 'play_action'
-            return 'pass'
+        # Categorize Target: run, else screen/draw/play action from the description, else pass
+        desc = plays['desc'].astype(str).str.lower() if 'desc' in plays else pd.Series('', index=plays.index)
+        plays['play_category'] = np.select(
+            [plays['play_type'] == 'run',
+             desc.str.contains('screen', regex=False),
+             desc.str.contains('draw', regex=False),
+             desc.str.contains('play action', regex=False) | desc.str.contains('play-action', regex=False)],
+            ['run', 'screen', 'draw', 'play_action'], default='pass')
         
-        plays['play_category'] = plays.apply(categorize, axis=1)
-        
-        features = [
-            'down', 'ydstogo', 'yardline_100', 'score_differential', 
-            'qtr', 'game_seconds_remaining', 'half_seconds_remaining',
-            'red_zone', 'goal_to_go', 'two_min_drill', 'posteam_timeouts_remaining'
-        ]
+        features = feature_columns('offensive')
         
         df = plays[features + ['play_category']].dropna()
         return df[features], df['play_category']
@@ -115,10 +107,7 @@ class NFLFeatureEngineer:
         
         # Add Team Tendencies (Simplified for Demo)
         # In a full system, this would be a historic lookup. Here we use current game context + situation.
-        features = [
-            'down', 'ydstogo', 'yardline_100', 'score_differential', 
-            'qtr', 'game_seconds_remaining', 'red_zone', 'goal_to_go', 'two_min_drill'
-        ]
+        features = feature_columns('defensive')
         
         df = plays[features + ['is_pass']].dropna()
         return df[features], df['is_pass']
@@ -136,23 +125,29 @@ class NFLFeatureEngineer:
         
         # Create a synthetic "Ideal Personnel" based on successful plays
         # This is a simplification for the hackathon "New Work" constraint
-        def assign_personnel(row):
-            # Logic: Short yardage -> Heavy (21/13/22), Long -> Spread (11/10/01)
-            dist = row['ydstogo']
-            if dist <= 2: return '22' # Heavy
-            if dist <= 5: return '12' # Balanced
-            if dist > 8: return '11'  # Passing
-            return '11' # Default
-            
-        df['personnel_group'] = df.apply(assign_personnel, axis=1)
-        
-        features = [
-            'down', 'ydstogo', 'yardline_100', 'score_differential', 'red_zone', 'goal_to_go'
-        ]
+        # Logic: Short yardage -> Heavy (22), medium -> Balanced (12), otherwise Spread (11)
+        dist = df['ydstogo']
+        df['personnel_group'] = np.select([dist <= 2, dist <= 5], ['22', '12'], default='11')
+        
+        features = feature_columns('personnel')
         
         df_clean = df[features + ['personnel_group']].dropna()
         return df_clean[features], df_clean['personnel_group']
 
+    def get_situational_features(self, pbp):
+        """Joint targets (play call, pass/run, personnel) for the multi-task model"""
+        X, play_category = self.get_offensive_features(pbp)
+        _, is_pass = self.get_defensive_features(pbp)
+        _, personnel_group = self.get_personnel_features(pbp, None)
+        
+        # Offensive rows are the strictest dropna, so they index the other two
+        y = pd.DataFrame({
+            'play_category': play_category,
+            'is_pass': is_pass.loc[X.index],
+            'personnel_group': personnel_group.loc[X.index],
+        })
+        return X[feature_columns('situational')], y
+
     def scale_features(self, X, name):
         """Apply and cache StandardScaler for real-time inference"""
         if name not in self.scalers:
@@ -160,6 +155,12 @@ class NFLFeatureEngineer:
             return self.scalers[name].fit_transform(X)
         return self.scalers[name].transform(X)
 
+    def partial_fit_scaler(self, X, name):
+        """Accumulate scaler statistics chunk by chunk (streaming first pass)"""
+        if name not in self.scalers:
+            self.scalers[name] = StandardScaler()
+        self.scalers[name].partial_fit(X)
+
     def save_artifacts(self):
         """Save scalers for backend inference"""
         joblib.dump(self.scalers, DATA_DIR / "scalers.pkl")
@@ -0,0 +1,122 @@
+"""
+Feature Specification Registry for the NFL AI Coach
+Single source of truth for the feature order of every model, used both to
+select training columns and to build serving inputs from GameState objects.
+"""
+
+import threading
+from operator import attrgetter
+
+import numpy as np
+
+# Column order per model. Training (feature_engineering.py), the fitted
+# scalers and the serving extractors all read from this table.
+FEATURE_SPECS = {
+    'fourth_down': (
+        'ydstogo', 'yardline_100', 'score_differential',
+        'qtr', 'game_seconds_remaining', 'posteam_timeouts_remaining'
+    ),
+    'win_prob': (
+        'score_differential', 'qtr', 'game_seconds_remaining',
+        'yardline_100', 'down', 'ydstogo',
+        'posteam_timeouts_remaining', 'defteam_timeouts_remaining'
+    ),
+    'offensive': (
+        'down', 'ydstogo', 'yardline_100', 'score_differential',
+        'qtr', 'game_seconds_remaining', 'half_seconds_remaining',
+        'red_zone', 'goal_to_go', 'two_min_drill', 'posteam_timeouts_remaining'
+    ),
+    'defensive': (
+        'down', 'ydstogo', 'yardline_100', 'score_differential',
+        'qtr', 'game_seconds_remaining', 'red_zone', 'goal_to_go', 'two_min_drill'
+    ),
+    'personnel': (
+        'down', 'ydstogo', 'yardline_100', 'score_differential', 'red_zone', 'goal_to_go'
+    ),
+    # Multi-task model: the offensive set already covers defensive + personnel
+    'situational': (
+        'down', 'ydstogo', 'yardline_100', 'score_differential',
+        'qtr', 'game_seconds_remaining', 'half_seconds_remaining',
+        'red_zone', 'goal_to_go', 'two_min_drill', 'posteam_timeouts_remaining'
+    ),
+}
+
+def feature_columns(name):
+    """Ordered list of feature columns for a model (training-side view)"""
+    return list(FEATURE_SPECS[name])
+
+def select_features(df, name):
+    """Select a model's feature columns from a DataFrame in spec order"""
+    return df[feature_columns(name)]
+
+class FeatureExtractor:
+    """
+    Precompiled serving extractor for one model.
+    Reads the spec'd attributes off GameState-like objects straight into a
+    preallocated float32 buffer and applies the fitted StandardScaler in place.
+    Buffers are per-thread, so the returned array is only valid until the next
+    call on the same thread.
+    """
+    def __init__(self, name, scaler=None, max_batch=64):
+        self.name = name
+        self.columns = FEATURE_SPECS[name]
+        self.n_features = len(self.columns)
+        self.max_batch = max_batch
+
+        getter = attrgetter(*self.columns)
+        # attrgetter with a single name returns a scalar, not a tuple
+        self._getter = getter if self.n_features > 1 else (lambda obj: (getter(obj),))
+
+        self._mean = None
+        self._inv_scale = None
+        if scaler is not None:
+            n_in = getattr(scaler, 'n_features_in_', scaler.mean_.shape[0])
+            if n_in != self.n_features:
+                raise ValueError(
+                    f"Scaler for '{name}' expects {n_in} features, spec defines {self.n_features}"
+                )
+            self._mean = scaler.mean_.astype(np.float32)
+            self._inv_scale = (1.0 / scaler.scale_).astype(np.float32)
+
+        self._local = threading.local()
+
+    def _buffer(self, n):
+        buf = getattr(self._local, 'buf', None)
+        if buf is None or buf.shape[0] < n:
+            buf = np.empty((max(n, self.max_batch), self.n_features), dtype=np.float32)
+            self._local.buf = buf
+        return buf[:n]
+
+    def _scale(self, out):
+        if self._mean is not None:
+            np.subtract(out, self._mean, out=out)
+            np.multiply(out, self._inv_scale, out=out)
+        return out
+
+    def transform_one(self, state):
+        """Scaled (1, n_features) float32 view for a single state"""
+        out = self._buffer(1)
+        out[0] = self._getter(state)
+        return self._scale(out)
+
+    def extract(self, states):
+        """Unscaled (len(states), n_features) float32 view for many states"""
+        getter = self._getter
+        out = self._buffer(len(states))
+        for i, state in enumerate(states):
+            out[i] = getter(state)
+        return out
+
+    def transform(self, states):
+        """Scaled (len(states), n_features) float32 view for many states"""
+        return self._scale(self.extract(states))
+
+    def scale_inplace(self, X):
+        """Scale a caller-owned raw float32 matrix in place (large batches skip the thread buffer)"""
+        return self._scale(X)
+
+    def transform_array(self, X):
+        """Scale an already-ordered raw feature matrix (e.g. from a DataFrame)"""
+        out = self._buffer(len(X))
+        out[...] = X
+        return self._scale(out)
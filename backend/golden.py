@@ -0,0 +1,224 @@
+"""
+Golden-Output Regression Check
+Records a fixed set of raw model inputs (rows sampled from pbp plus every
+demo scenario) together with the outputs of the current artifacts, then
+re-runs the serving inference path (FeatureExtractor scaling + model) over
+them in one batch per model and fails on drift beyond a tolerance.
+
+Record after (re)training, check after touching the inference path:
+    python golden.py --record
+    python golden.py --check
+    python golden.py --check --runtime torchscript --tol win_prob=1e-4
+The golden file is a compressed .npz next to the weights it was recorded from.
+models/golden.npz is committed with the weights and checked by
+tests/test_golden.py. It is recorded with --synthetic (rows drawn from each
+feature's football range, no pbp cache needed). Models whose scaler or encoder
+is not on disk are checked on unscaled inputs.
+    python golden.py --record --synthetic --rows 2000
+"""
+
+import argparse
+import hashlib
+import json
+import sys
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+import joblib
+import numpy as np
+import torch
+
+from demo_scenarios import get_demo_scenarios
+from model_registry import MODEL_DIR, DATA_DIR, artifact_paths, load_artifact_set, head_outputs, decisions
+
+GOLDEN_PATH = MODEL_DIR / "golden.npz"
+GOLDEN_ROWS = 100_000
+DEFAULT_ATOL = 1e-5
+
+def weight_digests(model_dir, data_dir, win_prob_model):
+    """
+    Hash of each model's weight values plus its scaler statistics, so a
+    re-saved but unchanged checkpoint still matches while a retrain does not.
+    """
+    scaler_path = artifact_paths(model_dir, data_dir)["scalers.pkl"]
+    scalers = joblib.load(scaler_path) if scaler_path.exists() else {}
+    weights = {path.stem[:-len('_model')]: path for path in sorted(model_dir.glob("*_model.pt"))}
+    if win_prob_model == 'student' and (model_dir / "win_prob_student.pt").exists():
+        weights['win_prob'] = model_dir / "win_prob_student.pt"
+
+    digests = {}
+    for key, path in weights.items():
+        h = hashlib.sha256()
+        for name, tensor in sorted(torch.load(path, map_location='cpu').items()):
+            h.update(name.encode())
+            h.update(tensor.cpu().contiguous().numpy().tobytes())
+        if key in scalers:
+            h.update(np.asarray(scalers[key].mean_, dtype=np.float64).tobytes())
+            h.update(np.asarray(scalers[key].scale_, dtype=np.float64).tobytes())
+        digests[key] = h.hexdigest()
+    return digests
+
+def scenario_states():
+    """Demo scenario states with the derived flags clean_pbp would add"""
+    states = []
+    for scenario in get_demo_scenarios():
+        s = dict(scenario['state'])
+        s.setdefault('half_seconds_remaining', s['game_seconds_remaining'] % 1800)
+        s.setdefault('red_zone', int(s['yardline_100'] <= 20))
+        s.setdefault('goal_to_go', int(s['yardline_100'] <= 10))
+        s.setdefault('two_min_drill', int(s['game_seconds_remaining'] <= 120 and s['qtr'] in (2, 4)))
+        states.append(SimpleNamespace(**s))
+    return states
+
+def sample_inputs(keys, extractors, rows, seed):
+    """Raw float32 inputs per model: `rows` sampled pbp rows, then the demo scenarios"""
+    from data_loader import NFLDataLoader
+    from feature_engineering import NFLFeatureEngineer
+    from train import build_feature_set
+
+    engineer = NFLFeatureEngineer()
+    clean = engineer.clean_pbp(NFLDataLoader().load_play_by_play())
+    states = scenario_states()
+    inputs = {}
+    for key in keys:
+        X, _ = build_feature_set(engineer, key, clean)
+        if len(X) > rows:
+            X = X.sample(rows, random_state=seed)
+        inputs[key] = np.concatenate([X.to_numpy(dtype=np.float32),
+                                      extractors[key].extract(states).copy()])
+    return inputs, len(states)
+
+# Inclusive value range per raw feature for --synthetic inputs
+COLUMN_RANGES = {
+    'down': (1, 4), 'ydstogo': (1, 20), 'yardline_100': (1, 99), 'score_differential': (-28, 28),
+    'qtr': (1, 5), 'game_seconds_remaining': (0, 3600), 'half_seconds_remaining': (0, 1800),
+    'posteam_timeouts_remaining': (0, 3), 'defteam_timeouts_remaining': (0, 3),
+}
+
+def synthetic_inputs(keys, extractors, rows, seed):
+    """Raw float32 inputs per model without the pbp cache: random situations, then the demo scenarios"""
+    rng = np.random.default_rng(seed)
+    raw = {col: rng.integers(lo, hi + 1, rows) for col, (lo, hi) in COLUMN_RANGES.items()}
+    raw['red_zone'] = (raw['yardline_100'] <= 20).astype(int)
+    raw['goal_to_go'] = (raw['yardline_100'] <= 10).astype(int)
+    raw['two_min_drill'] = ((raw['game_seconds_remaining'] <= 120) & np.isin(raw['qtr'], [2, 4])).astype(int)
+    states = scenario_states()
+    inputs = {}
+    for key in keys:
+        X = np.stack([raw[col] for col in extractors[key].columns], axis=1).astype(np.float32)
+        inputs[key] = np.concatenate([X, extractors[key].extract(states).copy()])
+    return inputs, len(states)
+
+def run_models(art, inputs):
+    """One batch per model through the serving path -> (flattened outputs, head layout)"""
+    outputs, layouts = {}, {}
+    with torch.no_grad():
+        for key, X in inputs.items():
+            scaled = art.extractors[key].scale_inplace(X.copy())
+            heads = head_outputs(key, art.models[f"{key}_model"](torch.from_numpy(scaled)))
+            outputs[key] = np.concatenate([a.reshape(len(X), -1) for _, _, a in heads], axis=1).astype(np.float32)
+            layouts[key] = [[head, kind, a.reshape(len(X), -1).shape[1]] for head, kind, a in heads]
+    return outputs, layouts
+
+def record(path, model_dir, data_dir, rows, seed, win_prob_model, synthetic=False):
+    art = load_artifact_set("golden", model_dir, data_dir, win_prob_model=win_prob_model, strict=False)
+    keys = [name[:-len('_model')] for name in art.models]
+    sample = synthetic_inputs if synthetic else sample_inputs
+    inputs, n_scenarios = sample(keys, art.extractors, rows, seed)
+    outputs, layouts = run_models(art, inputs)
+    digests = weight_digests(model_dir, data_dir, win_prob_model)
+    meta = {
+        'created': time.strftime('%Y-%m-%d %H:%M:%S'), 'win_prob_model': win_prob_model,
+        'scenarios': n_scenarios, 'inputs': 'synthetic' if synthetic else 'pbp', 'heads': layouts,
+        'columns': {key: list(art.extractors[key].columns) for key in keys},
+        'weights': {key: digests[key] for key in keys if key in digests},
+    }
+    arrays = {'meta': np.frombuffer(json.dumps(meta).encode(), dtype=np.uint8)}
+    for key in keys:
+        arrays[f"{key}.inputs"], arrays[f"{key}.outputs"] = inputs[key], outputs[key]
+    np.savez_compressed(path, **arrays)
+    total = sum(len(x) for x in inputs.values())
+    print(f"💾 Golden set for {keys} ({total:,} rows) saved to {path} ({path.stat().st_size / 1024:.0f} KB)")
+
+def check(path, model_dir, data_dir, tolerances, atol, runtime, quantize):
+    """Compare current outputs with the golden set; returns True when every model passes"""
+    golden = np.load(path)
+    meta = json.loads(golden['meta'].tobytes())
+    art = load_artifact_set("golden-check", model_dir, data_dir, quantize=quantize, runtime=runtime,
+                            win_prob_model=meta['win_prob_model'], strict=False)
+    keys = list(meta['heads'])
+    digests = weight_digests(model_dir, data_dir, meta['win_prob_model'])
+
+    ok = True
+    missing = [k for k in keys if f"{k}_model" not in art.models]
+    for key in missing:
+        print(f"❌ {key}: in the golden set but not loaded")
+    ok &= not missing
+    keys = [k for k in keys if k not in missing]
+
+    start = time.perf_counter()
+    outputs, _ = run_models(art, {key: golden[f"{key}.inputs"] for key in keys})
+    elapsed = time.perf_counter() - start
+
+    print(f"\n🔍 Golden check ({runtime}{', int8' if quantize else ''}) against {path.name} recorded {meta['created']}")
+    for key in keys:
+        tol = tolerances.get(key, atol)
+        expected, actual = golden[f"{key}.outputs"], outputs[key]
+        if key in meta['weights'] and digests.get(key) != meta['weights'][key]:
+            print(f"  ❌ {key}: weights or scaler changed since recording; re-record with --record")
+            ok = False
+            continue
+        if expected.shape != actual.shape:
+            print(f"  ❌ {key}: output shape {actual.shape} != golden {expected.shape}")
+            ok = False
+            continue
+        diff = np.abs(actual - expected)
+        over = int((diff > tol).any(axis=1).sum())
+        flips, offset = [], 0
+        for head, kind, width in meta['heads'][key]:
+            d_e = decisions(kind, expected[:, offset:offset + width])
+            d_a = decisions(kind, actual[:, offset:offset + width])
+            if d_e is not None:
+                flips.append(f"{head} {int((d_e != d_a).sum())}")
+            offset += width
+        passed = over == 0
+        ok &= passed
+        print(f"  {'✅' if passed else '❌'} {key:>11} | {len(expected):>7,} rows | max dev {diff.max():.2e} "
+              f"| mean {diff.mean():.2e} | {over} rows > {tol:g} | flips: {', '.join(flips) or 'n/a'}")
+    print(f"⏱️ {sum(len(golden[f'{k}.inputs']) for k in keys):,} rows re-scored in {elapsed:.2f}s")
+    return ok
+
+def parse_tolerances(items):
+    tolerances = {}
+    for item in items or []:
+        key, _, value = item.partition("=")
+        tolerances[key] = float(value)
+    return tolerances
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    mode = parser.add_mutually_exclusive_group(required=True)
+    mode.add_argument("--record", action="store_true", help="Record golden outputs from the current artifacts")
+    mode.add_argument("--check", action="store_true", help="Fail (exit 1) on drift from the golden outputs")
+    parser.add_argument("--golden", type=Path, default=GOLDEN_PATH)
+    parser.add_argument("--rows", type=int, default=GOLDEN_ROWS, help="pbp rows sampled per model when recording")
+    parser.add_argument("--synthetic", action="store_true", help="Record on random situations instead of pbp rows")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--win-prob-model", default="teacher", choices=["teacher", "student"])
+    parser.add_argument("--runtime", default="eager", choices=["eager", "torchscript"])
+    parser.add_argument("--quantize", action="store_true")
+    parser.add_argument("--atol", type=float, default=DEFAULT_ATOL)
+    parser.add_argument("--tol", action="append", metavar="MODEL=ATOL", help="Per-model tolerance override")
+    args = parser.parse_args()
+
+    if args.record:
+        record(args.golden, MODEL_DIR, DATA_DIR, args.rows, args.seed, args.win_prob_model, args.synthetic)
+    else:
+        if not args.golden.exists():
+            print(f"❌ No golden file at {args.golden}; run with --record first")
+            sys.exit(1)
+        passed = check(args.golden, MODEL_DIR, DATA_DIR, parse_tolerances(args.tol), args.atol,
+                       args.runtime, args.quantize)
+        print("✅ No drift" if passed else "❌ Drift detected")
+        sys.exit(0 if passed else 1)
@@ -0,0 +1,298 @@
+"""
+Hyperparameter Search for the MLP Architectures
+Runs random-search trials as parallel CPU processes over one memory-mapped
+copy of a target's features, prunes trials whose validation loss trails the
+median of earlier trials, and reports accuracy against batch-1 latency.
+
+Usage:
+    python hparam_search.py --model offensive --trials 24
+    python hparam_search.py --model defensive --trial-rows 100000 --epochs 10 --workers 4
+"""
+
+import argparse
+import inspect
+import json
+import math
+import os
+import statistics
+import tempfile
+import time
+import multiprocessing as mp
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+import torch
+import torch.nn as nn
+import torch.optim as optim
+from sklearn.preprocessing import LabelEncoder
+
+import train
+from train import (
+    DATA_DIR, ENCODED_TARGETS, PATIENCE, SEED,
+    TensorBatcher, build_feature_set, build_model
+)
+from data_loader import NFLDataLoader
+from feature_engineering import NFLFeatureEngineer
+
+# Single-output targets; fourth_down's weighted three-head loss has no accuracy to trade off
+SEARCHABLE = ('win_prob', 'offensive', 'defensive', 'personnel')
+
+# Random-search space. Dropout tapers by 0.1 per layer and is off before the output layer.
+HIDDEN_CHOICES = [
+    (32, 16), (64, 32), (64, 32, 16), (96, 48, 24),
+    (128, 64, 32), (128, 64, 32, 16), (256, 128, 64),
+]
+DROPOUT_CHOICES = [0.0, 0.1, 0.2, 0.3]
+BATCH_SIZE_CHOICES = [128, 256, 512, 1024]
+LR_RANGE = (1e-4, 1e-2)
+
+PRUNE_WARMUP = 3        # epochs every trial runs before it can be pruned
+PRUNE_MIN_TRIALS = 4    # reports needed at an epoch before its median is trusted
+EVAL_CHUNK = 8192       # rows per validation slice read from the memmap
+LATENCY_REPEATS = 300
+
+# Inherited by forked trial workers: memmap paths and dataset shape
+_SEARCH = {}
+
+def default_config(name):
+    """The hand-picked architecture and train.py constants, as trial 0"""
+    params = inspect.signature(type(build_model(name, 1, 2))).parameters
+    return {'hidden_dims': list(params['hidden_dims'].default),
+            'dropouts': list(params['dropouts'].default),
+            'batch_size': train.BATCH_SIZE, 'lr': train.LEARNING_RATE}
+
+def sample_config(rng):
+    hidden = HIDDEN_CHOICES[rng.integers(len(HIDDEN_CHOICES))]
+    rate = DROPOUT_CHOICES[rng.integers(len(DROPOUT_CHOICES))]
+    dropouts = [round(max(rate - 0.1 * i, 0.0), 2) for i in range(len(hidden) - 1)] + [0.0]
+    return {
+        'hidden_dims': list(hidden),
+        'dropouts': dropouts,
+        'batch_size': int(BATCH_SIZE_CHOICES[rng.integers(len(BATCH_SIZE_CHOICES))]),
+        'lr': float(math.exp(rng.uniform(math.log(LR_RANGE[0]), math.log(LR_RANGE[1])))),
+    }
+
+def prepare_dataset(name, workdir):
+    """
+    Build, scale and split one target's features once, then write them as
+    .npy files that every trial process maps read-only.
+    """
+    loader = NFLDataLoader()
+    engineer = NFLFeatureEngineer()
+    print("📥 Loading Data...")
+    clean_pbp = engineer.clean_pbp(loader.load_play_by_play())
+    X, y = build_feature_set(engineer, name, clean_pbp)
+    del clean_pbp
+
+    X_s = engineer.scale_features(X.values, name).astype(np.float32)
+    num_classes = None
+    if name in ENCODED_TARGETS:
+        encoder = LabelEncoder()
+        y = encoder.fit_transform(y)
+        num_classes = len(encoder.classes_)
+    else:
+        y = y.values
+    y = np.asarray(y, dtype=np.float32).reshape(-1, 1)
+
+    # Same seeded 80/20 row split as train.split_batchers
+    n = len(X_s)
+    perm = torch.randperm(n, generator=torch.Generator().manual_seed(SEED)).numpy()
+    n_train = int(0.8 * n)
+    paths = {}
+    for split, idx in (('train', perm[:n_train]), ('val', perm[n_train:])):
+        for part, arr in (('X', X_s), ('y', y)):
+            path = os.path.join(workdir, f"{part}_{split}.npy")
+            np.save(path, arr[np.sort(idx)])
+            paths[f"{part}_{split}"] = path
+    print(f"🗂️ {name}: {n_train} train / {n - n_train} val rows, {X_s.shape[1]} features -> {workdir}")
+    return {'paths': paths, 'input_dim': X_s.shape[1], 'num_classes': num_classes}
+
+def _arrays():
+    return {key: np.load(path, mmap_mode='r') for key, path in _SEARCH['paths'].items()}
+
+def _evaluate(model, criterion, X_val, y_val, binary):
+    """Validation loss and accuracy, read from the memmap in fixed slices"""
+    model.eval()
+    loss, correct = 0.0, 0
+    with torch.no_grad():
+        for start in range(0, len(X_val), EVAL_CHUNK):
+            v_X = torch.from_numpy(np.array(X_val[start:start + EVAL_CHUNK]))
+            v_y = torch.from_numpy(np.array(y_val[start:start + EVAL_CHUNK]))
+            out = model(v_X)
+            if binary:
+                loss += criterion(out, v_y).item() * len(v_X)
+                correct += ((out >= 0.5).float() == v_y).sum().item()
+            else:
+                labels = v_y.long().view(-1)
+                loss += criterion(out, labels).item() * len(v_X)
+                correct += (out.argmax(dim=1) == labels).sum().item()
+    return loss / len(X_val), correct / len(X_val)
+
+def _report(history, lock, epoch, value):
+    """Record a trial's best-so-far val loss; True if it trails the median at this epoch"""
+    with lock:
+        seen = history.get(epoch, [])
+        prune = (epoch > PRUNE_WARMUP and len(seen) >= PRUNE_MIN_TRIALS
+                 and value > statistics.median(seen))
+        history[epoch] = seen + [value]
+    return prune
+
+def run_trial(trial_id, config, history, lock):
+    """Train one configuration; returns its metrics and (unless pruned) its weights"""
+    torch.set_num_threads(1)
+    torch.manual_seed(SEED + trial_id)
+    name, epochs, trial_rows = _SEARCH['name'], _SEARCH['epochs'], _SEARCH['trial_rows']
+    data = _arrays()
+    binary = _SEARCH['num_classes'] is None
+
+    # Each trial trains on its own random subset, copied out of the shared map
+    n_train = len(data['X_train'])
+    rows = n_train if not trial_rows else min(trial_rows, n_train)
+    idx = np.sort(np.random.default_rng(SEED + trial_id).choice(n_train, rows, replace=False))
+    batches = TensorBatcher(torch.from_numpy(data['X_train'][idx]), torch.from_numpy(data['y_train'][idx]),
+                            batch_size=config['batch_size'], shuffle=True)
+
+    model = build_model(name, _SEARCH['input_dim'], _SEARCH['num_classes'],
+                        hidden_dims=tuple(config['hidden_dims']), dropouts=tuple(config['dropouts']))
+    criterion = nn.BCELoss() if binary else nn.CrossEntropyLoss()
+    optimizer = optim.Adam(model.parameters(), lr=config['lr'])
+    scheduler = optim.lr_scheduler.ReduceLROnPlateau(optimizer, 'min', patience=5, factor=0.5)
+
+    start = time.perf_counter()
+    best_val, best_acc, best_state, bad_epochs = math.inf, 0.0, None, 0
+    status, epoch = 'complete', 0
+    for epoch in range(1, epochs + 1):
+        model.train()
+        for b_X, b_y in batches:
+            if len(b_X) < 2:  # BatchNorm cannot train on a single row
+                continue
+            optimizer.zero_grad()
+            out = model(b_X)
+            loss = criterion(out, b_y) if binary else criterion(out, b_y.long().view(-1))
+            loss.backward()
+            optimizer.step()
+
+        val_loss, val_acc = _evaluate(model, criterion, data['X_val'], data['y_val'], binary)
+        scheduler.step(val_loss)
+        if val_loss < best_val:
+            best_val, best_acc, bad_epochs = val_loss, val_acc, 0
+            best_state = {k: v.clone() for k, v in model.state_dict().items()}
+        else:
+            bad_epochs += 1
+        if _report(history, lock, epoch, best_val) and epoch < epochs:
+            status = 'pruned'
+            break
+        if bad_epochs >= PATIENCE:
+            break
+
+    return {
+        'trial': trial_id, 'status': status, 'config': config, 'epochs': epoch,
+        'train_rows': rows, 'val_loss': best_val, 'accuracy': best_acc,
+        'params': sum(p.numel() for p in model.parameters()),
+        'train_seconds': time.perf_counter() - start,
+        'state': best_state if status == 'complete' else None,
+    }
+
+def measure_latency(model, input_dim, repeats=LATENCY_REPEATS):
+    """Median single-row forward time in microseconds, one thread, eval mode"""
+    model.eval()
+    x = torch.randn(1, input_dim)
+    timings = []
+    with torch.no_grad():
+        for _ in range(20):
+            model(x)
+        for _ in range(repeats):
+            start = time.perf_counter()
+            model(x)
+            timings.append(time.perf_counter() - start)
+    return statistics.median(timings) * 1e6
+
+def pareto_frontier(results):
+    """Completed trials not beaten on both accuracy and latency by another trial"""
+    done = sorted((r for r in results if r['status'] == 'complete'),
+                  key=lambda r: (r['latency_us'], -r['accuracy']))
+    frontier, best_acc = [], -1.0
+    for r in done:
+        if r['accuracy'] > best_acc:
+            frontier.append(r)
+            best_acc = r['accuracy']
+    return frontier
+
+def search(name, trials=24, workers=None, trial_rows=200_000, epochs=15, seed=SEED, out_path=None):
+    rng = np.random.default_rng(seed)
+    configs = [default_config(name)] + [sample_config(rng) for _ in range(trials - 1)]
+    n_workers = max(1, min(workers or os.cpu_count() or 1, len(configs)))
+    ctx = mp.get_context('fork') if 'fork' in mp.get_all_start_methods() else mp.get_context()
+
+    with tempfile.TemporaryDirectory(prefix=f"hparam_{name}_") as workdir:
+        dataset = prepare_dataset(name, workdir)
+        _SEARCH.update(dataset, name=name, epochs=epochs, trial_rows=trial_rows)
+        print(f"🔎 {len(configs)} trials on {n_workers} processes "
+              f"({trial_rows or 'all'} rows x up to {epochs} epochs each)")
+
+        results = []
+        with ctx.Manager() as manager:
+            history, lock = manager.dict(), manager.Lock()
+            try:
+                with ProcessPoolExecutor(max_workers=n_workers, mp_context=ctx) as pool:
+                    futures = {pool.submit(run_trial, i, c, history, lock): i for i, c in enumerate(configs)}
+                    for future in as_completed(futures):
+                        trial_id = futures[future]
+                        try:
+                            r = future.result()
+                        except Exception as e:
+                            # A bad sampled config or a killed worker loses one trial, not the search
+                            results.append({'trial': trial_id, 'status': 'failed', 'config': configs[trial_id],
+                                            'error': repr(e), 'state': None})
+                            print(f"  🔥 trial {trial_id:>3} | {configs[trial_id]['hidden_dims']} failed: {e!r}")
+                            continue
+                        results.append(r)
+                        icon = "✂️" if r['status'] == 'pruned' else "✅"
+                        print(f"  {icon} trial {r['trial']:>3} | {r['config']['hidden_dims']} "
+                              f"bs {r['config']['batch_size']} lr {r['config']['lr']:.1e} | "
+                              f"val {r['val_loss']:.4f} acc {r['accuracy']:.3f} | {r['epochs']} ep")
+            finally:
+                _SEARCH.clear()
+
+    # Latency measured here, one trial at a time, so trials don't contend for cores
+    torch.set_num_threads(1)
+    for r in results:
+        state = r.pop('state')
+        r['latency_us'] = None
+        if state is not None:
+            model = build_model(name, dataset['input_dim'], dataset['num_classes'],
+                                hidden_dims=tuple(r['config']['hidden_dims']),
+                                dropouts=tuple(r['config']['dropouts']))
+            model.load_state_dict(state)
+            r['latency_us'] = measure_latency(model, dataset['input_dim'])
+
+    results.sort(key=lambda r: r['trial'])
+    frontier = pareto_frontier(results)
+    for r in results:
+        r['frontier'] = r in frontier
+
+    out_path = out_path or DATA_DIR / f"hparam_{name}.json"
+    with open(out_path, 'w') as f:
+        json.dump({'model': name, 'trials': results}, f, indent=2)
+
+    pruned = sum(r['status'] == 'pruned' for r in results)
+    failed = sum(r['status'] == 'failed' for r in results)
+    print(f"\n📈 Latency/accuracy frontier for {name} ({pruned}/{len(results)} pruned, {failed} failed):")
+    for r in frontier:
+        print(f"  trial {r['trial']:>3} | acc {r['accuracy']:.4f} | {r['latency_us']:7.1f} µs | "
+              f"{r['params']:>7} params | {r['config']}")
+    print(f"💾 Results saved to {out_path}")
+    return results
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--model", choices=SEARCHABLE, required=True)
+    parser.add_argument("--trials", type=int, default=24, help="Trial 0 is the current hand-picked config")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--trial-rows", type=int, default=200_000,
+                        help="Training rows sampled per trial (0 = all)")
+    parser.add_argument("--epochs", type=int, default=15, help="Max epochs per trial")
+    parser.add_argument("--seed", type=int, default=SEED)
+    parser.add_argument("--out", default=None)
+    args = parser.parse_args()
+    search(args.model, args.trials, args.workers, args.trial_rows, args.epochs, args.seed, args.out)
@@ -0,0 +1,148 @@
+"""
+Incremental First-Layer Inference for Live Games
+Successive queries for one game mostly differ only in the clock. Every net
+starts Linear -> BatchNorm, which in eval mode is one affine map of the raw
+features once the scaler is folded in too: h = A @ x + c. A session caches
+h per game and model, so a clock tick updates it with A[:, j] * delta_j
+instead of re-extracting, scaling and running the first layer, and the rest
+of the network runs from h. A request whose features did not change at all
+(e.g. only the play clock moved) reuses the cached outputs.
+
+Any other feature change, a new artifact version, or REFRESH_EVERY deltas
+in a row (bounding float drift) recompute h in full. Models without a plain
+leading Linear (TorchScript graphs, int8 quantized) use the normal path.
+"""
+
+import copy
+from collections import OrderedDict
+
+import numpy as np
+import torch
+import torch.nn as nn
+
+# Features a session updates by column deltas; anything else recomputes h in full
+INCREMENTAL_FEATURES = ('game_seconds_remaining', 'half_seconds_remaining')
+REFRESH_EVERY = 256
+MAX_SESSIONS = 512
+
+class FoldedInput:
+    """Scaler + first Linear (+ BatchNorm) of one model as h = A @ x_raw + c, and the net after it"""
+    def __init__(self, A, c, tail, columns):
+        self.A = A                  # (width, n_features) float64
+        self.A_T = A.T.copy()       # row j is column j of A, contiguous
+        self.c = c
+        self.tail = tail
+        self.incremental = {columns.index(f) for f in INCREMENTAL_FEATURES if f in columns}
+
+    def full(self, x):
+        return self.A @ x + self.c
+
+def fold_first_layer(model, scaler, columns):
+    """
+    FoldedInput for an eval-mode eager model whose first submodule is a
+    Sequential starting with nn.Linear (every net in architectures.py);
+    None for anything else.
+    """
+    if not isinstance(model, nn.Module) or isinstance(model, torch.jit.ScriptModule):
+        return None
+    name, seq = next(iter(model.named_children()), (None, None))
+    if not isinstance(seq, nn.Sequential) or not len(seq) or type(seq[0]) is not nn.Linear:
+        return None
+
+    linear = seq[0]
+    W = linear.weight.detach().double().numpy()
+    b = linear.bias.detach().double().numpy() if linear.bias is not None else np.zeros(W.shape[0])
+    skip = 1
+    if len(seq) > 1 and isinstance(seq[1], nn.BatchNorm1d) and seq[1].track_running_stats:
+        bn = seq[1]
+        gain = bn.weight.detach().double().numpy() / np.sqrt(bn.running_var.double().numpy() + bn.eps)
+        W = W * gain[:, None]
+        b = (b - bn.running_mean.double().numpy()) * gain + bn.bias.detach().double().numpy()
+        skip = 2
+
+    # Scaled input is (x - mean) / scale
+    if scaler is not None:
+        inv_scale = 1.0 / np.asarray(scaler.scale_, dtype=np.float64)
+        b = b - W @ (np.asarray(scaler.mean_, dtype=np.float64) * inv_scale)
+        W = W * inv_scale[None, :]
+
+    # Shallow copy of the model whose first Sequential starts after the folded layers
+    tail = copy.copy(model)
+    tail._modules = OrderedDict(model._modules)
+    rest = copy.copy(seq)
+    rest._modules = OrderedDict((str(i), m) for i, m in enumerate(list(seq)[skip:]))
+    tail._modules[name] = rest
+    return FoldedInput(W, b, tail, columns)
+
+class IncrementalSession:
+    """Cached raw features, first-layer pre-activations and outputs per model for one game"""
+    def __init__(self, art):
+        self.art = art
+        self.cache = {}  # key -> [x_raw, h, outputs, deltas since full recompute]
+
+class SessionStore:
+    """
+    LRU of per-game sessions plus folded first layers per artifact set.
+    Used from the event loop only (the async predict handlers), so unlocked.
+    """
+    def __init__(self, max_sessions=MAX_SESSIONS, refresh_every=REFRESH_EVERY):
+        self.max_sessions = max_sessions
+        self.refresh_every = refresh_every
+        self.sessions = OrderedDict()
+        self._folded = {}  # id(art) -> (art, {key: FoldedInput or None})
+        self.stats = {'full': 0, 'delta': 0, 'reused': 0, 'fallback': 0, 'evicted': 0}
+
+    def folded(self, art, key):
+        entry = self._folded.get(id(art))
+        if entry is None or entry[0] is not art:
+            # New artifact version: drop folds of versions no session still uses
+            live = {id(s.art) for s in self.sessions.values()}
+            self._folded = {k: v for k, v in self._folded.items() if k in live}
+            entry = self._folded[id(art)] = (art, {})
+        plans = entry[1]
+        if key not in plans:
+            plans[key] = fold_first_layer(art.models[f"{key}_model"], art.scalers.get(key),
+                                          art.extractors[key].columns)
+        return plans[key]
+
+    def session(self, game_id, art):
+        session = self.sessions.get(game_id)
+        if session is None or session.art is not art:
+            session = self.sessions[game_id] = IncrementalSession(art)
+            if len(self.sessions) > self.max_sessions:
+                self.sessions.popitem(last=False)
+                self.stats['evicted'] += 1
+        self.sessions.move_to_end(game_id)
+        return session
+
+    def forward(self, art, key, state):
+        """Model output(s) for one state, exactly as art.models[f"{key}_model"](scaled) returns them"""
+        plan = self.folded(art, key)
+        if plan is None:
+            self.stats['fallback'] += 1
+            with torch.no_grad():
+                return art.models[f"{key}_model"](torch.from_numpy(art.extractors[key].transform_one(state)))
+
+        x = art.extractors[key].extract((state,))[0].astype(np.float64)
+        session = self.session(state.game_id, art)
+        cached = session.cache.get(key)
+        if cached is not None:
+            changed = np.flatnonzero(x != cached[0])
+            if not len(changed):
+                self.stats['reused'] += 1
+                return cached[2]
+            if cached[3] < self.refresh_every and plan.incremental.issuperset(changed.tolist()):
+                h = cached[1] + (x[changed] - cached[0][changed]) @ plan.A_T[changed]
+                self.stats['delta'] += 1
+                return self._run(session, key, plan, x, h, cached[3] + 1)
+        self.stats['full'] += 1
+        return self._run(session, key, plan, x, plan.full(x), 0)
+
+    def _run(self, session, key, plan, x, h, deltas):
+        with torch.no_grad():
+            outputs = plan.tail(torch.from_numpy(h.astype(np.float32)[None, :]))
+        session.cache[key] = [x, h, outputs, deltas]
+        return outputs
+
+    def summary(self):
+        return {**self.stats, 'sessions': len(self.sessions)}
@@ -0,0 +1,280 @@
+"""
+API Load Generator & Latency SLO Report
+Replays mixed frontend traffic against the API with open-loop (Poisson)
+arrivals: snaps sampled from pbp, the /predict/* mix the frontend sends per
+play, and /analyze/play answered by a stubbed Gemini. Latency is measured
+from each request's scheduled send time, so a backed-up server shows up as
+latency instead of silently slowing the generator down.
+
+Targets:
+    asgi     in-process via httpx.ASGITransport (default; no sockets)
+    uvicorn  a local uvicorn server on a background thread (real HTTP stack)
+    --url    an already running server (Gemini is whatever that server uses)
+
+Usage:
+    python loadtest.py --rates 50,100,200 --duration 30
+    python loadtest.py --target uvicorn --rates 400 --mix offensive=1,defensive=1 --json load.json
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import sys
+import threading
+import time
+from collections import defaultdict
+
+import httpx
+import numpy as np
+
+from pbp_states import load_pbp, snaps, to_states
+
+# Relative share of each request in the frontend's per-play traffic
+MIX = {
+    'offensive': 0.25, 'defensive': 0.25, 'formation': 0.20, 'fourth-down': 0.10,
+    'personnel': 0.05, 'situational': 0.05, 'analyze': 0.10,
+}
+ENDPOINTS = {
+    'fourth-down': '/predict/fourth-down', 'offensive': '/predict/offensive',
+    'defensive': '/predict/defensive', 'personnel': '/predict/personnel',
+    'situational': '/predict/situational', 'formation': '/predict/formation',
+    'analyze': '/analyze/play',
+}
+PREDICT_SLO_MS = 100.0
+ANALYZE_SLO_MS = 4000.0
+MAX_ERROR_RATE = 0.001
+GEMINI_MS = 1200.0
+SNAP_SAMPLE = 50_000
+RECOMMENDATIONS = ['GO (High Confidence)', 'PUNT', 'KICK FG', 'PASS', 'RUN']
+
+class StubCoach:
+    """
+    Stands in for gemini_coach.GeminiCoach: blocks for a lognormal "model
+    latency" like the synchronous SDK call, then returns canned text.
+    """
+    def __init__(self, median_ms=GEMINI_MS, sigma=0.35, seed=0):
+        self.median_s = median_ms / 1000
+        self.sigma = sigma
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()
+
+    def analyze_situation(self, state, analytics_recommendation, team_abbr="KC"):
+        with self.lock:
+            delay = self.median_s * self.rng.lognormvariate(0, self.sigma)
+        time.sleep(delay)
+        return (f"{team_abbr}: {analytics_recommendation} on {state.down} & {state.ydstogo} "
+                f"from the {state.yardline_100}. (stubbed analysis)")
+
+def snap_pool(years, sample, seed):
+    """(states, posteams, play types) for up to `sample` pbp snaps"""
+    df = snaps(load_pbp(years))
+    if len(df) > sample:
+        df = df.sample(sample, random_state=seed).reset_index(drop=True)
+    play_types = df['play_type'].fillna('pass').to_numpy() if 'play_type' in df else np.full(len(df), 'pass')
+    return to_states(df), df['posteam'].to_numpy(), play_types
+
+def request_body(kind, i, pool):
+    """JSON body the frontend sends for one request of `kind` about snap i"""
+    states, posteams, play_types = pool
+    state = states[i]
+    if kind == 'formation':
+        play = 'run' if play_types[i] == 'run' else 'pass'
+        return {'play_type': play, 'personnel': '11', 'ydstogo': state['ydstogo']}
+    if kind == 'analyze':
+        return {'state': state, 'recommendation': RECOMMENDATIONS[i % len(RECOMMENDATIONS)],
+                'team_abbr': str(posteams[i])}
+    return state
+
+def schedule(rate, duration, mix, pool, rng):
+    """Poisson arrival offsets (s) with the endpoint and snap for each request"""
+    n = rng.poisson(rate * duration)
+    offsets = np.sort(rng.uniform(0, duration, n))
+    kinds = list(mix)
+    weights = np.array([mix[k] for k in kinds], dtype=np.float64)
+    picks = rng.choice(len(kinds), n, p=weights / weights.sum())
+
+    # The frontend only asks the fourth-down model on 4th down
+    fourth = np.flatnonzero([s['down'] == 4 for s in pool[0]])
+    snap_ids = rng.integers(0, len(pool[0]), n)
+    is_fourth = np.array([kinds[p] == 'fourth-down' for p in picks], dtype=bool)
+    if len(fourth) and is_fourth.any():
+        snap_ids[is_fourth] = rng.choice(fourth, int(is_fourth.sum()))
+    return [(float(t), kinds[p], int(s)) for t, p, s in zip(offsets, picks, snap_ids)]
+
+async def run_stage(client, rate, duration, mix, pool, rng, max_inflight, timeout):
+    """Drive one open-loop stage; returns raw samples and the stage's wall time"""
+    samples = []  # (kind, status, latency_s, start_lag_s)
+    inflight = 0
+    loop = asyncio.get_running_loop()
+
+    async def send(kind, body, intended):
+        nonlocal inflight
+        lag = loop.time() - intended
+        try:
+            response = await client.post(ENDPOINTS[kind], json=body, timeout=timeout)
+            status = str(response.status_code)
+        except httpx.TimeoutException:
+            status = 'timeout'
+        except httpx.HTTPError as e:
+            status = type(e).__name__
+        finally:
+            inflight -= 1
+        samples.append((kind, status, loop.time() - intended, lag))
+
+    tasks = []
+    start = loop.time()
+    for offset, kind, snap in schedule(rate, duration, mix, pool, rng):
+        intended = start + offset
+        delay = intended - loop.time()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        if inflight >= max_inflight:
+            samples.append((kind, 'dropped', float('nan'), 0.0))
+            continue
+        inflight += 1
+        tasks.append(asyncio.create_task(send(kind, request_body(kind, snap, pool), intended)))
+    await asyncio.gather(*tasks)
+    return samples, loop.time() - start
+
+def summarise(samples, wall, slo_ms, analyze_slo_ms, max_error_rate):
+    """Per-endpoint latency percentiles, throughput, error rate and SLO verdict"""
+    by_kind = defaultdict(list)
+    for s in samples:
+        by_kind[s[0]].append(s)
+    by_kind['all'] = samples
+    report = {}
+    for kind, rows in by_kind.items():
+        ok = np.array([lat for _, status, lat, _ in rows if status.startswith('2')]) * 1000
+        errors = defaultdict(int)
+        for _, status, _, _ in rows:
+            if not status.startswith('2'):
+                errors[status] += 1
+        n_err = sum(errors.values())
+        pct = (lambda q: float(np.percentile(ok, q))) if len(ok) else (lambda q: float('nan'))
+        target = None if kind == 'all' else analyze_slo_ms if kind == 'analyze' else slo_ms
+        error_rate = n_err / len(rows)
+        report[kind] = {
+            'sent': len(rows), 'ok': len(ok), 'errors': dict(errors), 'error_rate': error_rate,
+            'throughput_rps': len(ok) / wall, 'p50_ms': pct(50), 'p95_ms': pct(95), 'p99_ms': pct(99),
+            'max_ms': float(ok.max()) if len(ok) else float('nan'),
+            'slo_p99_ms': target,
+            'slo_met': None if target is None else bool(len(ok) and pct(99) <= target and error_rate <= max_error_rate),
+        }
+    lags = np.array([lag for *_, lag in samples]) * 1000
+    report['all']['send_lag_p99_ms'] = float(np.percentile(lags, 99)) if len(lags) else 0.0
+    return report
+
+def print_stage(rate, report):
+    print(f"\n📊 {rate:g} req/s offered")
+    print(f"  {'endpoint':>12} | {'sent':>6} | {'rps':>7} | {'p50 ms':>8} | {'p95 ms':>8} | {'p99 ms':>8} | {'err %':>6} | SLO")
+    for kind, r in sorted(report.items(), key=lambda kv: (kv[0] == 'all', kv[0])):
+        verdict = '' if r['slo_met'] is None else ('✅' if r['slo_met'] else f"❌ p99 ≤ {r['slo_p99_ms']:g}")
+        print(f"  {kind:>12} | {r['sent']:>6} | {r['throughput_rps']:>7.1f} | {r['p50_ms']:>8.1f} | "
+              f"{r['p95_ms']:>8.1f} | {r['p99_ms']:>8.1f} | {r['error_rate'] * 100:>6.2f} | {verdict}")
+    lag = report['all']['send_lag_p99_ms']
+    if lag > 10:
+        print(f"  ⚠️ Generator fell behind its schedule (send lag p99 {lag:.1f} ms); latencies include that wait")
+
+def parse_mix(text):
+    if not text:
+        return dict(MIX)
+    mix = {}
+    for item in text.split(","):
+        kind, _, weight = item.partition("=")
+        if kind.strip() not in ENDPOINTS:
+            raise SystemExit(f"❌ Unknown endpoint '{kind}' (choose from {', '.join(ENDPOINTS)})")
+        mix[kind.strip()] = float(weight or 1)
+    return mix
+
+class LocalServer:
+    """uvicorn serving main.app on a background thread"""
+    def __init__(self, app, port):
+        import uvicorn
+        self.server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+        self.thread = threading.Thread(target=self.server.run, daemon=True)
+
+    def __enter__(self):
+        self.thread.start()
+        while not self.server.started:
+            if not self.thread.is_alive():
+                raise RuntimeError("uvicorn failed to start")
+            time.sleep(0.05)
+        return self
+
+    def __exit__(self, *exc):
+        self.server.should_exit = True
+        self.thread.join()
+
+async def drive(base_url, transport, args, mix, pool):
+    rng = np.random.default_rng(args.seed)
+    limits = httpx.Limits(max_connections=args.max_inflight, max_keepalive_connections=args.max_inflight)
+    stages = []
+    async with httpx.AsyncClient(transport=transport, base_url=base_url, limits=limits) as client:
+        # Warm every endpoint so first-call costs stay out of the first stage
+        for kind in mix:
+            for i in range(5):
+                await client.post(ENDPOINTS[kind], json=request_body(kind, i, pool), timeout=args.timeout)
+        for rate in args.rates:
+            samples, wall = await run_stage(client, rate, args.duration, mix, pool, rng,
+                                            args.max_inflight, args.timeout)
+            report = summarise(samples, wall, args.slo_p99_ms, args.analyze_slo_p99_ms, args.max_error_rate)
+            print_stage(rate, report)
+            stages.append({'offered_rps': rate, 'duration_s': wall, 'endpoints': report})
+    return stages
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--target", choices=["asgi", "uvicorn"], default="asgi")
+    parser.add_argument("--url", default=None, help="Drive a running server instead (e.g. http://localhost:8000)")
+    parser.add_argument("--port", type=int, default=8765, help="Port for --target uvicorn")
+    parser.add_argument("--rates", default="50", help="Comma list of offered req/s, one stage each")
+    parser.add_argument("--duration", type=float, default=30, help="Seconds per stage")
+    parser.add_argument("--mix", default=None, help="ENDPOINT=WEIGHT comma list (default: frontend mix)")
+    parser.add_argument("--gemini-ms", type=float, default=GEMINI_MS, help="Median stubbed Gemini latency")
+    parser.add_argument("--max-inflight", type=int, default=256, help="Arrivals beyond this many open requests are dropped")
+    parser.add_argument("--timeout", type=float, default=10.0)
+    parser.add_argument("--slo-p99-ms", type=float, default=PREDICT_SLO_MS, help="p99 target for /predict/*")
+    parser.add_argument("--analyze-slo-p99-ms", type=float, default=ANALYZE_SLO_MS)
+    parser.add_argument("--max-error-rate", type=float, default=MAX_ERROR_RATE)
+    parser.add_argument("--start-year", type=int, default=2018)
+    parser.add_argument("--end-year", type=int, default=2024)
+    parser.add_argument("--snaps", type=int, default=SNAP_SAMPLE, help="pbp snaps sampled for payloads")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", default=None, help="Write the report to this path")
+    parser.add_argument("--fail-on-slo", action="store_true", help="Exit 1 if any endpoint misses its SLO")
+    args = parser.parse_args()
+    args.rates = [float(r) for r in args.rates.split(",")]
+    mix = parse_mix(args.mix)
+
+    print("📥 Sampling snaps...")
+    pool = snap_pool(range(args.start_year, args.end_year + 1), args.snaps, args.seed)
+    print(f"🏈 {len(pool[0]):,} snaps | mix {mix}")
+
+    if args.url:
+        if 'analyze' in mix:
+            print("ℹ️ /analyze/play goes to the server's own Gemini configuration")
+        stages = asyncio.run(drive(args.url, None, args, mix, pool))
+    else:
+        import main as api
+        api.coach_ai = StubCoach(args.gemini_ms, seed=args.seed)
+        if args.target == 'asgi':
+            if api.registry.current is None:
+                api.load_artifacts()
+            stages = asyncio.run(drive("http://loadtest", httpx.ASGITransport(app=api.app), args, mix, pool))
+        else:
+            with LocalServer(api.app, args.port):
+                stages = asyncio.run(drive(f"http://127.0.0.1:{args.port}", None, args, mix, pool))
+
+    met = all(r['slo_met'] is not False for s in stages for r in s['endpoints'].values())
+    print("\n✅ All SLOs met" if met else "\n❌ SLO missed")
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({'target': args.url or args.target, 'mix': mix, 'gemini_ms': args.gemini_ms,
+                       'stages': stages}, f, indent=2)
+        print(f"💾 Report saved to {args.json}")
+    if args.fail_on_slo and not met:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
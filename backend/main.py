@@ -3,6 +3,8 @@ FastAPI Server for 4th Down Bot Inference
 Serves real-time recommendations and win probability.
 """
 
+import os
+import random
 import sys
 from pathlib import Path
 from dotenv import load_dotenv
@@ -13,22 +15,24 @@ load_dotenv()
 # Add the backend directory to sys.path
 sys.path.append(str(Path(__file__).parent))
 
-from fastapi import FastAPI, HTTPException
+from typing import Optional
+
+from fastapi import FastAPI, HTTPException, Header, Request, Response
+from starlette.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
 import torch
-import joblib
 import numpy as np
 
-# Import from the renamed file
-from architectures import (
-    FourthDownDecisionModel, WinProbabilityModel,
-    OffensivePlayCallerModel, DefensiveCoordinatorModel, PersonnelOptimizerModel
-)
-from feature_engineering import NFLFeatureEngineer
-from demo_scenarios import get_demo_scenarios, get_scenario_by_id
-from formation_logic import get_offensive_formation, get_defensive_formation, generate_formation_payload
+import model_registry
+from model_registry import ModelRegistry, head_outputs
+from shadow import ShadowRunner
+from incremental import SessionStore
+from batch_io import ARROW_STREAM, BatchFormatError, decode_batch, feature_matrix, output_columns, encode_arrow
+from feature_specs import FEATURE_SPECS
+from formation_logic import get_offensive_formation, get_defensive_formation
 from gemini_coach import coach_ai
+from fast_json import FastJSONResponse, splice, class_probs, formation_json, SCENARIOS_JSON, SCENARIO_JSON
 
 app = FastAPI(title="NFL AI Coach API")
 
@@ -85,7 +89,8 @@ async def analyze_play(req: AnalysisRequest):
     """
     Get a natural language summary from Gemini 1.5 Pro.
     """
-    analysis = coach_ai.analyze_situation(req.state, req.recommendation, req.team_abbr)
+    # The Gemini SDK call blocks for seconds; keep it off the event loop
+    analysis = await run_in_threadpool(coach_ai.analyze_situation, req.state, req.recommendation, req.team_abbr)
     return {"analysis": analysis}
 
 class FormationRequest(BaseModel):
@@ -107,25 +112,49 @@ def predict_formation(req: FormationRequest):
     else:
         formation_name = get_offensive_formation(req.play_type, req.personnel, req.ydstogo, req.is_2min)
         
-    coords = generate_formation_payload(formation_name)
-    
-    return {
-        "formation_name": formation_name,
-        "players": coords
-    }
+    return FastJSONResponse(formation_json(formation_name))
 
 # ... (Rest of the file remains unchanged)
 
 
 # Paths relative to this file
-BASE_DIR = Path(__file__).parent
-MODEL_DIR = BASE_DIR / "models"
-DATA_DIR = BASE_DIR.parent / "data" # Scalers are usually in root data/
-
-# Global storage
-models = {}
-scalers = {}
-encoders = {}
+MODEL_DIR = model_registry.MODEL_DIR
+DATA_DIR = model_registry.DATA_DIR
+
+# "teacher" (deep net) or "student" (distilled, see distill.py)
+WIN_PROB_MODEL = os.getenv("WIN_PROB_MODEL", "teacher").lower()
+
+# QUANTIZE_MODELS=1 serves int8-weight Linear layers (see benchmarks/quantization.py)
+QUANTIZE_MODELS = os.getenv("QUANTIZE_MODELS", "0") == "1"
+
+# "eager" or "torchscript" (frozen graphs from export.py in models/compiled/, eager fallback)
+MODEL_RUNTIME = os.getenv("MODEL_RUNTIME", "eager").lower()
+
+# Seconds between artifact change checks (0 = no watcher; use POST /admin/reload)
+MODEL_WATCH_SECONDS = float(os.getenv("MODEL_WATCH_SECONDS", "0"))
+
+# When set, /admin/* requires a matching X-Admin-Token header
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN")
+
+# Row limit for one /predict/batch.arrow request
+BATCH_MAX_ROWS = int(os.getenv("BATCH_MAX_ROWS", "200000"))
+
+# Share of requests re-run through a loaded candidate, and where the comparisons go
+SHADOW_SAMPLE_RATE = float(os.getenv("SHADOW_SAMPLE_RATE", "0.1"))
+SHADOW_LOG = Path(os.getenv("SHADOW_LOG", model_registry.BASE_DIR / "data" / "shadow_log.bin"))
+
+# INCREMENTAL_INFERENCE=1 keeps a per-game session that updates cached first-layer
+# pre-activations on clock-only changes instead of a full forward (see incremental.py)
+INCREMENTAL_INFERENCE = os.getenv("INCREMENTAL_INFERENCE", "0") == "1"
+
+# Clients that send no game_id all share this one; a shared session would only thrash
+DEFAULT_GAME_ID = GameState.model_fields['game_id'].default
+
+# Versioned artifact store; handlers read `registry.current` once per request
+registry = ModelRegistry(MODEL_DIR, DATA_DIR, quantize=QUANTIZE_MODELS,
+                         runtime=MODEL_RUNTIME, win_prob_model=WIN_PROB_MODEL)
+shadow = ShadowRunner(registry, SHADOW_LOG, sample_rate=SHADOW_SAMPLE_RATE)
+sessions = SessionStore() if INCREMENTAL_INFERENCE else None
 loading_error = None
 
 class SimulationRequest(BaseModel):
@@ -142,126 +171,168 @@ class SimulationResponse(BaseModel):
 def load_artifacts():
     global loading_error
     try:
-        print(f"📂 Loading artifacts. Models: {MODEL_DIR}, Data: {DATA_DIR}")
-        
-        # Load Scalers & Encoders (Check both root and backend/data)
-        scaler_path = DATA_DIR / "scalers.pkl"
-        if not scaler_path.exists(): scaler_path = BASE_DIR / "data" / "scalers.pkl"
-        
-        encoder_path = DATA_DIR / "encoders.pkl"
-        if not encoder_path.exists(): encoder_path = BASE_DIR / "data" / "encoders.pkl"
-
-        if scaler_path.exists():
-            scalers['all'] = joblib.load(scaler_path)
-            print(f"✅ Scalers loaded. Keys: {list(scalers['all'].keys())}")
-        else:
-            print(f"❌ scalers.pkl not found at {scaler_path}")
-            
-        if encoder_path.exists():
-            encoders['all'] = joblib.load(encoder_path)
-            print(f"✅ Encoders loaded. Keys: {list(encoders['all'].keys())}")
-        
-        def load_net(name, cls, **kwargs):
-            path = MODEL_DIR / f"{name}.pt"
-            if path.exists():
-                model = cls(**kwargs)
-                model.load_state_dict(torch.load(path, map_location='cpu'))
-                model.eval()
-                models[name] = model
-                print(f"✅ Loaded {name}")
-            else:
-                print(f"❌ {name}.pt not found at {path}")
-
-        # Load Models
-        load_net('fourth_down_model', FourthDownDecisionModel, input_dim=6)
-        load_net('win_prob_model', WinProbabilityModel, input_dim=8)
-        
-        if 'offensive' in encoders.get('all', {}):
-            n_classes = len(encoders['all']['offensive'].classes_)
-            load_net('offensive_model', OffensivePlayCallerModel, input_dim=11, num_classes=n_classes)
-            
-        load_net('defensive_model', DefensiveCoordinatorModel, input_dim=9)
-        
-        if 'personnel' in encoders.get('all', {}):
-            n_classes = len(encoders['all']['personnel'].classes_)
-            load_net('personnel_model', PersonnelOptimizerModel, input_dim=6, num_classes=n_classes)
-        
-        print(f"🚀 API Ready. Loaded models: {list(models.keys())}")
-        
-    except Exception as e:
-        import traceback
-        loading_error = f"{str(e)}\n{traceback.format_exc()}"
+        registry.reload()
+        loading_error = None
+    except Exception:
+        loading_error = registry.last_error
         print(f"🔥 CRITICAL ERROR loading models:\n{loading_error}")
+    if MODEL_WATCH_SECONDS > 0:
+        registry.start_watcher(MODEL_WATCH_SECONDS)
+    shadow.start()
+
+@app.on_event("shutdown")
+def stop_background():
+    registry.stop_watcher()
+    shadow.stop()
 
 @app.get("/health")
 def health():
     if loading_error:
         return {"status": "error", "detail": loading_error}
-    return {"status": "ok", "models_loaded": list(models.keys())}
+    art = registry.current
+    win_prob = art.models.get('win_prob_model')
+    return {
+        "status": "ok",
+        "version": art.version,
+        "models_loaded": list(art.models.keys()),
+        "win_prob_model": getattr(win_prob, 'original_name', type(win_prob).__name__) if win_prob is not None else None,
+        "quantized": QUANTIZE_MODELS,
+        "runtime": MODEL_RUNTIME,
+        "incremental": sessions.summary() if sessions is not None else None
+    }
+
+def current_artifacts(state, keys):
+    """
+    The ArtifactSet serving this request (read once, never re-read mid-request):
+    the primary, or the candidate for its A/B share of games. Sampled requests
+    are queued for background primary-vs-candidate comparison.
+    """
+    art = registry.route(state.game_id)
+    if art is None: raise HTTPException(503, "Models not loaded")
+    shadow.observe(keys, state, art is registry.candidate)
+    return art
+
+def infer(art, key, state):
+    """One model's forward output(s) for a single state, through the game's incremental session if enabled"""
+    if sessions is not None and state.game_id != DEFAULT_GAME_ID:
+        return sessions.forward(art, key, state)
+    with torch.no_grad():
+        return art.models[f"{key}_model"](torch.from_numpy(art.extractors[key].transform_one(state)))
+
+# --- Admin Endpoints ---
+
+def require_admin(token):
+    if ADMIN_TOKEN and token != ADMIN_TOKEN:
+        raise HTTPException(403, "Invalid admin token")
+
+@app.get("/admin/versions")
+def admin_versions(x_admin_token: Optional[str] = Header(None)):
+    require_admin(x_admin_token)
+    return registry.versions()
+
+@app.post("/admin/reload")
+def admin_reload(x_admin_token: Optional[str] = Header(None)):
+    """Load + warm the artifacts on disk in a worker thread, then swap them in"""
+    global loading_error
+    require_admin(x_admin_token)
+    try:
+        art = registry.reload()
+    except Exception as e:
+        raise HTTPException(500, f"Reload failed, still serving previous version: {e}")
+    loading_error = None
+    return registry.versions() | {"swapped_to": art.version}
+
+class CandidateRequest(BaseModel):
+    mode: str = "shadow"      # "shadow": candidate never serves; "ab": serves ab_fraction of games
+    ab_fraction: float = 0.0
+    sample_rate: Optional[float] = None
+
+@app.post("/admin/candidate")
+def admin_load_candidate(req: CandidateRequest, x_admin_token: Optional[str] = Header(None)):
+    """Load models/candidate/ alongside the primary for shadow or A/B comparison"""
+    require_admin(x_admin_token)
+    if not 0.0 <= req.ab_fraction <= 1.0:
+        raise HTTPException(422, "ab_fraction must be between 0 and 1")
+    try:
+        registry.load_candidate(req.mode, req.ab_fraction)
+    except ValueError as e:
+        raise HTTPException(422, str(e))
+    except Exception as e:
+        raise HTTPException(500, f"Candidate load failed: {e}")
+    if req.sample_rate is not None:
+        shadow.sample_rate = req.sample_rate
+    return registry.versions() | {"shadow": shadow.stats()}
+
+@app.delete("/admin/candidate")
+def admin_clear_candidate(x_admin_token: Optional[str] = Header(None)):
+    require_admin(x_admin_token)
+    registry.clear_candidate()
+    return registry.versions()
+
+@app.post("/admin/candidate/promote")
+def admin_promote_candidate(x_admin_token: Optional[str] = Header(None)):
+    require_admin(x_admin_token)
+    try:
+        art = registry.promote_candidate()
+    except LookupError as e:
+        raise HTTPException(409, str(e))
+    return registry.versions() | {"swapped_to": art.version}
+
+@app.get("/admin/shadow")
+def admin_shadow_stats(x_admin_token: Optional[str] = Header(None)):
+    require_admin(x_admin_token)
+    return shadow.stats()
+
+@app.post("/admin/rollback")
+def admin_rollback(x_admin_token: Optional[str] = Header(None)):
+    require_admin(x_admin_token)
+    try:
+        art = registry.rollback()
+    except LookupError as e:
+        raise HTTPException(409, str(e))
+    return registry.versions() | {"swapped_to": art.version}
 
 # --- Demo Endpoints ---
 
 @app.get("/demo/scenarios")
 def list_demo_scenarios():
-    return get_demo_scenarios()
+    return FastJSONResponse(SCENARIOS_JSON)
 
 @app.get("/demo/load/{scenario_id}")
 def load_demo_scenario(scenario_id: str):
-    scenario = get_scenario_by_id(scenario_id)
+    scenario = SCENARIO_JSON.get(scenario_id)
     if not scenario: raise HTTPException(status_code=404, detail="Scenario not found")
-    return scenario
+    return FastJSONResponse(scenario)
 
 # --- Prediction Endpoints ---
 
 @app.post("/predict/fourth-down")
 async def predict_fourth_down(state: GameState):
-    if 'fourth_down_model' not in models: raise HTTPException(503, "Models not loaded")
+    art = current_artifacts(state, ('fourth_down', 'win_prob'))
+    if 'fourth_down_model' not in art.models: raise HTTPException(503, "Models not loaded")
     
-    fd_features = np.array([[ 
-        state.ydstogo, state.yardline_100, state.score_differential,
-        state.qtr, state.game_seconds_remaining, state.posteam_timeouts_remaining
-    ]])
-    fd_scaled = torch.FloatTensor(scalers['all']['fourth_down'].transform(fd_features))
+    conv_prob, fg_prob, epa = infer(art, 'fourth_down', state)
+    win_prob = infer(art, 'win_prob', state)
     
-    with torch.no_grad():
-        conv_prob, fg_prob, epa = models['fourth_down_model'](fd_scaled)
-        
-    wp_features = np.array([[ 
-        state.score_differential, state.qtr, state.game_seconds_remaining,
-        state.yardline_100, state.down, state.ydstogo,
-        state.posteam_timeouts_remaining, state.defteam_timeouts_remaining
-    ]])
-    wp_scaled = torch.FloatTensor(scalers['all']['win_prob'].transform(wp_features))
-    
-    with torch.no_grad():
-        win_prob = models['win_prob_model'](wp_scaled)
-    
-    return {
-        "recommendation": "GO" if conv_prob.item() > 0.5 else "PUNT/KICK",
-        "conversion_probability": round(conv_prob.item(), 4),
+    conv_prob = conv_prob.item()
+    return FastJSONResponse({
+        "recommendation": "GO" if conv_prob > 0.5 else "PUNT/KICK",
+        "conversion_probability": round(conv_prob, 4),
         "fg_probability": round(fg_prob.item(), 4),
         "expected_epa": round(epa.item(), 4),
         "win_probability": round(win_prob.item(), 4)
-    }
+    })
 
 @app.post("/predict/offensive")
 async def predict_offensive(state: GameState):
-    if 'offensive_model' not in models: raise HTTPException(503, "Offensive model not loaded")
+    art = current_artifacts(state, ('offensive',))
+    if 'offensive_model' not in art.models: raise HTTPException(503, "Offensive model not loaded")
     
     try:
-        feats = np.array([[ 
-            state.down, state.ydstogo, state.yardline_100, state.score_differential,
-            state.qtr, state.game_seconds_remaining, state.half_seconds_remaining,
-            state.red_zone, state.goal_to_go, state.two_min_drill, state.posteam_timeouts_remaining
-        ]])
-        
-        scaled = torch.FloatTensor(scalers['all']['offensive'].transform(feats))
-        with torch.no_grad():
-            logits = models['offensive_model'](scaled)
-            probs = torch.softmax(logits, dim=1).numpy()[0]
+        logits = infer(art, 'offensive', state)
+        probs = torch.softmax(logits, dim=1).numpy()[0]
         
-        classes = encoders['all']['offensive'].classes_
-        result = {cls: float(prob) for cls, prob in zip(classes, probs)}
+        result = class_probs(art.encoders['offensive'], probs)
         recommendation = max(result, key=result.get)
 
         # Get Personnel (Optional, could be separate call but efficient here)
@@ -269,75 +340,129 @@ async def predict_offensive(state: GameState):
         personnel = "11" 
         
         # Get Formation Logic
-        formation_data = get_offensive_formation(
+        formation_name = get_offensive_formation(
             play_type=recommendation,
             personnel=personnel,
             ydstogo=state.ydstogo,
             is_2min=bool(state.two_min_drill)
         )
 
-        return {
+        return FastJSONResponse(splice({
             "recommendation": recommendation, 
             "probabilities": result,
-            "formation_suggested": formation_data['formation_name'],
-            "formation_data": formation_data
-        }
+            "formation_suggested": formation_name,
+        }, formation_data=formation_json(formation_name)))
     except Exception as e:
         import traceback
         print(f"ERROR in predict_offensive: {e}\n{traceback.format_exc()}")
         # Fallback for demo continuity
-        return {
+        formation_name = get_offensive_formation("pass", "11", state.ydstogo, 0)
+        return FastJSONResponse(splice({
             "recommendation": "PA BOOT RIGHT", 
             "probabilities": {"PA BOOT RIGHT": 0.75, "HB DIVE": 0.25},
-            "formation_suggested": "Singleback",
-            "formation_data": get_offensive_formation("pass", "11", state.ydstogo, 0)
-        }
+            "formation_suggested": formation_name,
+        }, formation_data=formation_json(formation_name)))
 
 @app.post("/predict/defensive")
 async def predict_defensive(state: GameState):
-    if 'defensive_model' not in models: raise HTTPException(503, "Defensive model not loaded")
-    
-    feats = np.array([[ 
-        state.down, state.ydstogo, state.yardline_100, state.score_differential,
-        state.qtr, state.game_seconds_remaining, state.red_zone, state.goal_to_go, state.two_min_drill
-    ]])
+    art = current_artifacts(state, ('defensive',))
+    if 'defensive_model' not in art.models: raise HTTPException(503, "Defensive model not loaded")
     
-    scaled = torch.FloatTensor(scalers['all']['defensive'].transform(feats))
-    with torch.no_grad():
-        pass_prob = models['defensive_model'](scaled).item()
+    pass_prob = infer(art, 'defensive', state).item()
     
     # Get Defensive Formation
-    formation_data = get_defensive_formation(
+    formation_name = get_defensive_formation(
         off_personnel="11", # Default assumption if not provided
-        pass_prob=pass_prob,
+        is_pass_likely=pass_prob,
         is_goal_line=bool(state.goal_to_go)
     )
 
-    return {
+    return FastJSONResponse(splice({
         "recommendation": "Pass Defense" if pass_prob > 0.5 else "Run Defense", 
         "pass_probability": round(pass_prob, 4),
-        "formation_suggested": formation_data['formation_name'],
-        "formation_data": formation_data
-    }
+        "formation_suggested": formation_name,
+    }, formation_data=formation_json(formation_name)))
 
 @app.post("/predict/personnel")
 async def predict_personnel(state: GameState):
-    if 'personnel_model' not in models: raise HTTPException(503, "Personnel model not loaded")
+    art = current_artifacts(state, ('personnel',))
+    if 'personnel_model' not in art.models: raise HTTPException(503, "Personnel model not loaded")
     
-    feats = np.array([[ 
-        state.down, state.ydstogo, state.yardline_100, state.score_differential,
-        state.red_zone, state.goal_to_go
-    ]])
-    scaled = torch.FloatTensor(scalers['all']['personnel'].transform(feats))
-    
-    with torch.no_grad():
-        logits = models['personnel_model'](scaled)
-        probs = torch.softmax(logits, dim=1).numpy()[0]
+    logits = infer(art, 'personnel', state)
+    probs = torch.softmax(logits, dim=1).numpy()[0]
         
-    classes = encoders['all']['personnel'].classes_
-    result = {cls: float(prob) for cls, prob in zip(classes, probs)}
+    result = class_probs(art.encoders['personnel'], probs)
+    
+    return FastJSONResponse({"recommendation": max(result, key=result.get), "probabilities": result})
+
+@app.post("/predict/situational")
+async def predict_situational(state: GameState):
+    """Play call, pass probability and personnel from one shared-trunk forward pass"""
+    art = current_artifacts(state, ('situational',))
+    if 'situational_model' not in art.models: raise HTTPException(503, "Situational model not loaded")
+    
+    play_logits, pass_prob, personnel_logits = infer(art, 'situational', state)
+    play_probs = torch.softmax(play_logits, dim=1).numpy()[0]
+    personnel_probs = torch.softmax(personnel_logits, dim=1).numpy()[0]
+    pass_prob = pass_prob.item()
+    
+    sit = art.encoders['situational']
+    play_call = class_probs(sit['play_call'], play_probs)
+    personnel = class_probs(sit['personnel'], personnel_probs)
     
-    return {"recommendation": max(result, key=result.get), "probabilities": result}
+    return FastJSONResponse({
+        "play_call": {"recommendation": max(play_call, key=play_call.get), "probabilities": play_call},
+        "pass_probability": round(pass_prob, 4),
+        "defensive_recommendation": "Pass Defense" if pass_prob > 0.5 else "Run Defense",
+        "personnel": {"recommendation": max(personnel, key=personnel.get), "probabilities": personnel}
+    })
+
+# --- Columnar Batch Endpoint ---
+
+@app.post("/predict/batch.arrow")
+async def predict_batch_arrow(request: Request, models: Optional[str] = None):
+    """
+    Bulk inference over feature columns, bypassing per-row GameState objects.
+    Body: Arrow IPC stream/file, or raw float32 (Content-Type: application/octet-stream,
+    layout in batch_io.py). `models` is a comma list; default is every loaded
+    model whose columns are all present. Returns one Arrow record batch.
+    """
+    body = await request.body()
+    payload, version = await run_in_threadpool(run_batch, body, request.headers.get("content-type"), models)
+    return Response(payload, media_type=ARROW_STREAM, headers={"X-Model-Version": version})
+
+def run_batch(body, content_type, models):
+    art = registry.current
+    if art is None: raise HTTPException(503, "Models not loaded")
+    try:
+        columns, rows = decode_batch(body, content_type)
+    except BatchFormatError as e:
+        raise HTTPException(422, str(e))
+    if rows == 0: raise HTTPException(422, "Empty batch")
+    if rows > BATCH_MAX_ROWS: raise HTTPException(413, f"Batch of {rows} rows exceeds BATCH_MAX_ROWS={BATCH_MAX_ROWS}")
+
+    if models:
+        keys = [k.strip() for k in models.split(",") if k.strip()]
+        unloaded = [k for k in keys if f"{k}_model" not in art.models]
+        if unloaded: raise HTTPException(422, f"Unknown or unloaded models: {unloaded}")
+    else:
+        keys = [k for k in FEATURE_SPECS if f"{k}_model" in art.models
+                and all(c in columns for c in FEATURE_SPECS[k])]
+        if not keys: raise HTTPException(422, "No loaded model has all of its feature columns in the batch")
+
+    out = {}
+    for key in keys:
+        missing = [c for c in FEATURE_SPECS[key] if c not in columns]
+        if missing: raise HTTPException(422, f"'{key}' needs columns {missing}")
+        try:
+            X = feature_matrix(columns, rows, FEATURE_SPECS[key])
+        except BatchFormatError as e:
+            raise HTTPException(422, str(e))
+        X = art.extractors[key].scale_inplace(X)
+        with torch.no_grad():
+            heads = head_outputs(key, art.models[f"{key}_model"](torch.from_numpy(X)))
+        out.update(output_columns(key, heads, art.encoders))
+    return encode_arrow(out, metadata={"version": art.version, "models": ",".join(keys)}), art.version
 
 # --- Simulation Endpoint ---
 
@@ -0,0 +1,339 @@
+"""
+Versioned Model Registry for the Inference API
+Loads complete artifact sets (weights, scalers, encoders, extractors) off the
+request path, warms them up and swaps them in with a single reference
+assignment, keeping earlier versions for rollback.
+"""
+
+import threading
+import time
+import zlib
+import traceback
+from collections import deque
+from dataclasses import dataclass, field
+from pathlib import Path
+
+import joblib
+import torch
+
+from architectures import (
+    FourthDownDecisionModel, WinProbabilityModel, WinProbabilityStudent,
+    OffensivePlayCallerModel, DefensiveCoordinatorModel, PersonnelOptimizerModel,
+    SituationalMultiTaskModel, quantize_int8
+)
+from feature_specs import FEATURE_SPECS, FeatureExtractor
+
+BASE_DIR = Path(__file__).parent
+MODEL_DIR = BASE_DIR / "models"
+DATA_DIR = BASE_DIR.parent / "data" # Scalers are usually in root data/
+
+ROLLBACK_DEPTH = 3  # previous versions kept loaded
+CANDIDATE_MODES = ('shadow', 'ab')
+
+# What each model's forward returns: 'prob' (already sigmoid), 'logits' (softmax to compare), 'value'
+OUTPUT_HEADS = {
+    'fourth_down': (('conversion', 'prob'), ('field_goal', 'prob'), ('epa', 'value')),
+    'win_prob': (('win', 'prob'),),
+    'offensive': (('play_call', 'logits'),),
+    'defensive': (('pass', 'prob'),),
+    'personnel': (('personnel', 'logits'),),
+    'situational': (('play_call', 'logits'), ('pass', 'prob'), ('personnel', 'logits')),
+}
+
+def head_outputs(name, raw):
+    """Forward output(s) -> list of (head, kind, comparable numpy array)"""
+    raw = raw if isinstance(raw, tuple) else (raw,)
+    heads = []
+    for (head, kind), out in zip(OUTPUT_HEADS[name], raw):
+        if kind == 'logits':
+            out = torch.softmax(out, dim=1)
+        heads.append((head, kind, out.detach().numpy()))
+    return heads
+
+def decisions(kind, values):
+    """The served decision for a head: threshold for probabilities, argmax for classes"""
+    if kind == 'prob':
+        return values.ravel() >= 0.5
+    if kind == 'logits':
+        return values.argmax(axis=1)
+    return None
+
+@dataclass
+class ArtifactSet:
+    """One immutable, fully loaded version of everything the handlers read"""
+    version: str
+    models: dict
+    scalers: dict
+    encoders: dict
+    extractors: dict
+    fingerprint: tuple
+    loaded_at: float = field(default_factory=time.time)
+
+    def describe(self):
+        return {"version": self.version, "loaded_at": self.loaded_at, "models": list(self.models)}
+
+def artifact_paths(model_dir=MODEL_DIR, data_dir=DATA_DIR):
+    """scalers.pkl / encoders.pkl (root data/ first, then backend/data/)"""
+    paths = {}
+    for filename in ("scalers.pkl", "encoders.pkl"):
+        path = data_dir / filename
+        if not path.exists(): path = BASE_DIR / "data" / filename
+        paths[filename] = path
+    return paths
+
+def fingerprint(model_dir=MODEL_DIR, data_dir=DATA_DIR):
+    """(path, mtime, size) of every artifact file; changes when anything is rewritten"""
+    files = list(artifact_paths(model_dir, data_dir).values())
+    files += sorted(model_dir.glob("*.pt")) + sorted((model_dir / "compiled").glob("*.pt"))
+    return tuple((str(p), p.stat().st_mtime_ns, p.stat().st_size) for p in files if p.exists())
+
+def checkpoint_classes(path):
+    """Output width of a saved classifier (rows of its last weight matrix)"""
+    state = torch.load(path, map_location='cpu')
+    return [t for name, t in state.items() if name.endswith('weight')][-1].shape[0]
+
+def load_artifact_set(version, model_dir=MODEL_DIR, data_dir=DATA_DIR,
+                      quantize=False, runtime='eager', win_prob_model='teacher', strict=True):
+    """
+    Build a complete ArtifactSet from disk without touching the serving one.
+    strict=False (golden checks) also loads nets whose scaler or encoder is
+    missing: unscaled inputs, class count read from the checkpoint.
+    """
+    print(f"📂 Loading artifacts {version}. Models: {model_dir}, Data: {data_dir}")
+    stamp = fingerprint(model_dir, data_dir)
+    paths = artifact_paths(model_dir, data_dir)
+    scalers, encoders, models, extractors = {}, {}, {}, {}
+
+    if paths["scalers.pkl"].exists():
+        scalers = joblib.load(paths["scalers.pkl"])
+        print(f"✅ Scalers loaded. Keys: {list(scalers.keys())}")
+    else:
+        print(f"❌ scalers.pkl not found at {paths['scalers.pkl']}")
+
+    if paths["encoders.pkl"].exists():
+        encoders = joblib.load(paths["encoders.pkl"])
+        print(f"✅ Encoders loaded. Keys: {list(encoders.keys())}")
+
+    def load_net(name, cls, **kwargs):
+        path = model_dir / f"{name}.pt"
+        if runtime == 'torchscript':
+            compiled = model_dir / "compiled" / f"{name}.pt"
+            # A graph older than its weights is stale (retrained since export)
+            if compiled.exists() and (not path.exists() or compiled.stat().st_mtime >= path.stat().st_mtime):
+                models[name] = torch.jit.load(str(compiled), map_location='cpu')
+                print(f"✅ Loaded {name} (torchscript)")
+                return
+            print(f"⚠️ No up-to-date compiled graph for {name}, falling back to eager")
+        if path.exists():
+            model = cls(**kwargs)
+            model.load_state_dict(torch.load(path, map_location='cpu'))
+            model.eval()
+            if quantize:
+                model = quantize_int8(model)
+            models[name] = model
+            print(f"✅ Loaded {name}" + (" (int8)" if quantize else ""))
+        else:
+            print(f"❌ {name}.pt not found at {path}")
+
+    load_net('fourth_down_model', FourthDownDecisionModel, input_dim=len(FEATURE_SPECS['fourth_down']))
+    load_net('win_prob_model', WinProbabilityModel, input_dim=len(FEATURE_SPECS['win_prob']))
+    if win_prob_model == 'student':
+        load_net('win_prob_student', WinProbabilityStudent, input_dim=len(FEATURE_SPECS['win_prob']))
+        if 'win_prob_student' in models:
+            # Same features and scaler as the teacher, so it drops into the same slot
+            models['win_prob_model'] = models.pop('win_prob_student')
+            print("🎓 Serving distilled win-prob student")
+        else:
+            print("⚠️ WIN_PROB_MODEL=student but no student weights, serving the teacher")
+
+    def num_classes(key):
+        if key in encoders:
+            return len(encoders[key].classes_)
+        path = model_dir / f"{key}_model.pt"
+        return checkpoint_classes(path) if not strict and path.exists() else None
+
+    if num_classes('offensive'):
+        load_net('offensive_model', OffensivePlayCallerModel, input_dim=len(FEATURE_SPECS['offensive']),
+                 num_classes=num_classes('offensive'))
+    load_net('defensive_model', DefensiveCoordinatorModel, input_dim=len(FEATURE_SPECS['defensive']))
+    if num_classes('personnel'):
+        load_net('personnel_model', PersonnelOptimizerModel, input_dim=len(FEATURE_SPECS['personnel']),
+                 num_classes=num_classes('personnel'))
+
+    # Optional multi-task model (train.py --multitask)
+    if 'situational' in encoders:
+        sit = encoders['situational']
+        load_net('situational_model', SituationalMultiTaskModel, input_dim=len(FEATURE_SPECS['situational']),
+                 num_play_calls=len(sit['play_call'].classes_), num_personnel=len(sit['personnel'].classes_))
+
+    # Compile serving extractors (spec order + scaler folded into one pass)
+    for key in FEATURE_SPECS:
+        scaler = scalers.get(key)
+        if scaler is None and strict:
+            models.pop(f"{key}_model", None)
+            continue
+        try:
+            extractors[key] = FeatureExtractor(key, scaler)
+        except ValueError as e:
+            models.pop(f"{key}_model", None)
+            print(f"❌ {e}")
+
+    return ArtifactSet(version, models, scalers, encoders, extractors, stamp)
+
+def warm_up(art, batch_sizes=(1, 8)):
+    """Run every model once per batch size so first real requests pay no lazy-init cost"""
+    with torch.no_grad():
+        for name, model in art.models.items():
+            n_features = art.extractors[name[:-len('_model')]].n_features
+            for batch in batch_sizes:
+                model(torch.zeros(batch, n_features))
+
+class ModelRegistry:
+    """
+    Holds the serving ArtifactSet. Readers take `registry.current` once per
+    request and use only that object, so a swap mid-request is invisible to
+    them; reloads are serialised and never mutate a published set.
+    An optional candidate set (models/candidate/ by default) can shadow the
+    primary or take an A/B share of games.
+    """
+    def __init__(self, model_dir=MODEL_DIR, data_dir=DATA_DIR, quantize=False,
+                 runtime='eager', win_prob_model='teacher', candidate_dir=None):
+        self.model_dir = model_dir
+        self.data_dir = data_dir
+        self.candidate_dir = candidate_dir
+        self.options = dict(quantize=quantize, runtime=runtime, win_prob_model=win_prob_model)
+        self.current = None
+        self.previous = deque(maxlen=ROLLBACK_DEPTH)
+        self.candidate = None
+        self.candidate_mode = 'shadow'
+        self.ab_fraction = 0.0
+        self.last_error = None
+        # Artifacts of the last version loaded from model_dir; the watcher compares
+        # against this, not `current`, so a rollback or promotion is not undone
+        self.disk_fingerprint = None
+        self._lock = threading.Lock()
+        self._counter = 0
+        self._watcher = None
+        self._stop = threading.Event()
+
+    def reload(self):
+        """Load, warm up and publish a new version; the old one moves to the rollback stack"""
+        with self._lock:
+            self._counter += 1
+            version = f"v{self._counter}-{time.strftime('%Y%m%d-%H%M%S')}"
+            try:
+                art = load_artifact_set(version, self.model_dir, self.data_dir, **self.options)
+                warm_up(art)
+            except Exception as e:
+                self.last_error = f"{str(e)}\n{traceback.format_exc()}"
+                print(f"🔥 Reload {version} failed, still serving "
+                      f"{self.current.version if self.current else 'nothing'}:\n{self.last_error}")
+                raise
+            if self.current is not None:
+                self.previous.append(self.current)
+            self.current = art  # the atomic swap
+            self.disk_fingerprint = art.fingerprint
+            self.last_error = None
+            print(f"🚀 Serving {version}. Loaded models: {list(art.models.keys())}")
+            return art
+
+    def rollback(self):
+        """Re-publish the most recent previous version"""
+        with self._lock:
+            if not self.previous:
+                raise LookupError("No previous version to roll back to")
+            art = self.previous.pop()
+            print(f"↩️ Rolling back {self.current.version} -> {art.version}")
+            self.current = art
+            return art
+
+    def load_candidate(self, mode='shadow', ab_fraction=0.0):
+        """
+        Load the candidate artifacts (weights plus their own scalers/encoders
+        if present) next to the primary without changing what is served.
+        """
+        if mode not in CANDIDATE_MODES:
+            raise ValueError(f"mode must be one of {CANDIDATE_MODES}")
+        candidate_dir = self.candidate_dir or self.model_dir / "candidate"
+        with self._lock:
+            self._counter += 1
+            version = f"c{self._counter}-{time.strftime('%Y%m%d-%H%M%S')}"
+            art = load_artifact_set(version, candidate_dir, candidate_dir, **self.options)
+            warm_up(art)
+            self.candidate_mode = mode
+            self.ab_fraction = ab_fraction if mode == 'ab' else 0.0
+            self.candidate = art
+            print(f"🧪 Candidate {version} loaded in {mode} mode"
+                  + (f" ({ab_fraction:.0%} of games)" if mode == 'ab' else ""))
+            return art
+
+    def clear_candidate(self):
+        with self._lock:
+            self.candidate, self.ab_fraction = None, 0.0
+
+    def promote_candidate(self):
+        """Serve the candidate as primary; the old primary joins the rollback stack"""
+        with self._lock:
+            if self.candidate is None:
+                raise LookupError("No candidate loaded")
+            if self.current is None:
+                raise LookupError("No primary loaded; reload before promoting a candidate")
+            self.previous.append(self.current)
+            self.current, self.candidate, self.ab_fraction = self.candidate, None, 0.0
+            print(f"⬆️ Promoted candidate {self.current.version}")
+            return self.current
+
+    def route(self, game_id):
+        """
+        ArtifactSet that serves this request: the candidate for its A/B share
+        of games (sticky per game_id), otherwise the primary.
+        """
+        candidate, primary = self.candidate, self.current
+        if candidate is not None and self.ab_fraction > 0:
+            if zlib.crc32(game_id.encode()) % 10000 < self.ab_fraction * 10000:
+                return candidate
+        return primary
+
+    def versions(self):
+        return {
+            "current": self.current.describe() if self.current else None,
+            "previous": [a.describe() for a in reversed(self.previous)],
+            "candidate": self.candidate.describe() | {"mode": self.candidate_mode, "ab_fraction": self.ab_fraction}
+                         if self.candidate else None,
+        }
+
+    def start_watcher(self, interval):
+        """
+        Poll artifact files; reload once they differ from the version last
+        loaded from disk and the change has been stable for one interval
+        """
+        if self._watcher is not None:
+            return
+        def watch():
+            pending, failed = None, None
+            while not self._stop.wait(interval):
+                try:
+                    stamp = fingerprint(self.model_dir, self.data_dir)
+                except OSError:
+                    continue  # a file vanished between glob and stat; look again next tick
+                if stamp == self.disk_fingerprint or stamp == failed:
+                    pending = None
+                elif stamp != pending:
+                    pending = stamp  # changed, wait for writers to finish
+                else:
+                    print("👀 Artifact change detected, reloading")
+                    try:
+                        self.reload()
+                    except Exception:
+                        failed = stamp  # logged in reload; retry only after the files change again
+                    pending = None
+        self._watcher = threading.Thread(target=watch, name="model-watcher", daemon=True)
+        self._watcher.start()
+        print(f"👀 Watching {self.model_dir} and scaler/encoder pickles every {interval}s")
+
+    def stop_watcher(self):
+        self._stop.set()
+        if self._watcher is not None:
+            self._watcher.join()
+            self._watcher = None
+        self._stop.clear()
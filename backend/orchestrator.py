@@ -0,0 +1,173 @@
+"""
+Concurrent Multi-Model Training Orchestrator
+Trains the model targets in parallel worker processes (they share no
+parameters), streams per-epoch progress to the console and a JSON-lines log,
+and publishes each model's artifacts atomically as soon as it finishes.
+
+Usage:
+    python orchestrator.py                              # all five models
+    python orchestrator.py --models offensive           # retrain one, keep the rest
+    python orchestrator.py --workers 3 --parallel-features
+    python orchestrator.py --models situational         # multi-task model only
+"""
+
+import argparse
+import json
+import os
+import queue
+import time
+import multiprocessing as mp
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+
+import joblib
+import torch
+
+import train
+from train import (
+    FEATURE_BUILDERS, DEFAULT_TARGETS, DATA_DIR, MODEL_DIR, DEVICE,
+    build_feature_sets, forget_completed, train_target
+)
+from data_loader import NFLDataLoader
+from feature_engineering import NFLFeatureEngineer
+
+LOG_PATH = DATA_DIR / "training_log.jsonl"
+
+# Inherited by forked training workers: features, progress queue, thread budget
+_JOBS = {}
+
+def _train_in_worker(name):
+    torch.set_num_threads(_JOBS['threads'])
+    events = _JOBS['events']
+
+    def progress(model_name, epoch, train_loss, val_loss, lr):
+        events.put({'event': 'epoch', 'target': name, 'model': model_name, 'epoch': epoch,
+                    'epochs': train.EPOCHS, 'train_loss': train_loss, 'val_loss': val_loss, 'lr': lr})
+
+    start = time.perf_counter()
+    X, y = _JOBS['features'][name]
+    engineer = NFLFeatureEngineer()
+    encoders = {}
+    train_target(engineer, name, X, y, encoders, progress, _JOBS['resume'])
+    return name, engineer.scalers[name], encoders.get(name), time.perf_counter() - start
+
+def _dump_atomic(obj, path):
+    tmp_path = f"{path}.tmp"
+    joblib.dump(obj, tmp_path)
+    os.replace(tmp_path, path)
+
+def publish_preprocessors(name, scaler, encoder):
+    """Merge one target's scaler/encoder into the shared pickles without touching the others"""
+    for filename, key, value in (("scalers.pkl", name, scaler), ("encoders.pkl", name, encoder)):
+        if value is None:
+            continue
+        path = DATA_DIR / filename
+        current = joblib.load(path) if path.exists() else {}
+        current[key] = value
+        _dump_atomic(current, path)
+
+class ProgressLog:
+    """Console + JSON-lines sink for orchestrator events"""
+    def __init__(self, path):
+        self.file = open(path, 'a', buffering=1)
+
+    def write(self, record):
+        record = {'ts': time.time(), **record}
+        self.file.write(json.dumps(record) + "\n")
+        if record['event'] == 'epoch':
+            print(f"  [{record['target']:>11}] epoch {record['epoch']:>3}/{record['epochs']} | "
+                  f"train {record['train_loss']:.4f} | val {record['val_loss']:.4f} | lr {record['lr']:.2e}")
+        elif record['event'] == 'done':
+            print(f"✅ {record['target']} finished in {record['seconds']:.1f}s, artifacts published")
+        elif record['event'] == 'failed':
+            print(f"🔥 {record['target']} failed: {record['error']}")
+
+    def close(self):
+        self.file.close()
+
+def orchestrate(names, workers=None, parallel_features=False, log_path=LOG_PATH, resume=False):
+    cpu_count = os.cpu_count() or 1
+    if DEVICE.type == 'cuda' or 'fork' not in mp.get_all_start_methods():
+        # CUDA contexts do not survive fork; train in-process one after another on every core
+        n_workers, threads = 0, cpu_count
+    else:
+        n_workers = max(1, min(workers or len(names), len(names), cpu_count))
+        threads = max(1, cpu_count // n_workers)
+
+    if not resume:
+        forget_completed(names)
+    loader = NFLDataLoader()
+    engineer = NFLFeatureEngineer()
+    print("📥 Loading Data...")
+    data = loader.load_all_intelligence_data()
+    clean_pbp = engineer.clean_pbp(data['pbp'])
+    features = build_feature_sets(engineer, clean_pbp, data['ftn'], names=names, parallel=parallel_features)
+    del data, clean_pbp
+
+    log = ProgressLog(log_path)
+    log.write({'event': 'start', 'targets': list(names), 'workers': n_workers, 'threads_per_worker': threads})
+    where = f"on {n_workers} workers x {threads} threads" if n_workers else f"in-process, one at a time on {threads} threads"
+    print(f"🚀 Training {list(names)} {where} (log: {log_path})")
+
+    ctx = mp.get_context('fork') if n_workers else None
+    events = ctx.Queue() if n_workers else queue.Queue()
+    _JOBS.update(features=features, events=events, threads=threads, resume=resume)
+    failures = []
+    try:
+        if n_workers:
+            with ProcessPoolExecutor(max_workers=n_workers, mp_context=ctx) as pool:
+                pending = {pool.submit(_train_in_worker, name): name for name in names}
+                while pending:
+                    done, _ = wait(pending, timeout=0.5, return_when=FIRST_COMPLETED)
+                    _drain(events, log)
+                    for future in done:
+                        name = pending.pop(future)
+                        try:
+                            _, scaler, encoder, seconds = future.result()
+                        except Exception as e:
+                            failures.append(name)
+                            log.write({'event': 'failed', 'target': name, 'error': repr(e)})
+                            continue
+                        publish_preprocessors(name, scaler, encoder)
+                        log.write({'event': 'done', 'target': name, 'seconds': seconds})
+                _drain(events, log)
+        else:
+            for name in names:
+                try:
+                    _, scaler, encoder, seconds = _train_in_worker(name)
+                except Exception as e:
+                    _drain(events, log)
+                    failures.append(name)
+                    log.write({'event': 'failed', 'target': name, 'error': repr(e)})
+                    continue
+                _drain(events, log)
+                publish_preprocessors(name, scaler, encoder)
+                log.write({'event': 'done', 'target': name, 'seconds': seconds})
+    finally:
+        _JOBS.clear()
+        log.write({'event': 'end', 'failed': failures})
+        log.close()
+    return failures
+
+def _drain(events, log):
+    while True:
+        try:
+            log.write(events.get_nowait())
+        except queue.Empty:
+            return
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--models", default=",".join(DEFAULT_TARGETS),
+                        help=f"Comma-separated subset of: {', '.join(FEATURE_BUILDERS)}")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--parallel-features", action="store_true")
+    parser.add_argument("--log", default=str(LOG_PATH))
+    parser.add_argument("--resume", action="store_true", help="Continue each model from its last checkpoint; models already finished are kept")
+    args = parser.parse_args()
+
+    names = tuple(n.strip() for n in args.models.split(",") if n.strip())
+    unknown = [n for n in names if n not in FEATURE_BUILDERS]
+    if unknown:
+        parser.error(f"unknown model(s): {unknown}")
+    failed = orchestrate(names, args.workers, args.parallel_features, args.log, args.resume)
+    print(f"🏁 Done. Artifacts in {DATA_DIR} and {MODEL_DIR}" + (f" | failed: {failed}" if failed else ""))
@@ -0,0 +1,82 @@
+"""
+Play-by-Play -> GameState
+Turns cached pbp rows into the GameState payloads backend/main.py accepts,
+so load tests and game replays drive the API with real snaps.
+"""
+
+import numpy as np
+import pandas as pd
+import pyarrow.parquet as pq
+
+from data_loader import NFLDataLoader
+
+# Raw pbp columns a GameState is built from (plus ordering/context columns)
+SNAP_COLUMNS = [
+    'game_id', 'play_id', 'season', 'week', 'season_type', 'home_team', 'away_team', 'posteam', 'play_type',
+    'down', 'ydstogo', 'yardline_100', 'score_differential', 'qtr',
+    'quarter_seconds_remaining', 'game_seconds_remaining', 'half_seconds_remaining',
+    'posteam_timeouts_remaining', 'defteam_timeouts_remaining',
+    'total_home_score', 'total_away_score', 'time_of_day',
+]
+
+# Snaps missing any of these cannot be expressed as a GameState
+REQUIRED = ['game_id', 'posteam', 'down', 'ydstogo', 'yardline_100', 'score_differential', 'qtr',
+            'game_seconds_remaining', 'posteam_timeouts_remaining', 'defteam_timeouts_remaining']
+
+def load_pbp(years=range(2018, 2025)):
+    """Cached pbp projected to SNAP_COLUMNS (downloads on first use)"""
+    loader = NFLDataLoader()
+    path = loader.pbp_cache_file(years)
+    if not path.exists():
+        return loader.load_play_by_play(years)
+    available = pq.ParquetFile(path).schema_arrow.names
+    return pd.read_parquet(path, columns=[c for c in SNAP_COLUMNS if c in available])
+
+def snaps(pbp):
+    """
+    Regular-season and playoff plays with a down and an offense, in game
+    order. Scores are carried forward from the previous play because pbp's
+    total_*_score columns are the score after the play.
+    """
+    df = pbp[pbp['season_type'].isin(['REG', 'POST'])] if 'season_type' in pbp else pbp
+    order = ['game_id', 'play_id'] if 'play_id' in df else ['game_id']
+    df = df.sort_values(order, kind='stable')
+    pre_home = df.groupby('game_id')['total_home_score'].shift(fill_value=0)
+    pre_away = df.groupby('game_id')['total_away_score'].shift(fill_value=0)
+    df = df.assign(score_home=pre_home, score_away=pre_away).dropna(subset=REQUIRED)
+    return df.reset_index(drop=True)
+
+def to_states(df):
+    """GameState dicts (JSON-ready Python ints) for each row of snaps(pbp)"""
+    gsr = df['game_seconds_remaining'].to_numpy(dtype=np.int64)
+    yardline = df['yardline_100'].to_numpy(dtype=np.int64)
+    qtr = df['qtr'].to_numpy(dtype=np.int64)
+    if 'quarter_seconds_remaining' in df:
+        clock = df['quarter_seconds_remaining'].fillna(pd.Series(gsr % 900, index=df.index))
+    else:
+        # 2700 s left is the start of Q2 (15:00), not 0:00
+        clock = np.where(gsr > 0, (gsr - 1) % 900 + 1, 0)
+    half = df['half_seconds_remaining'].fillna(pd.Series(gsr % 1800, index=df.index)) \
+        if 'half_seconds_remaining' in df else gsr % 1800
+
+    states = pd.DataFrame({
+        'game_id': df['game_id'].astype(str),
+        'qtr': qtr,
+        'time_remaining': np.asarray(clock, dtype=np.int64),
+        'score_home': df['score_home'].to_numpy(dtype=np.int64),
+        'score_away': df['score_away'].to_numpy(dtype=np.int64),
+        'possession': np.where(df['posteam'] == df['home_team'], 'home', 'away'),
+        'down': df['down'].to_numpy(dtype=np.int64),
+        'ydstogo': df['ydstogo'].to_numpy(dtype=np.int64),
+        'yardline_100': yardline,
+        'score_differential': df['score_differential'].to_numpy(dtype=np.int64),
+        'game_seconds_remaining': gsr,
+        'half_seconds_remaining': np.asarray(half, dtype=np.int64),
+        # Same definitions as NFLFeatureEngineer.clean_pbp, so served features match training
+        'red_zone': (yardline <= 20).astype(np.int64),
+        'goal_to_go': (yardline <= 10).astype(np.int64),
+        'two_min_drill': ((gsr <= 120) & np.isin(qtr, [2, 4])).astype(np.int64),
+        'posteam_timeouts_remaining': df['posteam_timeouts_remaining'].to_numpy(dtype=np.int64),
+        'defteam_timeouts_remaining': df['defteam_timeouts_remaining'].to_numpy(dtype=np.int64),
+    })
+    return states.to_dict('records')
@@ -0,0 +1,237 @@
+"""
+Historical Game Replay
+Streams full games from the cached pbp parquet through the prediction
+endpoints at an accelerated clock, many games at once, to soak-test
+live-game behaviour out of season. Every snap becomes a GameState and is
+sent to each endpoint in parallel (the fourth-down model only on 4th down),
+at the time it happened in the broadcast divided by --speed.
+
+Per-play latency and the full model outputs are written to
+data/replay/<run>.parquet; --compare diffs two runs (e.g. before/after a
+retrain or runtime change).
+
+Usage:
+    python replay.py --games 16 --speed 60
+    python replay.py --season 2023 --week 1 --speed 120 --target uvicorn
+    python replay.py --compare data/replay/before.parquet data/replay/after.parquet
+"""
+
+import argparse
+import asyncio
+import json
+import time
+from pathlib import Path
+
+import httpx
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from loadtest import ENDPOINTS, LocalServer
+from model_registry import DATA_DIR
+from pbp_states import load_pbp, snaps, to_states
+
+OUT_DIR = DATA_DIR / "replay"
+REPLAY_ENDPOINTS = ('fourth-down', 'offensive', 'defensive', 'personnel', 'situational')
+PLAY_GAP_S = 35.0    # huddle + play clock between snaps when no broadcast clock is available
+HALFTIME_S = 780.0
+MAX_GAP_S = 1800.0   # longer gaps (reviews, injuries, bad timestamps) are replaced by the estimate
+
+def select_games(df, n_games, season, week, game_ids, seed):
+    if game_ids:
+        keep = game_ids
+    else:
+        pool = df
+        if season is not None and 'season' in pool:
+            pool = pool[pool['season'] == season]
+        if week is not None and 'week' in pool:
+            pool = pool[pool['week'] == week]
+        ids = pool['game_id'].unique()
+        rng = np.random.default_rng(seed)
+        keep = ids if n_games is None or n_games >= len(ids) else rng.choice(ids, n_games, replace=False)
+    return df[df['game_id'].isin(set(keep))].reset_index(drop=True)
+
+def play_offsets(game):
+    """
+    Broadcast seconds from the first snap to each snap: time_of_day deltas
+    when present, otherwise game-clock elapsed plus a fixed gap between snaps
+    and a halftime break.
+    """
+    gsr = game['game_seconds_remaining'].to_numpy(dtype=np.float64)
+    qtr = game['qtr'].to_numpy()
+    estimate = np.clip(-np.diff(gsr, prepend=gsr[0]), 0, None) + PLAY_GAP_S
+    estimate[np.flatnonzero((qtr[1:] == 3) & (qtr[:-1] == 2)) + 1] += HALFTIME_S
+    estimate[0] = 0.0
+    gaps = estimate
+    if 'time_of_day' in game and game['time_of_day'].notna().any():
+        stamps = pd.to_datetime(game['time_of_day'], errors='coerce', utc=True)
+        observed = stamps.diff().dt.total_seconds().to_numpy()
+        usable = ~np.isnan(observed) & (observed >= 0) & (observed <= MAX_GAP_S)
+        gaps = np.where(usable, observed, estimate)
+        gaps[0] = 0.0
+    return np.cumsum(gaps)
+
+def compact_output(body):
+    """Model outputs without the static formation diagram"""
+    body.pop('formation_data', None)
+    return json.dumps(body, separators=(',', ':'))
+
+async def replay_game(client, game, states, endpoints, speed, t0, stagger, timeout, records):
+    loop = asyncio.get_running_loop()
+    offsets = play_offsets(game) / speed + stagger
+    play_ids = game['play_id'].to_numpy() if 'play_id' in game else np.arange(len(game))
+    downs = game['down'].to_numpy()
+
+    async def send(endpoint, state, play, intended):
+        lag = loop.time() - intended
+        start = loop.time()
+        try:
+            response = await client.post(ENDPOINTS[endpoint], json=state, timeout=timeout)
+            status = response.status_code
+            output = compact_output(response.json()) if status == 200 else response.text[:500]
+        except httpx.HTTPError as e:
+            status, output = -1, type(e).__name__
+        records.append({
+            'game_id': state['game_id'], 'play_id': float(play_ids[play]), 'play_index': play,
+            'down': int(downs[play]), 'endpoint': endpoint, 'replay_s': float(offsets[play]),
+            'lag_ms': lag * 1000, 'latency_ms': (loop.time() - start) * 1000,
+            'status': status, 'output': output,
+        })
+
+    tasks = []
+    for play, state in enumerate(states):
+        intended = t0 + offsets[play]
+        delay = intended - loop.time()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        for endpoint in endpoints:
+            if endpoint == 'fourth-down' and state['down'] != 4:
+                continue
+            # Plays are open-loop: a slow response never delays the next snap
+            tasks.append(asyncio.create_task(send(endpoint, state, play, intended)))
+    await asyncio.gather(*tasks)
+
+async def run_replay(base_url, transport, games, endpoints, speed, stagger, timeout):
+    records = []
+    async with httpx.AsyncClient(transport=transport, base_url=base_url,
+                                 limits=httpx.Limits(max_connections=512)) as client:
+        health = (await client.get("/health")).json()
+        per_game = [(game, to_states(game)) for _, game in games.groupby('game_id', sort=False)]
+        t0 = asyncio.get_running_loop().time() + 0.1
+        await asyncio.gather(*(replay_game(client, game, states, endpoints, speed, t0,
+                                           i * stagger / speed, timeout, records)
+                               for i, (game, states) in enumerate(per_game)))
+    return pd.DataFrame(records), health
+
+def print_latency(frame, label=""):
+    print(f"\n⏱️ Per-play latency{label}")
+    for endpoint, rows in frame.groupby('endpoint'):
+        ok = rows[rows['status'] == 200]['latency_ms']
+        p50, p95, p99 = np.percentile(ok, [50, 95, 99]) if len(ok) else (np.nan,) * 3
+        print(f"  {endpoint:>12} | {len(rows):>7,} req | p50 {p50:7.2f} ms | p95 {p95:7.2f} ms | "
+              f"p99 {p99:7.2f} ms | errors {int((rows['status'] != 200).sum())}")
+    lag = np.percentile(frame['lag_ms'], 99)
+    if lag > 10:
+        print(f"  ⚠️ Replay fell behind schedule (lag p99 {lag:.1f} ms); lower --speed or fewer --games")
+
+def leaves(value, prefix=""):
+    """Flatten a response into {path: number or label}"""
+    if isinstance(value, dict):
+        out = {}
+        for key, v in value.items():
+            out.update(leaves(v, f"{prefix}{key}."))
+        return out
+    return {prefix[:-1]: value}
+
+def compare(path_a, path_b):
+    """Output drift and latency change between two replays of the same plays"""
+    a, b = pd.read_parquet(path_a), pd.read_parquet(path_b)
+    keys = ['game_id', 'play_id', 'endpoint']
+    both = a[a['status'] == 200].merge(b[b['status'] == 200], on=keys, suffixes=('_a', '_b'))
+    print(f"🔍 {len(both):,} requests in both runs ({Path(path_a).name} vs {Path(path_b).name})")
+    for endpoint, rows in both.groupby('endpoint'):
+        max_dev, devs, changed = 0.0, [], 0
+        for out_a, out_b in zip(rows['output_a'], rows['output_b']):
+            la, lb = leaves(json.loads(out_a)), leaves(json.loads(out_b))
+            for key in la.keys() & lb.keys():
+                va, vb = la[key], lb[key]
+                if isinstance(va, (int, float)) and isinstance(vb, (int, float)):
+                    devs.append(abs(va - vb))
+                elif va != vb:
+                    changed += 1
+        if devs:
+            max_dev = max(devs)
+        p99_a, p99_b = np.percentile(rows['latency_ms_a'], 99), np.percentile(rows['latency_ms_b'], 99)
+        print(f"  {endpoint:>12} | {len(rows):>7,} plays | max dev {max_dev:.2e} | "
+              f"mean {np.mean(devs) if devs else 0:.2e} | label changes {changed} | "
+              f"p99 {p99_a:.2f} -> {p99_b:.2f} ms")
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--games", type=int, default=16, help="Games sampled and replayed concurrently")
+    parser.add_argument("--season", type=int, default=None)
+    parser.add_argument("--week", type=int, default=None)
+    parser.add_argument("--game-ids", default=None, help="Comma list of game_ids (overrides sampling)")
+    parser.add_argument("--speed", type=float, default=60.0, help="Replay speed-up over the broadcast clock")
+    parser.add_argument("--stagger", type=float, default=0.0, help="Broadcast seconds between kickoffs")
+    parser.add_argument("--endpoints", default=",".join(REPLAY_ENDPOINTS))
+    parser.add_argument("--target", choices=["asgi", "uvicorn"], default="asgi")
+    parser.add_argument("--url", default=None, help="Replay against a running server instead")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--timeout", type=float, default=10.0)
+    parser.add_argument("--start-year", type=int, default=2018)
+    parser.add_argument("--end-year", type=int, default=2024)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", default=None, help="Parquet path (default: data/replay/<timestamp>.parquet)")
+    parser.add_argument("--compare", nargs=2, metavar=("BEFORE", "AFTER"), help="Diff two recorded replays")
+    args = parser.parse_args()
+
+    if args.compare:
+        compare(*args.compare)
+        return
+
+    endpoints = [e.strip() for e in args.endpoints.split(",")]
+    unknown = [e for e in endpoints if e not in REPLAY_ENDPOINTS]
+    if unknown:
+        raise SystemExit(f"❌ Unknown endpoint(s) {unknown} (choose from {', '.join(REPLAY_ENDPOINTS)})")
+
+    print("📥 Loading games...")
+    game_ids = [g.strip() for g in args.game_ids.split(",")] if args.game_ids else None
+    games = select_games(snaps(load_pbp(range(args.start_year, args.end_year + 1))),
+                         args.games, args.season, args.week, game_ids, args.seed)
+    if games.empty:
+        raise SystemExit("❌ No games match the selection")
+    longest = max(play_offsets(g)[-1] for _, g in games.groupby('game_id')) + args.stagger * (games['game_id'].nunique() - 1)
+    print(f"🏈 {games['game_id'].nunique()} games, {len(games):,} snaps at {args.speed:g}x "
+          f"(~{longest / args.speed / 60:.1f} min)")
+
+    start = time.perf_counter()
+    if args.url:
+        frame, health = asyncio.run(run_replay(args.url, None, games, endpoints, args.speed, args.stagger, args.timeout))
+    else:
+        import main as api
+        if args.target == 'asgi':
+            if api.registry.current is None:
+                api.load_artifacts()
+            frame, health = asyncio.run(run_replay("http://replay", httpx.ASGITransport(app=api.app), games,
+                                                   endpoints, args.speed, args.stagger, args.timeout))
+        else:
+            with LocalServer(api.app, args.port):
+                frame, health = asyncio.run(run_replay(f"http://127.0.0.1:{args.port}", None, games, endpoints,
+                                                       args.speed, args.stagger, args.timeout))
+    wall = time.perf_counter() - start
+
+    out = Path(args.out) if args.out else OUT_DIR / f"replay_{time.strftime('%Y%m%d-%H%M%S')}.parquet"
+    out.parent.mkdir(parents=True, exist_ok=True)
+    meta = {'speed': args.speed, 'games': int(games['game_id'].nunique()), 'endpoints': endpoints,
+            'target': args.url or args.target, 'version': health.get('version'), 'wall_seconds': wall}
+    table = pa.Table.from_pandas(frame, preserve_index=False)
+    pq.write_table(table.replace_schema_metadata({**(table.schema.metadata or {}),
+                                                  b'replay': json.dumps(meta).encode()}), out)
+
+    print_latency(frame, f" (model version {health.get('version')})")
+    print(f"\n💾 {len(frame):,} requests over {wall:.1f}s recorded to {out}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,195 @@
+"""
+Shadow Comparison Logging
+Samples live requests, re-runs them through both the primary and the
+candidate artifact sets in batches on a background thread (never on the
+request path), and appends input/output pairs to a compact binary log.
+
+Log layout: MAGIC, then length-prefixed records. A META record (JSON) names
+the primary/candidate versions and head layout for one model; SAMPLE records
+that follow carry raw float32 features and both versions' flattened outputs.
+"""
+
+import json
+import queue
+import random
+import struct
+import threading
+import time
+from collections import defaultdict
+
+import numpy as np
+import torch
+
+from model_registry import OUTPUT_HEADS, head_outputs
+
+MAGIC = b"NFLSHDW1"
+RECORD = struct.Struct("<BI")           # record type, payload length
+SAMPLE = struct.Struct("<dBBBBB")       # ts, model index, served by candidate, n_in, n_out primary, n_out candidate
+META, SAMPLE_TYPE = 0, 1
+MODEL_KEYS = tuple(OUTPUT_HEADS)
+
+class ShadowLogWriter:
+    """Append-only writer; a META record precedes a model's samples whenever its versions change"""
+    def __init__(self, path):
+        self.path = path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.file = open(path, 'ab')
+        if self.file.tell() == 0:
+            self.file.write(MAGIC)
+        self._described = {}
+
+    def _record(self, kind, payload):
+        self.file.write(RECORD.pack(kind, len(payload)))
+        self.file.write(payload)
+
+    def describe(self, primary, candidate, key, layout, columns):
+        if self._described.get(key) == (primary, candidate):
+            return
+        self._described[key] = (primary, candidate)
+        meta = {'primary': primary, 'candidate': candidate, 'model': key,
+                'heads': layout, 'columns': list(columns)}
+        self._record(META, json.dumps(meta).encode())
+
+    def samples(self, key, timestamps, served, inputs, primary_out, candidate_out):
+        idx = MODEL_KEYS.index(key)
+        n_in, n_p, n_c = inputs.shape[1], primary_out.shape[1], candidate_out.shape[1]
+        for i in range(len(inputs)):
+            payload = (SAMPLE.pack(timestamps[i], idx, served[i], n_in, n_p, n_c)
+                       + inputs[i].tobytes() + primary_out[i].tobytes() + candidate_out[i].tobytes())
+            self._record(SAMPLE_TYPE, payload)
+
+    def flush(self):
+        self.file.flush()
+
+    def close(self):
+        self.file.close()
+
+def read_shadow_log(path):
+    """Yield ('meta', dict) and ('sample', dict) records; a truncated tail is ignored"""
+    with open(path, 'rb') as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"{path} is not a shadow log")
+        meta = {}
+        while True:
+            header = f.read(RECORD.size)
+            if len(header) < RECORD.size:
+                return
+            kind, length = RECORD.unpack(header)
+            payload = f.read(length)
+            if len(payload) < length:
+                return
+            if kind == META:
+                record = json.loads(payload)
+                meta[record['model']] = record
+                yield 'meta', record
+                continue
+            ts, idx, served, n_in, n_p, n_c = SAMPLE.unpack_from(payload)
+            values = np.frombuffer(payload, dtype=np.float32, offset=SAMPLE.size)
+            key = MODEL_KEYS[idx]
+            yield 'sample', {
+                'ts': ts, 'model': key, 'served_by_candidate': bool(served),
+                'primary_version': meta[key]['primary'], 'candidate_version': meta[key]['candidate'],
+                'inputs': values[:n_in], 'primary': values[n_in:n_in + n_p],
+                'candidate': values[n_in + n_p:n_in + n_p + n_c],
+            }
+
+class ShadowRunner:
+    """
+    Background comparison of primary vs candidate on sampled requests.
+    `observe` is the only call on the request path: a random draw and a
+    non-blocking queue put (dropped, not waited on, when the queue is full).
+    """
+    def __init__(self, registry, log_path, sample_rate=0.1, batch_size=64, flush_interval=0.5, max_queue=10000):
+        self.registry = registry
+        self.log_path = log_path
+        self.sample_rate = sample_rate
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.queue = queue.Queue(maxsize=max_queue)
+        self.dropped = 0
+        self.logged = 0
+        self._thread = None
+        self._stop = threading.Event()
+
+    def observe(self, keys, state, served_by_candidate=False):
+        if self.registry.candidate is None or random.random() >= self.sample_rate:
+            return
+        try:
+            self.queue.put_nowait((time.time(), keys, state, served_by_candidate))
+        except queue.Full:
+            self.dropped += 1
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="shadow-runner", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self._stop.clear()
+
+    def stats(self):
+        return {"sample_rate": self.sample_rate, "queued": self.queue.qsize(),
+                "logged": self.logged, "dropped": self.dropped, "log": str(self.log_path)}
+
+    def _run(self):
+        writer = ShadowLogWriter(self.log_path)
+        try:
+            while not self._stop.is_set():
+                batch = self._collect()
+                if batch:
+                    try:
+                        self._compare(batch, writer)
+                        writer.flush()
+                    except Exception as e:
+                        print(f"⚠️ Shadow batch of {len(batch)} skipped: {e}")
+        finally:
+            writer.close()
+
+    def _collect(self):
+        """Up to batch_size items, waiting at most flush_interval after the first"""
+        try:
+            batch = [self.queue.get(timeout=self.flush_interval)]
+        except queue.Empty:
+            return []
+        deadline = time.monotonic() + self.flush_interval
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self.queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _compare(self, batch, writer):
+        primary, candidate = self.registry.current, self.registry.candidate
+        if primary is None or candidate is None:
+            return
+        by_key = defaultdict(list)
+        for ts, keys, state, served in batch:
+            for key in keys:
+                by_key[key].append((ts, state, served))
+
+        for key, items in by_key.items():
+            name = f"{key}_model"
+            if name not in primary.models or name not in candidate.models:
+                continue
+            states = [state for _, state, _ in items]
+            raw = primary.extractors[key].extract(states).copy()
+            outputs = []
+            for art in (primary, candidate):
+                with torch.no_grad():
+                    heads = head_outputs(key, art.models[name](torch.from_numpy(art.extractors[key].transform(states))))
+                outputs.append(heads)
+            layout = [[head, kind, p.shape[1], c.shape[1]]
+                      for (head, kind, p), (_, _, c) in zip(*outputs)]
+            writer.describe(primary.version, candidate.version, key, layout, primary.extractors[key].columns)
+            flat = [np.concatenate([a.reshape(len(states), -1) for _, _, a in heads], axis=1).astype(np.float32)
+                    for heads in outputs]
+            writer.samples(key, [ts for ts, _, _ in items], [served for _, _, served in items], raw, *flat)
+            self.logged += len(items)
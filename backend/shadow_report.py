@@ -0,0 +1,94 @@
+"""
+Shadow Comparison Report
+Summarises a shadow log written by the API: per primary/candidate pair, model
+and head, how often the two versions would decide differently and how far
+their raw outputs drift apart.
+
+Usage:
+    python shadow_report.py
+    python shadow_report.py --log data/shadow_log.bin --json shadow_report.json
+"""
+
+import argparse
+import json
+from collections import defaultdict
+from pathlib import Path
+
+import numpy as np
+
+from model_registry import BASE_DIR, decisions
+from shadow import read_shadow_log
+
+DEFAULT_LOG = BASE_DIR / "data" / "shadow_log.bin"
+
+def load_samples(path):
+    """Group sample outputs by (primary, candidate, model) together with their head layout"""
+    groups = defaultdict(lambda: {'primary': [], 'candidate': [], 'served': []})
+    layouts = {}
+    for kind, record in read_shadow_log(path):
+        if kind == 'meta':
+            layouts[(record['primary'], record['candidate'], record['model'])] = record['heads']
+            continue
+        group = groups[(record['primary_version'], record['candidate_version'], record['model'])]
+        group['primary'].append(record['primary'])
+        group['candidate'].append(record['candidate'])
+        group['served'].append(record['served_by_candidate'])
+    return groups, layouts
+
+def summarise(groups, layouts):
+    rows = []
+    for (primary, candidate, model), group in groups.items():
+        P, C = np.stack(group['primary']), np.stack(group['candidate'])
+        served = float(np.mean(group['served']))
+        p_off = c_off = 0
+        for head, kind, p_width, c_width in layouts[(primary, candidate, model)]:
+            a, b = P[:, p_off:p_off + p_width], C[:, c_off:c_off + c_width]
+            p_off, c_off = p_off + p_width, c_off + c_width
+            row = {'primary': primary, 'candidate': candidate, 'model': model, 'head': head,
+                   'n': len(P), 'served_by_candidate': served}
+            if p_width != c_width:
+                # e.g. the candidate was trained with a different label set
+                rows.append(row | {'skipped': f"width {p_width} vs {c_width}"})
+                continue
+            diff = np.abs(a - b)
+            d_a, d_b = decisions(kind, a), decisions(kind, b)
+            rows.append(row | {
+                'disagreement': None if d_a is None else float(np.mean(d_a != d_b)),
+                'mean_abs_dev': float(diff.mean()), 'max_abs_dev': float(diff.max()),
+            })
+    return rows
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--log", type=Path, default=DEFAULT_LOG)
+    parser.add_argument("--json", default=None, help="Also write the report to this path")
+    args = parser.parse_args()
+
+    if not args.log.exists():
+        print(f"❌ No shadow log at {args.log}")
+        return
+    rows = summarise(*load_samples(args.log))
+    if not rows:
+        print(f"⚠️ {args.log} has no samples yet")
+        return
+
+    pair = None
+    for r in rows:
+        if (r['primary'], r['candidate']) != pair:
+            pair = (r['primary'], r['candidate'])
+            print(f"\n🧪 primary {pair[0]} vs candidate {pair[1]}")
+        prefix = f"  {r['model']:>11} {r['head']:>11} | n {r['n']:>6,}"
+        if 'skipped' in r:
+            print(f"{prefix} | skipped ({r['skipped']})")
+            continue
+        disagree = "n/a" if r['disagreement'] is None else f"{r['disagreement']:.3%}"
+        print(f"{prefix} | disagree {disagree:>8} | mean dev {r['mean_abs_dev']:.5f} | "
+              f"max dev {r['max_abs_dev']:.5f} | candidate served {r['served_by_candidate']:.1%}")
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(rows, f, indent=2)
+        print(f"\n💾 Report saved to {args.json}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+"""
+Streaming Training Data Pipeline
+Iterates the cached play-by-play parquet in bounded chunks and turns it into
+shuffled mini-batches, so training never holds the full pbp frame in memory.
+"""
+
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+import pyarrow.parquet as pq
+import torch
+
+# Raw pbp columns needed by clean_pbp and every get_*_features builder.
+# Projecting to these keeps chunks a small fraction of the ~370-column frame.
+PBP_COLUMNS = [
+    'game_id', 'season_type', 'home_team', 'posteam', 'play_type', 'desc',
+    'down', 'ydstogo', 'yardline_100', 'score_differential', 'qtr',
+    'game_seconds_remaining', 'half_seconds_remaining',
+    'posteam_timeouts_remaining', 'defteam_timeouts_remaining',
+    'total_home_score', 'total_away_score',
+    'field_goal_attempt', 'punt_attempt', 'series_success', 'field_goal_result', 'epa',
+]
+
+# Columns needed by clean_pbp + game_outcomes in the pre-pass
+OUTCOME_COLUMNS = [
+    'game_id', 'season_type', 'yardline_100', 'game_seconds_remaining', 'qtr',
+    'total_home_score', 'total_away_score',
+]
+
+# Working copies made while cleaning and building features from one chunk
+CHUNK_OVERHEAD = 4
+
+@dataclass
+class MemoryPlan:
+    chunk_rows: int
+    buffer_rows: int
+    bytes_per_row: float
+
+def plan_memory_budget(path, memory_budget_mb, columns=PBP_COLUMNS, sample_rows=4096, max_features=16):
+    """
+    Split a memory budget between the parquet read chunk and the shuffle
+    buffer, using the measured in-memory size of a small sample of rows.
+    Note: pyarrow decodes one row group at a time, so caches written with very
+    large row groups add roughly one row group of projected columns on top.
+    """
+    budget = memory_budget_mb * 1024 * 1024
+    pf = pq.ParquetFile(path)
+    columns = [c for c in columns if c in pf.schema_arrow.names]
+    sample = next(pf.iter_batches(batch_size=sample_rows, columns=columns)).to_pandas()
+    bytes_per_row = sample.memory_usage(deep=True).sum() / max(len(sample), 1)
+
+    # Half for the raw chunk (+ cleaning copies), half for the float32 shuffle buffer
+    chunk_rows = int(budget * 0.5 / (bytes_per_row * CHUNK_OVERHEAD))
+    buffer_rows = int(budget * 0.5 / ((max_features + 4) * 4))
+    return MemoryPlan(max(chunk_rows, 1024), max(buffer_rows, 4096), bytes_per_row)
+
+class PBPChunkSource:
+    """Re-iterable stream of pbp DataFrame chunks read from a parquet file"""
+    def __init__(self, path, columns=PBP_COLUMNS, chunk_rows=65536):
+        self.path = path
+        self.chunk_rows = chunk_rows
+        available = pq.ParquetFile(path).schema_arrow.names
+        self.columns = [c for c in columns if c in available]
+
+    def __iter__(self):
+        pf = pq.ParquetFile(self.path)
+        for batch in pf.iter_batches(batch_size=self.chunk_rows, columns=self.columns):
+            yield batch.to_pandas()
+
+def is_validation_game(game_ids, val_fraction=0.2):
+    """Deterministic game-level split: the same games land in validation on every pass"""
+    buckets = pd.util.hash_pandas_object(game_ids, index=False).values % 1000
+    return buckets < int(val_fraction * 1000)
+
+class ShuffleBufferLoader:
+    """
+    Re-iterable loader yielding shuffled mini-batches of tensors from a chunk
+    stream. `transform(chunk)` returns a tuple of equal-length numpy arrays
+    (features first); rows are pooled until `buffer_rows` is reached, then
+    permuted and emitted. Each epoch re-streams the source.
+    """
+    def __init__(self, source, transform, buffer_rows, batch_size, shuffle=True, device='cpu', seed=0):
+        self.source = source
+        self.transform = transform
+        self.buffer_rows = buffer_rows
+        self.batch_size = batch_size
+        self.shuffle = shuffle
+        self.device = device
+        self.seed = seed
+        self._epoch = 0
+
+    def __iter__(self):
+        rng = np.random.default_rng(self.seed + self._epoch)
+        self._epoch += 1
+        pending, pending_rows = [], 0
+        for chunk in self.source:
+            arrays = self.transform(chunk)
+            if arrays is None or len(arrays[0]) == 0:
+                continue
+            pending.append(arrays)
+            pending_rows += len(arrays[0])
+            if pending_rows >= self.buffer_rows:
+                pending = yield from self._drain(pending, rng, final=False)
+                pending_rows = len(pending[0][0]) if pending else 0
+        if pending:
+            yield from self._drain(pending, rng, final=True)
+
+    def _drain(self, pending, rng, final):
+        pooled = [np.concatenate(cols) for cols in zip(*pending)]
+        n = len(pooled[0])
+        order = rng.permutation(n) if self.shuffle else np.arange(n)
+        n_full = n if final else n - n % self.batch_size
+        for start in range(0, n_full, self.batch_size):
+            idx = order[start:start + self.batch_size]
+            if len(idx) < 2:  # BatchNorm cannot train on a single row
+                continue
+            yield tuple(torch.from_numpy(col[idx]).to(self.device) for col in pooled)
+        if final or n_full == n:
+            return []
+        leftover = order[n_full:]
+        return [tuple(col[leftover] for col in pooled)]
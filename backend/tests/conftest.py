@@ -0,0 +1,43 @@
+import sys
+from pathlib import Path
+
+import joblib
+import numpy as np
+import pytest
+import torch
+from sklearn.preprocessing import StandardScaler
+
+# Backend modules import each other as top-level modules (see main.py)
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from architectures import DefensiveCoordinatorModel, WinProbabilityModel
+from feature_specs import FEATURE_SPECS
+
+def write_artifacts(directory, seed=0):
+    """Random-weight win_prob and defensive nets plus fitted scalers, laid out like models/ and data/"""
+    directory.mkdir(parents=True, exist_ok=True)
+    torch.manual_seed(seed)
+    rng = np.random.default_rng(seed)
+    scalers = {}
+    for key, cls in (('win_prob', WinProbabilityModel), ('defensive', DefensiveCoordinatorModel)):
+        n_features = len(FEATURE_SPECS[key])
+        model = cls(input_dim=n_features)
+        # Non-trivial BatchNorm statistics, as after training
+        for module in model.modules():
+            if isinstance(module, torch.nn.BatchNorm1d):
+                module.running_mean.normal_()
+                module.running_var.uniform_(0.5, 2.0)
+        torch.save(model.state_dict(), directory / f"{key}_model.pt")
+        scalers[key] = StandardScaler().fit(rng.normal(100, 50, (500, n_features)))
+    joblib.dump(scalers, directory / "scalers.pkl")
+    joblib.dump({}, directory / "encoders.pkl")
+    return directory
+
+@pytest.fixture
+def artifact_dir(tmp_path):
+    return write_artifacts(tmp_path / "models")
+
+@pytest.fixture
+def candidate_dir(artifact_dir):
+    """Different random weights in models/candidate/, where the registry looks for a candidate"""
+    return write_artifacts(artifact_dir / "candidate", seed=1)
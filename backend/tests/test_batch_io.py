@@ -0,0 +1,95 @@
+import numpy as np
+import pyarrow as pa
+import pytest
+import torch
+from fastapi import HTTPException
+
+import main
+from batch_io import (
+    ARROW_FILE, ARROW_STREAM, RAW_FLOAT32, BatchFormatError, HEADER_LEN,
+    decode_batch, encode_raw, feature_matrix
+)
+from feature_specs import FEATURE_SPECS
+from model_registry import ModelRegistry
+
+COLUMNS = FEATURE_SPECS['win_prob']
+
+def random_features(rows, columns=COLUMNS, seed=0):
+    return np.random.default_rng(seed).uniform(0, 100, (rows, len(columns))).astype(np.float32)
+
+def arrow_payload(table, file_format=False):
+    sink = pa.BufferOutputStream()
+    writer = pa.ipc.new_file(sink, table.schema) if file_format else pa.ipc.new_stream(sink, table.schema)
+    with writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+@pytest.fixture
+def registry(artifact_dir, monkeypatch):
+    registry = ModelRegistry(model_dir=artifact_dir, data_dir=artifact_dir)
+    registry.reload()
+    monkeypatch.setattr(main, 'registry', registry)
+    return registry
+
+def test_raw_float32_round_trip():
+    X = random_features(50)
+    columns, rows = decode_batch(encode_raw(COLUMNS, X), RAW_FLOAT32)
+    assert rows == 50 and list(columns) == list(COLUMNS)
+    np.testing.assert_array_equal(feature_matrix(columns, rows, COLUMNS), X)
+
+@pytest.mark.parametrize('file_format', [False, True])
+def test_arrow_round_trip(file_format):
+    X = random_features(50)
+    table = pa.table({c: X[:, i] for i, c in enumerate(COLUMNS)})
+    content_type = ARROW_FILE if file_format else ARROW_STREAM
+    columns, rows = decode_batch(arrow_payload(table, file_format), content_type + "; charset=binary")
+    assert rows == 50
+    # Columns may arrive in any order; feature_matrix puts them in spec order
+    np.testing.assert_array_equal(feature_matrix(columns, rows, COLUMNS[::-1]), X[:, ::-1])
+
+@pytest.mark.parametrize('body', [
+    b"\x01",
+    HEADER_LEN.pack(5) + b"nope!",
+    encode_raw(COLUMNS, random_features(3))[:-4],
+], ids=['short', 'bad-header', 'truncated'])
+def test_malformed_raw_payloads_are_rejected(body):
+    with pytest.raises(BatchFormatError):
+        decode_batch(body, RAW_FLOAT32)
+
+def test_encode_raw_rejects_the_wrong_width():
+    with pytest.raises(BatchFormatError):
+        encode_raw(COLUMNS, random_features(3, COLUMNS[:-1]))
+
+def test_run_batch_matches_the_model(registry):
+    X = random_features(64)
+    payload, version = main.run_batch(encode_raw(COLUMNS, X), RAW_FLOAT32, None)
+    assert version == registry.current.version
+    out = pa.ipc.open_stream(payload).read_all()
+    assert out.column_names == ['win_prob.win']
+    art = registry.current
+    with torch.no_grad():
+        expected = art.models['win_prob_model'](torch.from_numpy(art.extractors['win_prob'].transform_array(X)))
+    np.testing.assert_allclose(out.column('win_prob.win').to_numpy(), expected.numpy().ravel(), rtol=1e-6)
+
+def status(registry, body, content_type=RAW_FLOAT32, models=None):
+    with pytest.raises(HTTPException) as e:
+        main.run_batch(body, content_type, models)
+    return e.value.status_code
+
+def test_run_batch_client_errors(registry, monkeypatch):
+    X = random_features(10)
+    assert status(registry, b"not arrow", ARROW_STREAM) == 422
+    assert status(registry, encode_raw(COLUMNS, X[:0])) == 422
+    assert status(registry, encode_raw(COLUMNS, X), models='offensive') == 422
+    assert status(registry, encode_raw(COLUMNS[:-1], X[:, :-1])) == 422
+    assert status(registry, encode_raw(COLUMNS[:-1], X[:, :-1]), models='win_prob') == 422
+
+    nulls = pa.table({c: pa.array([1.0, None]) for c in COLUMNS})
+    assert status(registry, arrow_payload(nulls), ARROW_STREAM) == 422
+
+    for bad in (pa.array(["1.0", "x"]), pa.array([{'a': 1.0}, {'a': 2.0}])):
+        table = pa.table({c: bad if i == 0 else pa.array([1.0, 2.0]) for i, c in enumerate(COLUMNS)})
+        assert status(registry, arrow_payload(table), ARROW_STREAM) == 422
+
+    monkeypatch.setattr(main, 'BATCH_MAX_ROWS', 5)
+    assert status(registry, encode_raw(COLUMNS, X)) == 413
@@ -0,0 +1,54 @@
+import json
+import os
+
+import numpy as np
+
+import cross_validate
+
+SEASONS = (2020, 2021, 2022)
+
+def fake_dataset(nan_stop_season=None, rows_per_season=120, n_classes=3):
+    """prepare_dataset stand-in: random offensive-shaped rows, every 4th row early-stopping"""
+    def prepare(name, workdir):
+        rng = np.random.default_rng(0)
+        n = rows_per_season * len(SEASONS)
+        season = np.repeat(np.array(SEASONS, dtype=np.int16), rows_per_season)
+        stop = np.arange(n) % 4 == 0
+        X = rng.normal(size=(n, 11)).astype(np.float32)
+        if nan_stop_season is not None:
+            X[stop & (season == nan_stop_season)] = np.nan
+        arrays = {'X': X, 'y': rng.integers(0, n_classes, (n, 1)).astype(np.float32),
+                  'season': season, 'stop': stop}
+        paths = {}
+        for key, arr in arrays.items():
+            paths[key] = os.path.join(workdir, f"{key}.npy")
+            np.save(paths[key], arr)
+        return {'paths': paths, 'input_dim': 11, 'num_classes': n_classes, 'seasons': list(SEASONS)}
+    return prepare
+
+def run(monkeypatch, tmp_path, **dataset):
+    monkeypatch.setattr(cross_validate, 'prepare_dataset', fake_dataset(**dataset))
+    out = tmp_path / "cv.json"
+    report = cross_validate.cross_validate('offensive', workers=1, epochs=2, out_path=out)
+    saved = json.loads(out.read_text())['folds']
+    assert [(f['test_season'], f['status']) for f in saved] == [(f['test_season'], f['status']) for f in report['folds']]
+    return report
+
+def test_every_fold_is_scored(monkeypatch, tmp_path):
+    report = run(monkeypatch, tmp_path)
+    assert [f['test_season'] for f in report['folds']] == list(SEASONS)
+    assert all(f['status'] == 'ok' for f in report['folds'])
+    assert report['folds'][0]['train_seasons'] == "2021-2022"
+    assert set(report['summary']) == {'accuracy', 'log_loss', 'brier'}
+
+def test_fold_without_a_finite_stop_loss_is_reported_not_fatal(monkeypatch, tmp_path):
+    # NaN early-stopping rows in 2020 poison every fold that trains on 2020
+    report = run(monkeypatch, tmp_path, nan_stop_season=2020)
+    by_season = {f['test_season']: f for f in report['folds']}
+    assert by_season[2020]['status'] == 'ok'
+    for season, trained_on in ((2021, "2020-2022"), (2022, "2020-2021")):
+        assert by_season[season]['status'] == 'failed'
+        assert by_season[season]['train_seasons'] == trained_on
+        assert 'never finite' in by_season[season]['error']
+    # The summary covers the scored fold only
+    assert report['summary']['accuracy']['worst_season'] == 2020
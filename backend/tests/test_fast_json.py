@@ -0,0 +1,40 @@
+import json
+
+import numpy as np
+import orjson
+import pytest
+from sklearn.preprocessing import LabelEncoder
+
+from fast_json import FastJSONResponse, class_probs, formation_json, splice
+from formation_logic import FORMATION_TEMPLATES
+
+@pytest.mark.parametrize('obj, fragments', [
+    ({"play_call": "pass", "confidence": np.float32(0.75)}, {}),
+    ({"play_call": "pass"}, {"probabilities": orjson.dumps({"pass": 0.7, "run": 0.3})}),
+    ({}, {"formation": b'{"formation_name":"Shotgun","players":[]}'}),
+    ({"a": [1, 2]}, {"b": b"null", "c": b'"x"', "d": b"[1,{\"e\":2}]"}),
+], ids=['no-fragments', 'one-fragment', 'empty-object', 'several-fragments'])
+def test_splice_equals_encoding_the_whole_object(obj, fragments):
+    body = splice(obj, **fragments)
+    expected = {**obj, **{key: json.loads(value) for key, value in fragments.items()}}
+    assert json.loads(body) == json.loads(orjson.dumps(expected, option=orjson.OPT_SERIALIZE_NUMPY))
+
+def test_splice_keeps_key_order():
+    body = splice({"first": 1}, second=b"2", third=b"3")
+    assert body == b'{"first":1,"second":2,"third":3}'
+
+def test_class_probs_encodes_numpy_labels_and_float32():
+    encoder = LabelEncoder().fit(np.array(["pass", "run", "punt"]))
+    probs = np.array([0.5, 0.25, 0.25], dtype=np.float32)
+    assert json.loads(orjson.dumps(class_probs(encoder, probs), option=orjson.OPT_SERIALIZE_NUMPY)) == {
+        "pass": 0.5, "punt": 0.25, "run": 0.25}
+
+def test_formation_json():
+    name = next(iter(FORMATION_TEMPLATES))
+    assert json.loads(formation_json(name)) == json.loads(orjson.dumps(
+        {"formation_name": name, "players": FORMATION_TEMPLATES[name]}))
+    assert json.loads(formation_json("Wildcat Unknown")) == {"formation_name": "Wildcat Unknown", "players": []}
+
+def test_response_passes_bytes_through():
+    assert FastJSONResponse(b'{"ok":true}').body == b'{"ok":true}'
+    assert json.loads(FastJSONResponse({"ok": np.float32(1.5)}).body) == {"ok": 1.5}
@@ -0,0 +1,42 @@
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+from sklearn.preprocessing import StandardScaler
+
+from feature_specs import FEATURE_SPECS, FeatureExtractor
+
+ALL_COLUMNS = sorted({c for spec in FEATURE_SPECS.values() for c in spec})
+
+def random_states(n, seed=0):
+    rng = np.random.default_rng(seed)
+    return [SimpleNamespace(**{c: int(v) for c, v in zip(ALL_COLUMNS, rng.integers(0, 3600, len(ALL_COLUMNS)))})
+            for _ in range(n)]
+
+def fitted_scaler(name, seed=1):
+    rng = np.random.default_rng(seed)
+    return StandardScaler().fit(rng.normal(50, 20, (200, len(FEATURE_SPECS[name]))))
+
+def hand_built(name, states, scaler):
+    """How the predict endpoints built model inputs before the spec table"""
+    X = np.array([[getattr(s, c) for c in FEATURE_SPECS[name]] for s in states])
+    return scaler.transform(X).astype(np.float32)
+
+@pytest.mark.parametrize('name', FEATURE_SPECS)
+def test_transform_one_matches_hand_built_array(name):
+    scaler = fitted_scaler(name)
+    extractor = FeatureExtractor(name, scaler)
+    for state in random_states(20):
+        np.testing.assert_allclose(extractor.transform_one(state), hand_built(name, [state], scaler), rtol=1e-5, atol=1e-5)
+
+@pytest.mark.parametrize('name', FEATURE_SPECS)
+def test_transform_matches_hand_built_array(name):
+    scaler = fitted_scaler(name)
+    states = random_states(100)
+    out = FeatureExtractor(name, scaler, max_batch=8).transform(states)
+    assert out.shape == (100, len(FEATURE_SPECS[name]))
+    np.testing.assert_allclose(out, hand_built(name, states, scaler), rtol=1e-5, atol=1e-5)
+
+def test_scaler_with_wrong_width_is_rejected():
+    with pytest.raises(ValueError):
+        FeatureExtractor('win_prob', fitted_scaler('personnel'))
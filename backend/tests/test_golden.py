@@ -0,0 +1,23 @@
+import numpy as np
+
+import golden
+from model_registry import MODEL_DIR, DATA_DIR
+
+def run_check():
+    return golden.check(golden.GOLDEN_PATH, MODEL_DIR, DATA_DIR, {}, golden.DEFAULT_ATOL, 'eager', False)
+
+def test_golden_file_is_committed():
+    assert golden.GOLDEN_PATH.exists(), "record it with: python golden.py --record --synthetic --rows 2000"
+
+def test_serving_path_matches_golden_outputs():
+    assert run_check()
+
+def test_check_fails_on_output_drift(monkeypatch):
+    run_models = golden.run_models
+
+    def drifted(art, inputs):
+        outputs, layouts = run_models(art, inputs)
+        return {key: out + np.float32(1e-3) for key, out in outputs.items()}, layouts
+
+    monkeypatch.setattr(golden, 'run_models', drifted)
+    assert not run_check()
@@ -0,0 +1,87 @@
+import numpy as np
+import pytest
+import torch
+
+import main
+from incremental import SessionStore
+from model_registry import load_artifact_set
+
+KEYS = ('win_prob', 'defensive')
+
+def snap(game_id="live_1", **changes):
+    state = {'game_id': game_id, 'qtr': 2, 'time_remaining': 1500, 'score_home': 7, 'score_away': 3,
+             'down': 2, 'ydstogo': 7, 'yardline_100': 55, 'score_differential': 4,
+             'game_seconds_remaining': 2400, 'half_seconds_remaining': 600,
+             'posteam_timeouts_remaining': 3, 'defteam_timeouts_remaining': 2}
+    return main.GameState(**{**state, **changes})
+
+def full_forward(art, key, state):
+    with torch.no_grad():
+        return art.models[f"{key}_model"](torch.from_numpy(art.extractors[key].transform_one(state)))
+
+def assert_same(art, store, state):
+    for key in KEYS:
+        np.testing.assert_allclose(store.forward(art, key, state).numpy(), full_forward(art, key, state).numpy(),
+                                   rtol=1e-5, atol=1e-6)
+
+@pytest.fixture
+def art(artifact_dir):
+    return load_artifact_set("test", artifact_dir, artifact_dir)
+
+def test_clock_ticks_match_the_full_forward(art):
+    store = SessionStore()
+    state = snap()
+    assert_same(art, store, state)
+    for tick in range(1, 200):
+        state = state.model_copy(update={'game_seconds_remaining': 2400 - tick, 'half_seconds_remaining': 600 - tick,
+                                         'time_remaining': 1500 - tick, 'play_clock': 40 - tick % 40})
+        assert_same(art, store, state)
+    assert store.stats['full'] == len(KEYS)
+    assert store.stats['delta'] == 199 * len(KEYS)
+
+def test_unchanged_features_reuse_the_cached_outputs(art):
+    store = SessionStore()
+    first = {key: store.forward(art, key, snap()) for key in KEYS}
+    for key in KEYS:
+        assert store.forward(art, key, snap(play_clock=12, clock_running=False)) is first[key]
+    assert store.stats['reused'] == len(KEYS)
+
+def test_other_changes_recompute_in_full(art):
+    store = SessionStore()
+    assert_same(art, store, snap())
+    assert_same(art, store, snap(down=3, ydstogo=2, game_seconds_remaining=2390))
+    assert store.stats == {'full': 2 * len(KEYS), 'delta': 0, 'reused': 0, 'fallback': 0, 'evicted': 0}
+
+def test_delta_runs_are_refreshed(art):
+    store = SessionStore(refresh_every=3)
+    for tick in range(8):
+        assert_same(art, store, snap(game_seconds_remaining=2400 - tick))
+    # full, 3 deltas, full, 3 deltas
+    assert store.stats['full'] == 2 * len(KEYS) and store.stats['delta'] == 6 * len(KEYS)
+
+def test_games_and_versions_get_their_own_sessions(art, artifact_dir):
+    store = SessionStore(max_sessions=2)
+    for game_id in ("a", "b", "a", "c"):
+        assert_same(art, store, snap(game_id))
+    assert list(store.sessions) == ["a", "c"] and store.stats['evicted'] == 1
+
+    # A reloaded artifact set starts the game's session over
+    reloaded = load_artifact_set("test-2", artifact_dir, artifact_dir)
+    full = store.stats['full']
+    assert_same(reloaded, store, snap("a", game_seconds_remaining=2399))
+    assert store.stats['full'] == full + len(KEYS)
+    assert store.sessions["a"].art is reloaded
+
+def test_quantized_models_use_the_normal_path(artifact_dir):
+    art = load_artifact_set("int8", artifact_dir, artifact_dir, quantize=True)
+    store = SessionStore()
+    assert_same(art, store, snap())
+    assert store.stats['fallback'] == len(KEYS) and not store.sessions
+
+def test_default_game_id_is_never_sessioned(art, monkeypatch):
+    store = SessionStore()
+    monkeypatch.setattr(main, 'sessions', store)
+    main.infer(art, 'win_prob', snap(main.DEFAULT_GAME_ID))
+    assert not store.sessions and store.stats['full'] == 0
+    main.infer(art, 'win_prob', snap("live_1"))
+    assert list(store.sessions) == ["live_1"]
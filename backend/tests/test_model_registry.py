@@ -0,0 +1,102 @@
+import os
+import time
+
+import pytest
+
+from model_registry import ModelRegistry
+
+def make_registry(artifact_dir, **kwargs):
+    return ModelRegistry(model_dir=artifact_dir, data_dir=artifact_dir, **kwargs)
+
+def test_reload_publishes_a_new_version_and_keeps_the_old_one(artifact_dir):
+    registry = make_registry(artifact_dir)
+    first = registry.reload()
+    assert registry.current is first
+    assert set(first.models) == {'win_prob_model', 'defensive_model'}
+
+    second = registry.reload()
+    assert registry.current is second and second.version != first.version
+    assert list(registry.previous) == [first]
+    assert registry.versions()['previous'][0]['version'] == first.version
+
+def test_failed_reload_keeps_serving_the_current_version(artifact_dir):
+    registry = make_registry(artifact_dir)
+    serving = registry.reload()
+    (artifact_dir / "win_prob_model.pt").write_bytes(b"truncated")
+    with pytest.raises(Exception):
+        registry.reload()
+    assert registry.current is serving
+    assert registry.last_error
+    assert not registry.previous
+
+def test_rollback_republishes_the_previous_version(artifact_dir):
+    registry = make_registry(artifact_dir)
+    first = registry.reload()
+    registry.reload()
+    assert registry.rollback() is first
+    assert registry.current is first
+    with pytest.raises(LookupError):
+        registry.rollback()
+
+def test_route_serves_the_ab_share_of_games_from_the_candidate(artifact_dir, candidate_dir):
+    registry = make_registry(artifact_dir)
+    primary = registry.reload()
+    game_ids = [f"game_{i}" for i in range(2000)]
+
+    registry.load_candidate('shadow')
+    assert all(registry.route(g) is primary for g in game_ids)
+
+    registry.load_candidate('ab', ab_fraction=0.25)
+    routed = {g: registry.route(g) for g in game_ids}
+    share = sum(art is not primary for art in routed.values()) / len(game_ids)
+    assert 0.2 < share < 0.3
+    # Sticky: a game keeps its side on every request
+    assert all(registry.route(g) is art for g, art in routed.items())
+
+    registry.clear_candidate()
+    assert all(registry.route(g) is primary for g in game_ids)
+
+    candidate = registry.load_candidate('ab', ab_fraction=0.5)
+    assert registry.promote_candidate() is candidate
+    assert registry.candidate is None and list(registry.previous) == [primary]
+    assert all(registry.route(g) is candidate for g in game_ids)
+
+def test_load_candidate_rejects_unknown_modes(artifact_dir):
+    with pytest.raises(ValueError):
+        make_registry(artifact_dir).load_candidate('canary')
+
+def wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return condition()
+
+def touch(path, seconds=1):
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + seconds * 10**9))
+
+def test_watcher_keeps_a_rollback_until_the_files_change(artifact_dir):
+    registry = make_registry(artifact_dir)
+    first = registry.reload()
+    touch(artifact_dir / "win_prob_model.pt")  # retrained since
+    registry.reload()
+    registry.start_watcher(0.02)
+    try:
+        # The rolled-back version no longer matches the files on disk
+        registry.rollback()
+        time.sleep(0.2)
+        assert registry.current is first
+
+        # New weights on disk are still picked up
+        touch(artifact_dir / "win_prob_model.pt", 2)
+        assert wait_for(lambda: registry.current is not first)
+        assert registry.previous[-1] is first
+    finally:
+        registry.stop_watcher()
+
+def test_promotion_needs_a_serving_primary(artifact_dir, candidate_dir):
+    registry = make_registry(artifact_dir)
+    registry.load_candidate('ab', ab_fraction=0.5)
+    with pytest.raises(LookupError):
+        registry.promote_candidate()
+    assert registry.current is None and not registry.previous
@@ -0,0 +1,73 @@
+import time
+from types import SimpleNamespace
+
+import numpy as np
+import torch
+
+import shadow_report
+from feature_specs import FEATURE_SPECS
+from model_registry import ModelRegistry
+from shadow import ShadowRunner, read_shadow_log
+
+def random_states(n, seed=0):
+    rng = np.random.default_rng(seed)
+    columns = sorted(set(FEATURE_SPECS['win_prob']) | set(FEATURE_SPECS['defensive']))
+    return [SimpleNamespace(**{c: int(v) for c, v in zip(columns, rng.integers(0, 100, len(columns)))})
+            for _ in range(n)]
+
+def run_shadow(artifact_dir, log_path, states):
+    registry = ModelRegistry(model_dir=artifact_dir, data_dir=artifact_dir)
+    registry.reload()
+    registry.load_candidate('shadow')
+    runner = ShadowRunner(registry, log_path, sample_rate=1.0, batch_size=16, flush_interval=0.05)
+    runner.start()
+    for i, state in enumerate(states):
+        runner.observe(('win_prob', 'defensive'), state, served_by_candidate=i % 2 == 1)
+    deadline = time.monotonic() + 10
+    while runner.logged < 2 * len(states) and time.monotonic() < deadline:
+        time.sleep(0.01)
+    runner.stop()
+    return registry, runner
+
+def test_logged_samples_round_trip(artifact_dir, candidate_dir, tmp_path):
+    states = random_states(40)
+    log_path = tmp_path / "shadow_log.bin"
+    registry, runner = run_shadow(artifact_dir, log_path, states)
+    assert runner.stats()['logged'] == 80 and runner.dropped == 0
+
+    records = list(read_shadow_log(log_path))
+    metas = [r for kind, r in records if kind == 'meta']
+    samples = [r for kind, r in records if kind == 'sample']
+    assert {m['model'] for m in metas} == {'win_prob', 'defensive'}
+    assert all(m['primary'] == registry.current.version and m['candidate'] == registry.candidate.version
+               for m in metas)
+    assert len(samples) == 80
+
+    for key in ('win_prob', 'defensive'):
+        logged = [s for s in samples if s['model'] == key]
+        assert [s['served_by_candidate'] for s in logged] == [i % 2 == 1 for i in range(40)]
+        np.testing.assert_array_equal(np.stack([s['inputs'] for s in logged]),
+                                      registry.current.extractors[key].extract(states))
+        for art, side in ((registry.current, 'primary'), (registry.candidate, 'candidate')):
+            with torch.no_grad():
+                expected = art.models[f"{key}_model"](torch.from_numpy(art.extractors[key].transform(states)))
+            np.testing.assert_allclose(np.stack([s[side] for s in logged]), expected.numpy(), rtol=1e-6)
+
+    rows = shadow_report.summarise(*shadow_report.load_samples(log_path))
+    assert {(r['model'], r['head']) for r in rows} == {('win_prob', 'win'), ('defensive', 'pass')}
+    assert all(r['n'] == 40 and r['served_by_candidate'] == 0.5 for r in rows)
+
+def test_truncated_tail_is_ignored(artifact_dir, candidate_dir, tmp_path):
+    log_path = tmp_path / "shadow_log.bin"
+    run_shadow(artifact_dir, log_path, random_states(10))
+    n_records = len(list(read_shadow_log(log_path)))
+    data = log_path.read_bytes()
+    log_path.write_bytes(data[:-3])
+    assert len(list(read_shadow_log(log_path))) == n_records - 1
+
+def test_nothing_is_queued_without_a_candidate(artifact_dir, tmp_path):
+    registry = ModelRegistry(model_dir=artifact_dir, data_dir=artifact_dir)
+    registry.reload()
+    runner = ShadowRunner(registry, tmp_path / "shadow_log.bin", sample_rate=1.0)
+    runner.observe(('win_prob',), random_states(1)[0])
+    assert runner.queue.qsize() == 0
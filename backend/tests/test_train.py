@@ -0,0 +1,105 @@
+import pytest
+import torch
+
+import train
+
+def test_split_batchers_gives_the_same_split_every_run():
+    X = torch.arange(1000, dtype=torch.float32).view(-1, 1)
+    y = torch.arange(1000, dtype=torch.float32).view(-1, 1) * 2
+    splits = []
+    for _ in range(2):
+        torch.manual_seed(len(splits))  # the global RNG must not affect the split
+        tl, vl = train.split_batchers(X, y, batch_size=64)
+        splits.append((tl.tensors[0].flatten().tolist(), vl.tensors[0].flatten().tolist()))
+        assert torch.equal(tl.tensors[1], tl.tensors[0] * 2) and torch.equal(vl.tensors[1], vl.tensors[0] * 2)
+    assert splits[0] == splits[1]
+
+    train_rows, val_rows = splits[0]
+    assert len(train_rows) == 800 and len(val_rows) == 200
+    assert sorted(train_rows + val_rows) == list(range(1000))
+    assert train_rows[:20] != list(range(20))
+
+class Interrupted(Exception):
+    pass
+
+def fit(stop_after=None, resume=False, name='tiny'):
+    """A small BCE model through train_generic_model, interrupted after `stop_after` epochs"""
+    torch.manual_seed(0)
+    X = torch.randn(256, 4)
+    y = (X.sum(dim=1, keepdim=True) > 0).float()
+    tl, vl = train.split_batchers(X, y, batch_size=32)
+    model = torch.nn.Sequential(torch.nn.Linear(4, 8), torch.nn.ReLU(), torch.nn.Linear(8, 1), torch.nn.Sigmoid())
+    optimizer = torch.optim.Adam(model.parameters(), lr=0.01)
+    scheduler = torch.optim.lr_scheduler.ReduceLROnPlateau(optimizer, 'min', patience=5, factor=0.5)
+    epochs = []
+
+    def progress(name, epoch, train_loss, val_loss, lr):
+        epochs.append(epoch)
+        if epoch == stop_after:
+            raise Interrupted
+
+    try:
+        train.train_generic_model(model, tl, vl, torch.nn.BCELoss(), optimizer, scheduler, name, progress, resume)
+    except Interrupted:
+        pass
+    return model, epochs
+
+@pytest.fixture
+def run_dirs(tmp_path, monkeypatch):
+    monkeypatch.setattr(train, 'MODEL_DIR', tmp_path)
+    monkeypatch.setattr(train, 'CHECKPOINT_DIR', tmp_path / 'checkpoints')
+    monkeypatch.setattr(train, 'EPOCHS', 8)
+    monkeypatch.setattr(train, 'CHECKPOINT_EVERY', 2)
+    monkeypatch.setattr(train, 'PATIENCE', 100)
+    monkeypatch.setattr(train, 'MODEL_FILES', {'first': 'tiny_first', 'second': 'tiny_second'})
+    return tmp_path
+
+def test_interrupted_run_resumes_from_its_checkpoint(run_dirs):
+    tmp_path = run_dirs
+    checkpoint = tmp_path / 'checkpoints' / 'tiny.ckpt'
+
+    fit()
+    assert not checkpoint.exists()
+    reference_state = torch.load(tmp_path / 'tiny.pt')
+    (tmp_path / 'tiny.pt').unlink()
+
+    # Interrupted during epoch 5: the last checkpoint was written after epoch 4
+    _, epochs = fit(stop_after=5)
+    assert epochs == [1, 2, 3, 4, 5]
+    assert checkpoint.exists() and not (tmp_path / 'tiny.pt').exists()
+
+    _, epochs = fit(resume=True)
+    assert epochs == [5, 6, 7, 8]
+    assert not checkpoint.exists(), "the checkpoint must go once the final model is saved"
+    resumed_state = torch.load(tmp_path / 'tiny.pt')
+    for name, tensor in reference_state.items():
+        assert torch.equal(tensor, resumed_state[name]), name
+
+
+def test_resume_skips_models_this_run_already_finished(run_dirs):
+    # Two targets in a row; the run dies during the second one
+    fit(name='tiny_first')
+    finished = (run_dirs / 'tiny_first.pt').stat().st_mtime_ns
+    fit(stop_after=3, name='tiny_second')
+
+    model, epochs = fit(resume=True, name='tiny_first')
+    assert epochs == []
+    assert (run_dirs / 'tiny_first.pt').stat().st_mtime_ns == finished
+    saved = torch.load(run_dirs / 'tiny_first.pt')
+    assert all(torch.equal(t, saved[k]) for k, t in model.state_dict().items())
+    _, epochs = fit(resume=True, name='tiny_second')
+    assert epochs == [3, 4, 5, 6, 7, 8]
+
+    # A model replaced since it was marked done is trained again
+    torch.save(saved, run_dirs / 'tiny_first.pt')
+    _, epochs = fit(resume=True, name='tiny_first')
+    assert epochs == list(range(1, 9))
+
+def test_fresh_run_forgets_models_finished_earlier(run_dirs):
+    fit(name='tiny_first')
+    fit(name='tiny_second')
+    train.forget_completed(['first'])
+    _, epochs = fit(resume=True, name='tiny_first')
+    assert epochs == list(range(1, 9))
+    _, epochs = fit(resume=True, name='tiny_second')
+    assert epochs == []
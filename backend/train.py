@@ -3,10 +3,19 @@ Optimized Training Pipeline for ALL Models
 Includes 4th Down, Win Prob, Offensive, Defensive, and Personnel.
 """
 
+import argparse
+import copy
+import json
+import math
+import os
+import random
+import time
+import multiprocessing as mp
+from concurrent.futures import ProcessPoolExecutor
+
 import torch
 import torch.nn as nn
 import torch.optim as optim
-from torch.utils.data import DataLoader, TensorDataset, random_split
 import pandas as pd
 import numpy as np
 from pathlib import Path
@@ -15,10 +24,14 @@ import joblib
 
 from data_loader import NFLDataLoader
 from feature_engineering import NFLFeatureEngineer
+from streaming import (
+    PBPChunkSource, ShuffleBufferLoader, OUTCOME_COLUMNS,
+    plan_memory_budget, is_validation_game
+)
 from architectures import (
     FourthDownDecisionModel, WinProbabilityModel, 
     OffensivePlayCallerModel, DefensiveCoordinatorModel, PersonnelOptimizerModel,
-    save_model
+    SituationalMultiTaskModel, save_model
 )
 
 # Paths relative to this file
@@ -26,6 +39,8 @@ BASE_DIR = Path(__file__).parent
 MODEL_DIR = BASE_DIR / "models"
 DATA_DIR = BASE_DIR / "data"
 
+CHECKPOINT_DIR = MODEL_DIR / "checkpoints"
+
 MODEL_DIR.mkdir(exist_ok=True)
 DATA_DIR.mkdir(exist_ok=True)
 
@@ -33,12 +48,161 @@ DEVICE = torch.device("cuda" if torch.cuda.is_available() else "cpu")
 BATCH_SIZE = 512
 EPOCHS = 40
 LEARNING_RATE = 0.001
+PATIENCE = 8           # epochs without val improvement before stopping
+CHECKPOINT_EVERY = 5   # epochs between resumable checkpoints
+SEED = 42              # fixes the train/val split so resumed runs see the same rows
+
+# Each target is an independent transform of the cleaned pbp frame
+FEATURE_BUILDERS = {
+    'win_prob': 'get_win_prob_features',
+    'fourth_down': 'get_fourth_down_features',
+    'offensive': 'get_offensive_features',
+    'defensive': 'get_defensive_features',
+    'personnel': 'get_personnel_features',
+    'situational': 'get_situational_features',
+}
+
+# Trained by default; 'situational' (multi-task) is opt-in
+DEFAULT_TARGETS = ('win_prob', 'fourth_down', 'offensive', 'defensive', 'personnel')
+
+# Saved weights file (without .pt) per target
+MODEL_FILES = {
+    'win_prob': 'win_prob_model',
+    'fourth_down': 'fourth_down_model',
+    'offensive': 'offensive_model',
+    'defensive': 'defensive_model',
+    'personnel': 'personnel_model',
+    'situational': 'situational_model',
+}
+
+# Targets trained as multi-class with a LabelEncoder
+ENCODED_TARGETS = ('offensive', 'personnel')
+
+# Inherited by forked feature workers (copy-on-write, never pickled)
+_SHARED = {}
+
+def build_model(name, input_dim, num_classes=None, **arch):
+    """Fresh (untrained) network for a target; `arch` overrides hidden_dims/dropouts"""
+    if name == 'win_prob': return WinProbabilityModel(input_dim, **arch)
+    if name == 'fourth_down': return FourthDownDecisionModel(input_dim, **arch)
+    if name == 'offensive': return OffensivePlayCallerModel(input_dim, num_classes=num_classes, **arch)
+    if name == 'defensive': return DefensiveCoordinatorModel(input_dim, **arch)
+    if name == 'personnel': return PersonnelOptimizerModel(input_dim, num_classes=num_classes, **arch)
+    raise ValueError(f"Unknown model target: {name}")
 
-def train_generic_model(model, train_loader, val_loader, criterion, optimizer, scheduler, model_name):
+def forget_completed(names):
+    """Start of a fresh (non --resume) run: models an earlier run finished must be trained again"""
+    for name in names:
+        (CHECKPOINT_DIR / f"{MODEL_FILES[name]}.done").unlink(missing_ok=True)
+
+class TrainingRun:
+    """
+    Early stopping, best-weights retention and periodic resumable checkpoints
+    (model, optimizer, scheduler and RNG state) for one model's epoch loop.
+    A model this run already finished is marked done, so --resume keeps its
+    saved weights and runs no epochs for it.
+    """
+    def __init__(self, model_name, model, optimizer, scheduler, resume=False):
+        self.path = CHECKPOINT_DIR / f"{model_name}.ckpt"
+        self.done_path = CHECKPOINT_DIR / f"{model_name}.done"
+        self.model, self.optimizer, self.scheduler = model, optimizer, scheduler
+        self.start_epoch = 0
+        self.best_val = math.inf
+        self.best_state = None
+        self.bad_epochs = 0
+        self.completed = False
+        if not resume:
+            self.done_path.unlink(missing_ok=True)
+        elif not self._load_completed() and self.path.exists():
+            self._load()
+
+    def end_epoch(self, epoch, val_loss):
+        """Record one epoch; returns True when training should stop early"""
+        if val_loss < self.best_val:
+            self.best_val = val_loss
+            self.best_state = copy.deepcopy(self.model.state_dict())
+            self.bad_epochs = 0
+        else:
+            self.bad_epochs += 1
+        stop = self.bad_epochs >= PATIENCE
+        if stop or (epoch + 1) % CHECKPOINT_EVERY == 0:
+            self._save(epoch + 1, completed=stop)
+        return stop
+
+    def finish(self, model_path):
+        """
+        Restore the best weights, save the final model, mark it done and delete
+        the checkpoint (no-op for a model resumed as already finished)
+        """
+        if self.completed:
+            return
+        if self.best_state is not None:
+            self.model.load_state_dict(self.best_state)
+        save_model(self.model, model_path)
+        stat = Path(model_path).stat()
+        CHECKPOINT_DIR.mkdir(exist_ok=True)
+        self.done_path.write_text(json.dumps(
+            {'model': str(model_path), 'mtime_ns': stat.st_mtime_ns, 'size': stat.st_size}))
+        self.path.unlink(missing_ok=True)
+
+    def _load_completed(self):
+        """Load the final weights if this run already saved them and they are untouched since"""
+        try:
+            done = json.loads(self.done_path.read_text())
+            stat = Path(done['model']).stat()
+        except (OSError, ValueError, KeyError):
+            return False
+        if (stat.st_mtime_ns, stat.st_size) != (done['mtime_ns'], done['size']):
+            return False
+        self.model.load_state_dict(torch.load(done['model'], map_location=DEVICE))
+        self.start_epoch = EPOCHS
+        self.completed = True
+        print(f"⏭️ {self.done_path.stem} already finished in this run, keeping {done['model']}")
+        return True
+
+    def _save(self, next_epoch, completed):
+        CHECKPOINT_DIR.mkdir(exist_ok=True)
+        state = {
+            'next_epoch': EPOCHS if completed else next_epoch,
+            'model': self.model.state_dict(),
+            'optimizer': self.optimizer.state_dict(),
+            'scheduler': self.scheduler.state_dict(),
+            'best_val': self.best_val,
+            'best_state': self.best_state,
+            'bad_epochs': self.bad_epochs,
+            'rng': {
+                'torch': torch.get_rng_state(),
+                'cuda': torch.cuda.get_rng_state_all() if torch.cuda.is_available() else None,
+                'numpy': np.random.get_state(),
+                'python': random.getstate(),
+            },
+        }
+        tmp_path = f"{self.path}.tmp"
+        torch.save(state, tmp_path)
+        os.replace(tmp_path, self.path)
+
+    def _load(self):
+        state = torch.load(self.path, map_location=DEVICE, weights_only=False)
+        self.model.load_state_dict(state['model'])
+        self.optimizer.load_state_dict(state['optimizer'])
+        self.scheduler.load_state_dict(state['scheduler'])
+        self.start_epoch = state['next_epoch']
+        self.best_val = state['best_val']
+        self.best_state = state['best_state']
+        self.bad_epochs = state['bad_epochs']
+        torch.set_rng_state(state['rng']['torch'])
+        if state['rng']['cuda'] is not None and torch.cuda.is_available():
+            torch.cuda.set_rng_state_all(state['rng']['cuda'])
+        np.random.set_state(state['rng']['numpy'])
+        random.setstate(state['rng']['python'])
+        print(f"↩️ Resuming {self.path.stem} at epoch {self.start_epoch + 1} (best val {self.best_val:.4f})")
+
+def train_generic_model(model, train_loader, val_loader, criterion, optimizer, scheduler, model_name, progress=None, resume=False):
     print(f"\n--- Training {model_name} ---")
-    for epoch in range(EPOCHS):
+    run = TrainingRun(model_name, model, optimizer, scheduler, resume)
+    for epoch in range(run.start_epoch, EPOCHS):
         model.train()
-        train_loss = 0
+        train_loss, n_train = 0, 0
         for batch_X, batch_y in train_loader:
             optimizer.zero_grad()
             outputs = model(batch_X)
@@ -49,9 +213,10 @@ def train_generic_model(model, train_loader, val_loader, criterion, optimizer, s
             loss.backward()
             optimizer.step()
             train_loss += loss.item()
+            n_train += 1
         
         model.eval()
-        val_loss = 0
+        val_loss, n_val = 0, 0
         with torch.no_grad():
             for v_X, v_y in val_loader:
                 v_out = model(v_X)
@@ -59,39 +224,45 @@ def train_generic_model(model, train_loader, val_loader, criterion, optimizer, s
                     val_loss += criterion(v_out, v_y).item()
                 else:
                     val_loss += criterion(v_out, v_y.long().squeeze()).item()
+                n_val += 1
         
-        avg_val_loss = val_loss/len(val_loader)
+        # Batch counts, not len(): streaming loaders have no length
+        avg_val_loss = val_loss/max(n_val, 1)
         scheduler.step(avg_val_loss)
+        if progress:
+            progress(model_name, epoch + 1, train_loss/max(n_train, 1), avg_val_loss, optimizer.param_groups[0]['lr'])
         if (epoch + 1) % 10 == 0:
-            print(f"Epoch {epoch+1}/{EPOCHS} | Train Loss: {train_loss/len(train_loader):.4f} | Val Loss: {avg_val_loss:.4f} | LR: {optimizer.param_groups[0]['lr']}")
+            print(f"Epoch {epoch+1}/{EPOCHS} | Train Loss: {train_loss/max(n_train, 1):.4f} | Val Loss: {avg_val_loss:.4f} | LR: {optimizer.param_groups[0]['lr']}")
+        if run.end_epoch(epoch, avg_val_loss):
+            print(f"⏹️ Early stop at epoch {epoch+1} | Best Val Loss: {run.best_val:.4f}")
+            break
             
-    save_model(model, MODEL_DIR / f"{model_name}.pt")
+    run.finish(MODEL_DIR / f"{model_name}.pt")
     return model
 
-def train_fourth_down(X, y_data):
-    print("\n--- Training 4th Down Decision Model (Weighted) ---")
+def train_fourth_down(X, y_data, progress=None, resume=False):
     X_tensor = torch.FloatTensor(X).to(DEVICE)
     epa_clipped = np.clip(y_data['epa'].values, -5, 5)
     y_conv = torch.FloatTensor(y_data['converted'].values).view(-1, 1).to(DEVICE)
     y_fg = torch.FloatTensor(y_data['fg_made'].values).view(-1, 1).to(DEVICE)
     y_epa = torch.FloatTensor(epa_clipped).view(-1, 1).to(DEVICE)
     
-    dataset = TensorDataset(X_tensor, y_conv, y_fg, y_epa)
-    train_size = int(0.8 * len(dataset))
-    val_size = len(dataset) - train_size
-    train_ds, val_ds = random_split(dataset, [train_size, val_size])
-    train_loader = DataLoader(train_ds, batch_size=BATCH_SIZE, shuffle=True)
-    val_loader = DataLoader(val_ds, batch_size=BATCH_SIZE)
-    
-    model = FourthDownDecisionModel(X.shape[1]).to(DEVICE)
+    train_loader, val_loader = split_batchers(X_tensor, y_conv, y_fg, y_epa)
+    return fit_fourth_down(train_loader, val_loader, X.shape[1], progress, resume)
+
+def fit_fourth_down(train_loader, val_loader, input_dim, progress=None, resume=False):
+    """Weighted multi-head training loop over any (X, conv, fg, epa) batch iterable"""
+    print("\n--- Training 4th Down Decision Model (Weighted) ---")
+    model = FourthDownDecisionModel(input_dim).to(DEVICE)
     criterion_bce = nn.BCELoss()
     criterion_mse = nn.MSELoss()
     optimizer = optim.Adam(model.parameters(), lr=LEARNING_RATE)
     scheduler = optim.lr_scheduler.ReduceLROnPlateau(optimizer, 'min', patience=5, factor=0.5)
+    run = TrainingRun("fourth_down_model", model, optimizer, scheduler, resume)
     
-    for epoch in range(EPOCHS):
+    for epoch in range(run.start_epoch, EPOCHS):
         model.train()
-        train_loss = 0
+        train_loss, n_train = 0, 0
         for b_X, b_conv, b_fg, b_epa in train_loader:
             optimizer.zero_grad()
             p_conv, p_fg, p_epa = model(b_X)
@@ -99,32 +270,204 @@ def train_fourth_down(X, y_data):
             loss.backward()
             optimizer.step()
             train_loss += loss.item()
+            n_train += 1
         
         model.eval()
-        val_loss = 0
+        val_loss, n_val = 0, 0
         with torch.no_grad():
             for v_X, v_conv, v_fg, v_epa in val_loader:
                 vp_conv, vp_fg, vp_epa = model(v_X)
                 v_loss = (5.0 * criterion_bce(vp_conv, v_conv) + 5.0 * criterion_bce(vp_fg, v_fg) + 1.0 * criterion_mse(vp_epa, v_epa))
                 val_loss += v_loss.item()
+                n_val += 1
         
-        avg_val_loss = val_loss/len(val_loader)
+        avg_val_loss = val_loss/max(n_val, 1)
         scheduler.step(avg_val_loss)
+        if progress:
+            progress("fourth_down_model", epoch + 1, train_loss/max(n_train, 1), avg_val_loss, optimizer.param_groups[0]['lr'])
         if (epoch + 1) % 10 == 0:
-            print(f"Epoch {epoch+1}/{EPOCHS} | Train Loss: {train_loss/len(train_loader):.4f} | Val Loss: {avg_val_loss:.4f} | LR: {optimizer.param_groups[0]['lr']}")
+            print(f"Epoch {epoch+1}/{EPOCHS} | Train Loss: {train_loss/max(n_train, 1):.4f} | Val Loss: {avg_val_loss:.4f} | LR: {optimizer.param_groups[0]['lr']}")
+        if run.end_epoch(epoch, avg_val_loss):
+            print(f"⏹️ Early stop at epoch {epoch+1} | Best Val Loss: {run.best_val:.4f}")
+            break
     
-    save_model(model, MODEL_DIR / "fourth_down_model.pt")
+    run.finish(MODEL_DIR / "fourth_down_model.pt")
+    return model
+
+def train_situational(X, y_data, encoders, progress=None, resume=False):
+    """Encode the play-call / personnel labels and train the shared-trunk model"""
+    play_encoder, personnel_encoder = LabelEncoder(), LabelEncoder()
+    encoders['situational'] = {'play_call': play_encoder, 'personnel': personnel_encoder}
+    X_tensor = torch.FloatTensor(X).to(DEVICE)
+    y_play = torch.FloatTensor(play_encoder.fit_transform(y_data['play_category'])).view(-1, 1).to(DEVICE)
+    y_pass = torch.FloatTensor(y_data['is_pass'].values).view(-1, 1).to(DEVICE)
+    y_pers = torch.FloatTensor(personnel_encoder.fit_transform(y_data['personnel_group'])).view(-1, 1).to(DEVICE)
+    
+    train_loader, val_loader = split_batchers(X_tensor, y_play, y_pass, y_pers)
+    return fit_situational(train_loader, val_loader, X.shape[1],
+                           len(play_encoder.classes_), len(personnel_encoder.classes_), progress, resume)
+
+def fit_situational(train_loader, val_loader, input_dim, num_play_calls, num_personnel, progress=None, resume=False):
+    """Joint training loop (summed per-task losses) over (X, play, pass, personnel) batches"""
+    print("\n--- Training Situational Multi-Task Model ---")
+    model = SituationalMultiTaskModel(input_dim, num_play_calls, num_personnel).to(DEVICE)
+    criterion_ce = nn.CrossEntropyLoss()
+    criterion_bce = nn.BCELoss()
+    optimizer = optim.Adam(model.parameters(), lr=LEARNING_RATE)
+    scheduler = optim.lr_scheduler.ReduceLROnPlateau(optimizer, 'min', patience=5, factor=0.5)
+    run = TrainingRun("situational_model", model, optimizer, scheduler, resume)
+    
+    def joint_loss(outputs, b_play, b_pass, b_pers):
+        p_play, p_pass, p_pers = outputs
+        return (criterion_ce(p_play, b_play.long().view(-1)) + criterion_bce(p_pass, b_pass)
+                + criterion_ce(p_pers, b_pers.long().view(-1)))
+    
+    for epoch in range(run.start_epoch, EPOCHS):
+        model.train()
+        train_loss, n_train = 0, 0
+        for b_X, b_play, b_pass, b_pers in train_loader:
+            optimizer.zero_grad()
+            loss = joint_loss(model(b_X), b_play, b_pass, b_pers)
+            loss.backward()
+            optimizer.step()
+            train_loss += loss.item()
+            n_train += 1
+        
+        model.eval()
+        val_loss, n_val = 0, 0
+        with torch.no_grad():
+            for v_X, v_play, v_pass, v_pers in val_loader:
+                val_loss += joint_loss(model(v_X), v_play, v_pass, v_pers).item()
+                n_val += 1
+        
+        avg_val_loss = val_loss/max(n_val, 1)
+        scheduler.step(avg_val_loss)
+        if progress:
+            progress("situational_model", epoch + 1, train_loss/max(n_train, 1), avg_val_loss, optimizer.param_groups[0]['lr'])
+        if (epoch + 1) % 10 == 0:
+            print(f"Epoch {epoch+1}/{EPOCHS} | Train Loss: {train_loss/max(n_train, 1):.4f} | Val Loss: {avg_val_loss:.4f} | LR: {optimizer.param_groups[0]['lr']}")
+        if run.end_epoch(epoch, avg_val_loss):
+            print(f"⏹️ Early stop at epoch {epoch+1} | Best Val Loss: {run.best_val:.4f}")
+            break
+    
+    run.finish(MODEL_DIR / "situational_model.pt")
+    return model
+
+class TensorBatcher:
+    """
+    In-memory replacement for TensorDataset + DataLoader.
+    Shuffles by permuting indices once per epoch and gathers each batch with
+    one index_select per tensor (plain slices when not shuffling), instead of
+    collating rows one index at a time in Python.
+    """
+    def __init__(self, *tensors, batch_size=BATCH_SIZE, shuffle=False):
+        self.tensors = tensors
+        self.batch_size = batch_size
+        self.shuffle = shuffle
+        self.n = tensors[0].shape[0]
+
+    def __len__(self):
+        return (self.n + self.batch_size - 1) // self.batch_size
+
+    def __iter__(self):
+        bs = self.batch_size
+        if self.shuffle:
+            order = torch.randperm(self.n, device=self.tensors[0].device)
+            for start in range(0, self.n, bs):
+                idx = order[start:start + bs]
+                yield tuple(t.index_select(0, idx) for t in self.tensors)
+        else:
+            for start in range(0, self.n, bs):
+                yield tuple(t[start:start + bs] for t in self.tensors)
+
+def split_batchers(*tensors, train_fraction=0.8, batch_size=BATCH_SIZE):
+    """Random 80/20 row split (like random_split) into shuffled train / sequential val batchers"""
+    n = tensors[0].shape[0]
+    train_size = int(train_fraction * n)
+    generator = torch.Generator().manual_seed(SEED)
+    perm = torch.randperm(n, generator=generator).to(tensors[0].device)
+    train_idx, val_idx = perm[:train_size], perm[train_size:]
+    train = TensorBatcher(*(t.index_select(0, train_idx) for t in tensors), batch_size=batch_size, shuffle=True)
+    val = TensorBatcher(*(t.index_select(0, val_idx) for t in tensors), batch_size=batch_size)
+    return train, val
 
 def prepare_loaders(X, y):
     X_tensor = torch.FloatTensor(X).to(DEVICE)
     y_tensor = torch.FloatTensor(y).view(-1, 1).to(DEVICE)
-    dataset = TensorDataset(X_tensor, y_tensor)
-    train_size = int(0.8 * len(dataset))
-    val_size = len(dataset) - train_size
-    train_ds, val_ds = random_split(dataset, [train_size, val_size])
-    return DataLoader(train_ds, batch_size=BATCH_SIZE, shuffle=True), DataLoader(val_ds, batch_size=BATCH_SIZE)
+    return split_batchers(X_tensor, y_tensor)
+
+def train_target(engineer, name, X, y, encoders, progress=None, resume=False):
+    """Fit the scaler (and label encoder) for one target, then train and save its model"""
+    X_s = engineer.scale_features(X.values, name)
+    if name == 'fourth_down':
+        return train_fourth_down(X_s, y, progress, resume)
+    if name == 'situational':
+        return train_situational(X_s, y, encoders, progress, resume)
+    
+    num_classes = None
+    if name in ENCODED_TARGETS:
+        encoders[name] = LabelEncoder()
+        y = encoders[name].fit_transform(y)
+        num_classes = len(encoders[name].classes_)
+        criterion = nn.CrossEntropyLoss()
+    else:
+        y = y.values
+        criterion = nn.BCELoss()
+    
+    tl, vl = prepare_loaders(X_s, y)
+    model = build_model(name, X.shape[1], num_classes).to(DEVICE)
+    optimizer = optim.Adam(model.parameters(), lr=LEARNING_RATE)
+    scheduler = optim.lr_scheduler.ReduceLROnPlateau(optimizer, 'min', patience=5, factor=0.5)
+    return train_generic_model(model, tl, vl, criterion, optimizer, scheduler, MODEL_FILES[name], progress, resume)
+
+def build_feature_set(engineer, name, clean_pbp, ftn=None, outcomes=None):
+    """Run one target's feature builder against the cleaned pbp frame"""
+    if name == 'personnel':
+        return engineer.get_personnel_features(clean_pbp, ftn)
+    if name == 'win_prob':
+        return engineer.get_win_prob_features(clean_pbp, outcomes)
+    return getattr(engineer, FEATURE_BUILDERS[name])(clean_pbp)
+
+def _build_in_worker(name):
+    cpu_start = time.process_time()
+    X, y = build_feature_set(_SHARED['engineer'], name, _SHARED['pbp'], _SHARED['ftn'])
+    return name, X, y, time.process_time() - cpu_start
 
-def run_training():
+def build_feature_sets(engineer, clean_pbp, ftn=None, names=DEFAULT_TARGETS, parallel=False, workers=None):
+    """
+    Build (X, y) for every requested target.
+    In parallel mode the cleaned frame is handed to forked workers through
+    copy-on-write memory, so only the much smaller feature sets travel back.
+    """
+    wall_start, cpu_start = time.perf_counter(), time.process_time()
+    worker_cpu = 0.0
+    results = {}
+
+    if parallel and 'fork' not in mp.get_all_start_methods():
+        print("⚠️ fork start method unavailable, building features serially")
+        parallel = False
+
+    if parallel:
+        _SHARED.update(engineer=engineer, pbp=clean_pbp, ftn=ftn)
+        n_workers = workers or min(len(names), os.cpu_count() or 1)
+        try:
+            with ProcessPoolExecutor(max_workers=n_workers, mp_context=mp.get_context('fork')) as pool:
+                for name, X, y, cpu in pool.map(_build_in_worker, names):
+                    results[name] = (X, y)
+                    worker_cpu += cpu
+        finally:
+            _SHARED.clear()
+    else:
+        for name in names:
+            results[name] = build_feature_set(engineer, name, clean_pbp, ftn)
+
+    wall = time.perf_counter() - wall_start
+    cpu = time.process_time() - cpu_start + worker_cpu
+    mode = f"parallel x{n_workers}" if parallel else "serial"
+    print(f"⏱️ Feature build ({mode}): wall {wall:.1f}s | CPU {cpu:.1f}s | CPU/wall {cpu / max(wall, 1e-9):.2f}x")
+    return results
+
+def run_training(parallel_features=False, feature_workers=None, resume=False, multitask=False):
     loader = NFLDataLoader()
     engineer = NFLFeatureEngineer()
     encoders = {}
@@ -132,58 +475,123 @@ def run_training():
     print("📥 Loading Data...")
     data = loader.load_all_intelligence_data()
     clean_pbp = engineer.clean_pbp(data['pbp'])
+    names = DEFAULT_TARGETS + (('situational',) if multitask else ())
+    if not resume:
+        forget_completed(names)
+    features = build_feature_sets(engineer, clean_pbp, data['ftn'], names=names,
+                                  parallel=parallel_features, workers=feature_workers)
     
-    # 1. Win Probability
-    X_wp, y_wp = engineer.get_win_prob_features(clean_pbp)
-    X_wp_s = engineer.scale_features(X_wp.values, "win_prob")
-    tl, vl = prepare_loaders(X_wp_s, y_wp.values)
-    model_wp = WinProbabilityModel(X_wp.shape[1]).to(DEVICE)
-    opt_wp = optim.Adam(model_wp.parameters(), lr=LEARNING_RATE)
-    sch_wp = optim.lr_scheduler.ReduceLROnPlateau(opt_wp, 'min', patience=5, factor=0.5)
-    train_generic_model(model_wp, tl, vl, nn.BCELoss(), opt_wp, sch_wp, "win_prob_model")
-    
-    # 2. 4th Down
-    X_fd, y_fd = engineer.get_fourth_down_features(clean_pbp)
-    X_fd_s = engineer.scale_features(X_fd.values, "fourth_down")
-    train_fourth_down(X_fd_s, y_fd)
-    
-    # 3. Offensive
-    X_off, y_off_raw = engineer.get_offensive_features(clean_pbp)
-    X_off_s = engineer.scale_features(X_off.values, "offensive")
-    le_off = LabelEncoder()
-    y_off = le_off.fit_transform(y_off_raw)
-    encoders['offensive'] = le_off
-    tl, vl = prepare_loaders(X_off_s, y_off)
-    model_off = OffensivePlayCallerModel(X_off.shape[1], num_classes=len(le_off.classes_)).to(DEVICE)
-    opt_off = optim.Adam(model_off.parameters(), lr=LEARNING_RATE)
-    sch_off = optim.lr_scheduler.ReduceLROnPlateau(opt_off, 'min', patience=5, factor=0.5)
-    train_generic_model(model_off, tl, vl, nn.CrossEntropyLoss(), opt_off, sch_off, "offensive_model")
-    
-    # 4. Defensive
-    X_def, y_def = engineer.get_defensive_features(clean_pbp)
-    X_def_s = engineer.scale_features(X_def.values, "defensive")
-    tl, vl = prepare_loaders(X_def_s, y_def.values)
-    model_def = DefensiveCoordinatorModel(X_def.shape[1]).to(DEVICE)
-    opt_def = optim.Adam(model_def.parameters(), lr=LEARNING_RATE)
-    sch_def = optim.lr_scheduler.ReduceLROnPlateau(opt_def, 'min', patience=5, factor=0.5)
-    train_generic_model(model_def, tl, vl, nn.BCELoss(), opt_def, sch_def, "defensive_model")
-    
-    # 5. Personnel
-    X_pers, y_pers_raw = engineer.get_personnel_features(clean_pbp, data['ftn'])
-    X_pers_s = engineer.scale_features(X_pers.values, "personnel")
-    le_pers = LabelEncoder()
-    y_pers = le_pers.fit_transform(y_pers_raw)
-    encoders['personnel'] = le_pers
-    tl, vl = prepare_loaders(X_pers_s, y_pers)
-    model_pers = PersonnelOptimizerModel(X_pers.shape[1], num_classes=len(le_pers.classes_)).to(DEVICE)
-    opt_pers = optim.Adam(model_pers.parameters(), lr=LEARNING_RATE)
-    sch_pers = optim.lr_scheduler.ReduceLROnPlateau(opt_pers, 'min', patience=5, factor=0.5)
-    train_generic_model(model_pers, tl, vl, nn.CrossEntropyLoss(), opt_pers, sch_pers, "personnel_model")
+    for name, (X, y) in features.items():
+        train_target(engineer, name, X, y, encoders, resume=resume)
     
     # Save artifacts to backend/data and backend/models
     joblib.dump(engineer.scalers, DATA_DIR / "scalers.pkl")
     joblib.dump(encoders, DATA_DIR / "encoders.pkl")
     print(f"✅ Training Complete. Artifacts in {DATA_DIR} and {MODEL_DIR}")
 
+def _streaming_transform(engineer, name, outcomes, encoder=None, validation=False):
+    """Chunk -> scaled float32 (X, targets...) arrays for one model and split"""
+    def transform(chunk):
+        clean = engineer.clean_pbp(chunk)
+        X, y = build_feature_set(engineer, name, clean, outcomes=outcomes)
+        keep = is_validation_game(clean.loc[X.index, 'game_id']) == validation
+        if not keep.any():
+            return None
+        X_s = engineer.scale_features(X.values[keep], name).astype(np.float32)
+        y = y[keep]
+        if name == 'fourth_down':
+            return (X_s,
+                    y['converted'].values.astype(np.float32).reshape(-1, 1),
+                    y['fg_made'].values.astype(np.float32).reshape(-1, 1),
+                    np.clip(y['epa'].values, -5, 5).astype(np.float32).reshape(-1, 1))
+        y = encoder.transform(y) if encoder is not None else y.values
+        return X_s, np.asarray(y, dtype=np.float32).reshape(-1, 1)
+    return transform
+
+def run_streaming_training(memory_budget_mb=512, resume=False):
+    """
+    Bounded-memory variant of run_training for small runners.
+    Pass 0 collects final scores per game, pass 1 fits the scalers with
+    partial_fit and collects label vocabularies, then every epoch re-streams
+    the parquet cache through a shuffle buffer. Validation is a fixed 20%
+    of games instead of a random 20% of rows.
+    """
+    loader = NFLDataLoader()
+    engineer = NFLFeatureEngineer()
+    encoders = {}
+    if not resume:
+        forget_completed(DEFAULT_TARGETS)
+    
+    path = loader.pbp_cache_file()
+    if not path.exists():
+        print("⚠️ No pbp cache yet, downloading once (this step still needs the full frame)")
+        loader.load_play_by_play()
+    plan = plan_memory_budget(path, memory_budget_mb)
+    print(f"🧮 Budget {memory_budget_mb} MB -> {plan.chunk_rows} rows/chunk "
+          f"({plan.bytes_per_row:.0f} B/row), shuffle buffer {plan.buffer_rows} rows")
+    source = PBPChunkSource(path, chunk_rows=plan.chunk_rows)
+    
+    # Pass 0: game outcomes (a game can straddle chunks, last chunk wins)
+    print("📥 Pass 0: game outcomes...")
+    parts = [engineer.game_outcomes(engineer.clean_pbp(chunk))
+             for chunk in PBPChunkSource(path, OUTCOME_COLUMNS, plan.chunk_rows)]
+    outcomes = pd.concat(parts).groupby(level=0).last()
+    
+    # Pass 1: scaler statistics and label vocabularies
+    print("📥 Pass 1: scaler statistics...")
+    labels = {name: set() for name in ENCODED_TARGETS}
+    for chunk in source:
+        clean = engineer.clean_pbp(chunk)
+        for name in DEFAULT_TARGETS:
+            X, y = build_feature_set(engineer, name, clean, outcomes=outcomes)
+            if len(X):
+                engineer.partial_fit_scaler(X.values, name)
+            if name in labels:
+                labels[name].update(y.unique())
+    for name, values in labels.items():
+        encoders[name] = LabelEncoder().fit(sorted(values))
+    
+    def loaders(name):
+        def make(validation):
+            transform = _streaming_transform(engineer, name, outcomes, encoders.get(name), validation)
+            return ShuffleBufferLoader(source, transform, plan.buffer_rows, BATCH_SIZE,
+                                       shuffle=not validation, device=DEVICE)
+        return make(False), make(True)
+    
+    # Pass 2+: one re-stream per epoch and split
+    for name in DEFAULT_TARGETS:
+        tl, vl = loaders(name)
+        input_dim = engineer.scalers[name].n_features_in_
+        if name == 'fourth_down':
+            fit_fourth_down(tl, vl, input_dim, resume=resume)
+            continue
+        encoder = encoders.get(name)
+        model = build_model(name, input_dim, len(encoder.classes_) if encoder else None).to(DEVICE)
+        criterion = nn.CrossEntropyLoss() if encoder else nn.BCELoss()
+        opt = optim.Adam(model.parameters(), lr=LEARNING_RATE)
+        sch = optim.lr_scheduler.ReduceLROnPlateau(opt, 'min', patience=5, factor=0.5)
+        train_generic_model(model, tl, vl, criterion, opt, sch, MODEL_FILES[name], resume=resume)
+    
+    joblib.dump(engineer.scalers, DATA_DIR / "scalers.pkl")
+    joblib.dump(encoders, DATA_DIR / "encoders.pkl")
+    print(f"✅ Streaming Training Complete. Artifacts in {DATA_DIR} and {MODEL_DIR}")
+
 if __name__ == "__main__":
-    run_training()
\ No newline at end of file
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--parallel-features", action="store_true",
+                        help="Build the five feature sets concurrently in forked worker processes")
+    parser.add_argument("--feature-workers", type=int, default=None)
+    parser.add_argument("--streaming", action="store_true",
+                        help="Stream the pbp parquet in chunks instead of loading it whole")
+    parser.add_argument("--memory-budget-mb", type=int, default=512,
+                        help="Peak working-set target for --streaming")
+    parser.add_argument("--resume", action="store_true",
+                        help=f"Continue from checkpoints in {CHECKPOINT_DIR}, skipping models this run already finished")
+    parser.add_argument("--multitask", action="store_true",
+                        help="Also train the shared-trunk situational model (offensive/defensive/personnel in one net)")
+    args = parser.parse_args()
+    if args.streaming:
+        run_streaming_training(memory_budget_mb=args.memory_budget_mb, resume=args.resume)
+    else:
+        run_training(parallel_features=args.parallel_features, feature_workers=args.feature_workers,
+                     resume=args.resume, multitask=args.multitask)
\ No newline at end of file
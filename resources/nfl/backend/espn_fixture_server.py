@@ -0,0 +1,124 @@
+"""
+Local ESPN Stand-in
+Serves the ESPN scoreboard and game summary endpoints from JSON fixtures so
+the live-game client and server can be exercised offline. Supports ETag /
+Last-Modified revalidation (304), simulated upstream latency, and replacing
+a fixture at runtime to simulate a play happening.
+
+Usage:
+    python espn_fixture_server.py --port 8010 --latency-ms 80
+    ESPN_BASE_URL=http://localhost:8010 uvicorn main:app --port 8000
+
+    # Advance a game: replace its summary (and optionally the scoreboard)
+    curl -X PUT localhost:8010/_fixtures/summary/401547001 -d @next_play.json
+"""
+
+import argparse
+import asyncio
+import hashlib
+import json
+import time
+from email.utils import formatdate, parsedate_to_datetime
+from pathlib import Path
+from typing import Dict
+
+from fastapi import FastAPI, HTTPException, Request, Response
+
+from live_game_api import SCOREBOARD_PATH, SUMMARY_PATH
+
+FIXTURE_DIR = Path(__file__).parent / "fixtures" / "espn"
+
+
+class FixtureStore:
+    """In-memory fixture documents with their validators"""
+
+    def __init__(self, fixture_dir: Path):
+        self.docs: Dict[str, bytes] = {}
+        self.etags: Dict[str, str] = {}
+        self.modified: Dict[str, float] = {}
+        self.stats = {'requests': 0, 'not_modified': 0, 'updates': 0}
+        for path in sorted(Path(fixture_dir).glob("*.json")):
+            self.put(path.stem, json.loads(path.read_text()))
+
+    def put(self, name: str, doc) -> None:
+        body = json.dumps(doc, separators=(',', ':')).encode()
+        self.docs[name] = body
+        self.etags[name] = '"' + hashlib.sha1(body).hexdigest()[:16] + '"'
+        # HTTP dates have one-second resolution; keep updates strictly increasing
+        self.modified[name] = max(float(int(time.time())), self.modified.get(name, 0.0) + 1)
+
+    def respond(self, name: str, request: Request) -> Response:
+        self.stats['requests'] += 1
+        if name not in self.docs:
+            raise HTTPException(404, f"No fixture '{name}'")
+        etag = self.etags[name]
+        headers = {'ETag': etag, 'Last-Modified': formatdate(self.modified[name], usegmt=True),
+                   'Cache-Control': 'max-age=0'}
+
+        if_none_match = request.headers.get('if-none-match')
+        if_modified_since = request.headers.get('if-modified-since')
+        if if_none_match is not None:
+            fresh = etag in [t.strip() for t in if_none_match.split(',')]
+        elif if_modified_since is not None:
+            try:
+                fresh = parsedate_to_datetime(if_modified_since).timestamp() >= self.modified[name]
+            except (TypeError, ValueError):
+                fresh = False
+        else:
+            fresh = False
+        if fresh:
+            self.stats['not_modified'] += 1
+            return Response(status_code=304, headers=headers)
+        return Response(self.docs[name], media_type='application/json', headers=headers)
+
+
+def create_app(fixture_dir: Path = FIXTURE_DIR, latency_ms: float = 0.0) -> FastAPI:
+    """ESPN stand-in app; usable in-process through httpx.ASGITransport"""
+    app = FastAPI(title="ESPN Fixture Server")
+    store = FixtureStore(fixture_dir)
+    app.state.store = store
+
+    async def upstream_delay():
+        if latency_ms:
+            await asyncio.sleep(latency_ms / 1000)
+
+    @app.get(SCOREBOARD_PATH)
+    async def scoreboard(request: Request):
+        await upstream_delay()
+        return store.respond('scoreboard', request)
+
+    @app.get(SUMMARY_PATH)
+    async def summary(request: Request, event: str):
+        await upstream_delay()
+        return store.respond(f'summary_{event}', request)
+
+    @app.put("/_fixtures/scoreboard")
+    async def replace_scoreboard(request: Request):
+        store.put('scoreboard', await request.json())
+        store.stats['updates'] += 1
+        return {"updated": "scoreboard"}
+
+    @app.put("/_fixtures/summary/{event}")
+    async def replace_summary(event: str, request: Request):
+        store.put(f'summary_{event}', await request.json())
+        store.stats['updates'] += 1
+        return {"updated": f"summary_{event}"}
+
+    @app.get("/_stats")
+    async def stats():
+        return store.stats
+
+    return app
+
+
+if __name__ == "__main__":
+    import uvicorn
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--port", type=int, default=8010)
+    parser.add_argument("--fixtures", type=Path, default=FIXTURE_DIR)
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="Simulated upstream latency")
+    args = parser.parse_args()
+
+    print(f"Serving ESPN fixtures from {args.fixtures} on port {args.port}")
+    uvicorn.run(create_app(args.fixtures, args.latency_ms), host="127.0.0.1", port=args.port)
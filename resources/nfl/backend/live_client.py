@@ -0,0 +1,181 @@
+"""
+Async Live NFL Game Data Client
+One pooled httpx.AsyncClient for all ESPN traffic, with conditional
+requests (ETag / If-Modified-Since), a short per-URL response cache,
+de-duplication of concurrent fetches and parallel fan-out over live games.
+"""
+
+import asyncio
+import os
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+import httpx
+
+from live_game_api import (
+    ESPN_BASE_URL, SCOREBOARD_PATH, SUMMARY_PATH, USER_AGENT,
+    parse_scoreboard, parse_game_details
+)
+
+# Responses younger than this are served without contacting ESPN at all
+CACHE_TTL_SECONDS = float(os.environ.get("ESPN_CACHE_TTL", "2.0"))
+MAX_CONNECTIONS = 20
+MAX_PARALLEL_FETCHES = 16
+
+
+@dataclass
+class CachedResponse:
+    """Last good response for one URL plus its validators"""
+    data: Any
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+    fetched_at: float = 0.0
+
+
+@dataclass
+class ClientStats:
+    requests: int = 0
+    not_modified: int = 0
+    cache_hits: int = 0
+    coalesced: int = 0
+    errors: int = 0
+
+    def as_dict(self) -> Dict[str, int]:
+        return dict(self.__dict__)
+
+
+class AsyncLiveDataClient:
+    """Shared async ESPN client; create once per process and close on shutdown"""
+
+    def __init__(self, base_url: str = None, ttl: float = CACHE_TTL_SECONDS,
+                 max_connections: int = MAX_CONNECTIONS, timeout: float = 10.0,
+                 transport: httpx.AsyncBaseTransport = None):
+        self.base_url = base_url or os.environ.get("ESPN_BASE_URL", ESPN_BASE_URL)
+        self.ttl = ttl
+        self.client = httpx.AsyncClient(
+            base_url=self.base_url,
+            headers={'User-Agent': USER_AGENT},
+            timeout=timeout,
+            limits=httpx.Limits(max_connections=max_connections,
+                                max_keepalive_connections=max_connections),
+            transport=transport,
+        )
+        self.cache: Dict[str, CachedResponse] = {}
+        self.inflight: Dict[str, asyncio.Future] = {}
+        self.fanout = asyncio.Semaphore(MAX_PARALLEL_FETCHES)
+        self.stats = ClientStats()
+
+    async def close(self):
+        await self.client.aclose()
+
+    async def fetch_json(self, path: str, params: Dict[str, str] = None) -> Any:
+        """
+        GET a JSON document, revalidating the cached copy once it is older than the TTL
+
+        Args:
+            path: URL path relative to the base URL
+            params: Query parameters (part of the cache key)
+
+        Returns:
+            Decoded JSON (the cached copy when ESPN answers 304 Not Modified)
+        """
+        key = path + ('?' + '&'.join(f"{k}={v}" for k, v in sorted(params.items())) if params else '')
+        cached = self.cache.get(key)
+        if cached and time.monotonic() - cached.fetched_at < self.ttl:
+            self.stats.cache_hits += 1
+            return cached.data
+
+        # Concurrent callers for the same URL share one upstream request
+        pending = self.inflight.get(key)
+        if pending is not None:
+            self.stats.coalesced += 1
+            return await asyncio.shield(pending)
+
+        future = asyncio.get_running_loop().create_future()
+        self.inflight[key] = future
+        try:
+            data = await self._revalidate(key, path, params, cached)
+            future.set_result(data)
+            return data
+        except BaseException as e:
+            # Also on cancellation (a BaseException): callers coalesced onto this
+            # fetch must see it fail rather than wait on the future forever
+            future.set_exception(e if isinstance(e, Exception) else ConnectionError(f"Fetch of {key} was cancelled"))
+            # Mark retrieved so an un-awaited failure is not logged as never consumed
+            future.exception()
+            raise
+        finally:
+            del self.inflight[key]
+
+    async def _revalidate(self, key: str, path: str, params: Optional[Dict[str, str]],
+                          cached: Optional[CachedResponse]) -> Any:
+        headers = {}
+        if cached and cached.etag:
+            headers['If-None-Match'] = cached.etag
+        if cached and cached.last_modified:
+            headers['If-Modified-Since'] = cached.last_modified
+
+        self.stats.requests += 1
+        try:
+            response = await self.client.get(path, params=params, headers=headers)
+        except httpx.HTTPError:
+            self.stats.errors += 1
+            raise
+        if response.status_code == 304 and cached:
+            self.stats.not_modified += 1
+            cached.fetched_at = time.monotonic()
+            return cached.data
+        if response.is_error:
+            self.stats.errors += 1
+        response.raise_for_status()
+
+        data = response.json()
+        self.cache[key] = CachedResponse(data, response.headers.get('ETag'),
+                                         response.headers.get('Last-Modified'), time.monotonic())
+        return data
+
+    async def get_live_games(self) -> List[Dict]:
+        """
+        Get all live/in-progress NFL games
+
+        Returns:
+            List of game dictionaries with basic info ([] if ESPN is unreachable)
+        """
+        try:
+            return parse_scoreboard(await self.fetch_json(SCOREBOARD_PATH))
+        except Exception as e:
+            print(f"Error fetching live games: {e}")
+            return []
+
+    async def get_game_details(self, game_id: str) -> Optional[Dict]:
+        """
+        Get detailed game situation for a specific game
+
+        Args:
+            game_id: ESPN game ID
+
+        Returns:
+            Dictionary with detailed game state or None
+        """
+        try:
+            async with self.fanout:
+                data = await self.fetch_json(SUMMARY_PATH, {'event': game_id})
+            return parse_game_details(data)
+        except Exception as e:
+            print(f"Error fetching game details for {game_id}: {e}")
+            return None
+
+    async def get_all_game_details(self, live_only: bool = True) -> Dict[str, Optional[Dict]]:
+        """
+        Detailed state of every game on the scoreboard, fetched in parallel
+
+        Args:
+            live_only: Skip games that have already finished
+
+        Returns:
+            Mapping of game_id to game state (None where the fetch failed)
+        """
+        games = [g for g in await self.get_live_games() if g['is_live'] or not live_only]
+        details = await asyncio.gather(*(self.get_game_details(g['game_id']) for g in games))
+        return {g['game_id']: d for g, d in zip(games, details)}
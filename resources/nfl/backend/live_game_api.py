@@ -5,20 +5,127 @@ Fetches real-time game data from ESPN API
 
 import requests
 from typing import List, Dict, Optional
-from datetime import datetime
 
 
+ESPN_BASE_URL = "https://site.api.espn.com"
+SCOREBOARD_PATH = "/apis/site/v2/sports/football/nfl/scoreboard"
+SUMMARY_PATH = "/apis/site/v2/sports/football/nfl/summary"
+USER_AGENT = 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36'
+
+
+# ==================== Parsing ====================
+
+def parse_scoreboard(data: Dict) -> List[Dict]:
+    """
+    Extract in-progress and recently finished games from an ESPN scoreboard
+
+    Args:
+        data: Decoded scoreboard JSON
+
+    Returns:
+        List of game dictionaries with basic info
+    """
+    games = []
+    for event in data.get('events', []):
+        competition = event['competitions'][0]
+        status = competition['status']
+
+        # Check if game is live
+        if status['type']['state'] in ['in', 'post']:  # in-progress or recently finished
+            games.append({
+                'game_id': event['id'],
+                'name': event['name'],
+                'status': status['type']['description'],
+                'quarter': status.get('period', 1),
+                'clock': status.get('displayClock', '15:00'),
+                'home_team': competition['competitors'][0]['team']['abbreviation'],
+                'away_team': competition['competitors'][1]['team']['abbreviation'],
+                'home_score': int(competition['competitors'][0]['score']),
+                'away_score': int(competition['competitors'][1]['score']),
+                'is_live': status['type']['state'] == 'in'
+            })
+    return games
+
+
+def parse_clock(clock_display: str) -> int:
+    """'MM:SS' game clock to seconds (900 when unparseable)"""
+    try:
+        if ':' in clock_display:
+            minutes, seconds = clock_display.split(':')
+            return int(minutes) * 60 + int(seconds)
+    except ValueError:
+        pass
+    return 900
+
+
+def parse_down(situation: Dict) -> int:
+    """Down from ESPN's short down & distance text ('3rd & 4'), defaulting to 1st"""
+    down_text = situation.get('shortDownDistanceText', '1st') or '1st'
+    for down, ordinal in enumerate(['1st', '2nd', '3rd', '4th'], start=1):
+        if ordinal in down_text:
+            return down
+    return 1
+
+
+def parse_game_details(data: Dict) -> Dict:
+    """
+    Extract the detailed game situation from an ESPN game summary
+
+    Args:
+        data: Decoded summary JSON
+
+    Returns:
+        Dictionary with detailed game state
+    """
+    header = data.get('header', {})
+    competition = header['competitions'][0]
+    status = competition['status']
+    situation = competition.get('situation') or {}
+
+    home, away = competition['competitors'][0], competition['competitors'][1]
+    home_team = home['team']['abbreviation']
+    away_team = away['team']['abbreviation']
+
+    # ESPN reports possession as a team id; map it back to the abbreviation
+    team_ids = {str(c['team'].get('id')): c['team']['abbreviation'] for c in (home, away)}
+    possession = situation.get('possession', home_team)
+    possession_team = team_ids.get(str(possession), possession)
+
+    # Calculate game seconds remaining
+    time_seconds = parse_clock(status.get('displayClock', '15:00'))
+    quarter = status.get('period', 1)
+    if quarter <= 4:
+        game_seconds_remaining = (4 - quarter) * 900 + time_seconds
+    else:  # Overtime
+        game_seconds_remaining = time_seconds
+
+    return {
+        'home_team': home_team,
+        'away_team': away_team,
+        'possession': possession_team,
+        'quarter': quarter if quarter <= 4 else 5,  # 5 for OT
+        'time_remaining': game_seconds_remaining,
+        'down': parse_down(situation),
+        'distance': situation.get('distance', 10),
+        'yard_line': 100 - situation.get('yardLine', 50) if situation else 50,  # Convert to yards from opponent goal
+        'home_score': int(home['score']),
+        'away_score': int(away['score']),
+        'home_timeouts': situation.get('homeTimeouts', 3),
+        'away_timeouts': situation.get('awayTimeouts', 3),
+    }
+
+
+# ==================== Synchronous Client ====================
+
 class NFLLiveDataAPI:
     """Fetch live NFL game data from ESPN"""
 
-    ESPN_SCOREBOARD_URL = "https://site.api.espn.com/apis/site/v2/sports/football/nfl/scoreboard"
-    ESPN_GAME_URL = "https://site.api.espn.com/apis/site/v2/sports/football/nfl/summary"
+    ESPN_SCOREBOARD_URL = ESPN_BASE_URL + SCOREBOARD_PATH
+    ESPN_GAME_URL = ESPN_BASE_URL + SUMMARY_PATH
 
     def __init__(self):
         self.session = requests.Session()
-        self.session.headers.update({
-            'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36'
-        })
+        self.session.headers.update({'User-Agent': USER_AGENT})
 
     def get_live_games(self) -> List[Dict]:
         """
@@ -30,30 +137,7 @@ class NFLLiveDataAPI:
         try:
             response = self.session.get(self.ESPN_SCOREBOARD_URL, timeout=10)
             response.raise_for_status()
-            data = response.json()
-
-            games = []
-            for event in data.get('events', []):
-                competition = event['competitions'][0]
-                status = competition['status']
-
-                # Check if game is live
-                if status['type']['state'] in ['in', 'post']:  # in-progress or recently finished
-                    game_info = {
-                        'game_id': event['id'],
-                        'name': event['name'],
-                        'status': status['type']['description'],
-                        'quarter': status.get('period', 1),
-                        'clock': status.get('displayClock', '15:00'),
-                        'home_team': competition['competitors'][0]['team']['abbreviation'],
-                        'away_team': competition['competitors'][1]['team']['abbreviation'],
-                        'home_score': int(competition['competitors'][0]['score']),
-                        'away_score': int(competition['competitors'][1]['score']),
-                        'is_live': status['type']['state'] == 'in'
-                    }
-                    games.append(game_info)
-
-            return games
+            return parse_scoreboard(response.json())
 
         except Exception as e:
             print(f"Error fetching live games: {e}")
@@ -76,69 +160,7 @@ class NFLLiveDataAPI:
                 timeout=10
             )
             response.raise_for_status()
-            data = response.json()
-
-            # Extract game details
-            header = data.get('header', {})
-            competition = header['competitions'][0]
-            status = competition['status']
-            situation = competition.get('situation', {})
-
-            home_team = competition['competitors'][0]['team']['abbreviation']
-            away_team = competition['competitors'][1]['team']['abbreviation']
-            possession_team = situation.get('possession', home_team) if situation else home_team
-
-            # Parse clock to seconds
-            clock_display = status.get('displayClock', '15:00')
-            try:
-                if ':' in clock_display:
-                    parts = clock_display.split(':')
-                    time_seconds = int(parts[0]) * 60 + int(parts[1])
-                else:
-                    time_seconds = 900  # Default to 15 min
-            except:
-                time_seconds = 900
-
-            # Calculate game seconds remaining
-            quarter = status.get('period', 1)
-            if quarter <= 4:
-                quarters_remaining = 4 - quarter
-                game_seconds_remaining = quarters_remaining * 900 + time_seconds
-            else:  # Overtime
-                game_seconds_remaining = time_seconds
-
-            game_state = {
-                'home_team': home_team,
-                'away_team': away_team,
-                'possession': possession_team,
-                'quarter': quarter if quarter <= 4 else 5,  # 5 for OT
-                'time_remaining': game_seconds_remaining,
-                'down': situation.get('downDistanceText', '1st & 10').split('&')[0].replace('st', '').replace('nd', '').replace('rd', '').replace('th', '').strip() if situation else 1,
-                'distance': situation.get('distance', 10) if situation else 10,
-                'yard_line': 100 - situation.get('yardLine', 50) if situation else 50,  # Convert to yards from opponent goal
-                'home_score': int(competition['competitors'][0]['score']),
-                'away_score': int(competition['competitors'][1]['score']),
-                'home_timeouts': situation.get('homeTimeouts', 3) if situation else 3,
-                'away_timeouts': situation.get('awayTimeouts', 3) if situation else 3,
-            }
-
-            # Clean down value
-            try:
-                down_text = situation.get('shortDownDistanceText', '1st')
-                if '1st' in down_text:
-                    game_state['down'] = 1
-                elif '2nd' in down_text:
-                    game_state['down'] = 2
-                elif '3rd' in down_text:
-                    game_state['down'] = 3
-                elif '4th' in down_text:
-                    game_state['down'] = 4
-                else:
-                    game_state['down'] = 1
-            except:
-                game_state['down'] = 1
-
-            return game_state
+            return parse_game_details(response.json())
 
         except Exception as e:
             print(f"Error fetching game details: {e}")
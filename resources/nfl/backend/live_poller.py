@@ -0,0 +1,308 @@
+"""
+Background Live-Game Poller
+One task polls ESPN for every live game, detects real situation changes
+(down, distance, field position, score or possession), recomputes model
+outputs only when something changed, and pushes the update to any number of
+WebSocket / SSE subscribers. Upstream calls and inference scale with the
+number of games, not the number of connected clients.
+
+Changed games are not evaluated one by one: an evaluation scheduler gathers
+the pending situation of every game and runs the models once per tick over
+all of them, so a full Sunday slate costs about the same as a single game.
+"""
+
+import asyncio
+import os
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Dict, List, Optional, Set
+
+import numpy as np
+
+from live_client import AsyncLiveDataClient
+
+POLL_INTERVAL_SECONDS = float(os.environ.get("LIVE_POLL_INTERVAL", "5.0"))
+SUBSCRIBER_QUEUE_SIZE = 64
+# Minimum seconds between evaluation ticks; updates arriving meanwhile join the next batch
+EVAL_TICK_SECONDS = float(os.environ.get("LIVE_EVAL_TICK", "0.25"))
+TICK_HISTORY = 512
+
+# Fields whose change means a new situation worth re-evaluating (clock ticks are not)
+CHANGE_FIELDS = ('down', 'distance', 'yard_line', 'home_score', 'away_score', 'possession')
+
+
+@dataclass
+class GameSnapshot:
+    """Latest known situation of one game and the model outputs for it"""
+    game_id: str
+    state: Dict
+    predictions: Optional[Dict] = None
+    seq: int = 0
+    updated_at: float = field(default_factory=time.time)
+
+    def event(self, kind: str = 'update', changed: List[str] = None) -> Dict:
+        return {
+            'type': kind,
+            'game_id': self.game_id,
+            'seq': self.seq,
+            'changed': changed or [],
+            'state': self.state,
+            'predictions': self.predictions,
+            'updated_at': self.updated_at,
+        }
+
+
+def changed_fields(old: Optional[Dict], new: Dict) -> List[str]:
+    """Situation fields that differ between two game states (all of them for a new game)"""
+    if old is None:
+        return list(CHANGE_FIELDS)
+    return [f for f in CHANGE_FIELDS if old.get(f) != new.get(f)]
+
+
+class EvaluationScheduler:
+    """Batches the pending situations of all games into one model evaluation per tick"""
+
+    def __init__(self, evaluate: Callable[[List[Dict]], Awaitable[List[Optional[Dict]]]],
+                 on_result: Callable[[str, Dict, Optional[Dict], List[str]], None],
+                 tracked: Callable[[], int], min_interval: float = EVAL_TICK_SECONDS):
+        """
+        Args:
+            evaluate: Coroutine turning a list of game states into model outputs (same order)
+            on_result: Called with (game_id, state, predictions, changed) for every evaluated game
+            tracked: Number of games currently tracked (for batch occupancy)
+            min_interval: Minimum seconds between ticks
+        """
+        self.evaluate = evaluate
+        self.on_result = on_result
+        self.tracked = tracked
+        self.min_interval = min_interval
+        # game_id -> (latest state, changed fields since the last evaluation)
+        self.pending: Dict[str, tuple] = {}
+        self.wake = asyncio.Event()
+        self.tick_ms = deque(maxlen=TICK_HISTORY)
+        self.occupancy = deque(maxlen=TICK_HISTORY)
+        self.stats = {'ticks': 0, 'rows': 0, 'max_batch': 0, 'superseded': 0, 'last_tick_ms': 0.0}
+        self.task: Optional[asyncio.Task] = None
+
+    def submit(self, game_id: str, state: Dict, changed: List[str]):
+        """Queue a game for the next tick; a newer state replaces a pending one"""
+        previous = self.pending.get(game_id)
+        if previous is not None:
+            self.stats['superseded'] += 1
+            changed = list(dict.fromkeys(previous[1] + changed))
+        self.pending[game_id] = (state, changed)
+        self.wake.set()
+
+    def discard(self, game_id: str):
+        self.pending.pop(game_id, None)
+
+    def start(self):
+        if self.task is None:
+            self.task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self.task is not None:
+            self.task.cancel()
+            try:
+                await self.task
+            except asyncio.CancelledError:
+                pass
+            self.task = None
+
+    async def _run(self):
+        while True:
+            await self.wake.wait()
+            self.wake.clear()
+            try:
+                await self.tick()
+            except Exception as e:
+                print(f"Evaluation tick error: {e}")
+            await asyncio.sleep(self.min_interval)
+
+    async def tick(self):
+        """Evaluate every pending game in one batch and hand each result back"""
+        if not self.pending:
+            return
+        batch, self.pending = self.pending, {}
+        game_ids = list(batch)
+        start = time.perf_counter()
+        predictions = await self.evaluate([batch[g][0] for g in game_ids])
+        elapsed_ms = (time.perf_counter() - start) * 1000
+
+        self.stats['ticks'] += 1
+        self.stats['rows'] += len(game_ids)
+        self.stats['max_batch'] = max(self.stats['max_batch'], len(game_ids))
+        self.stats['last_tick_ms'] = elapsed_ms
+        self.tick_ms.append(elapsed_ms)
+        self.occupancy.append(len(game_ids) / max(self.tracked(), len(game_ids)))
+
+        for game_id, result in zip(game_ids, predictions):
+            state, changed = batch[game_id]
+            self.on_result(game_id, state, result, changed)
+
+    def summary(self) -> Dict:
+        """Tick counts, tick latency percentiles and batch occupancy (batch size / games tracked)"""
+        ticks = np.array(self.tick_ms) if self.tick_ms else np.zeros(1)
+        return {
+            **self.stats,
+            'pending': len(self.pending),
+            'mean_batch': self.stats['rows'] / self.stats['ticks'] if self.stats['ticks'] else 0.0,
+            'tick_ms_p50': float(np.percentile(ticks, 50)),
+            'tick_ms_p95': float(np.percentile(ticks, 95)),
+            'tick_ms_max': float(ticks.max()),
+            'occupancy_mean': float(np.mean(self.occupancy)) if self.occupancy else 0.0,
+        }
+
+
+class LivePoller:
+    """Tracks all live games and publishes situation changes to subscribers"""
+
+    def __init__(self, client: AsyncLiveDataClient,
+                 evaluate: Callable[[List[Dict]], Awaitable[List[Optional[Dict]]]],
+                 interval: float = POLL_INTERVAL_SECONDS, tick: float = EVAL_TICK_SECONDS):
+        """
+        Args:
+            client: Shared ESPN client
+            evaluate: Coroutine turning a batch of game states into model outputs
+            interval: Seconds between polls
+            tick: Minimum seconds between batched evaluations
+        """
+        self.client = client
+        self.interval = interval
+        self.games: Dict[str, GameSnapshot] = {}
+        # Latest state seen per live game, including changes still waiting for evaluation
+        self.seen: Dict[str, Dict] = {}
+        self.scheduler = EvaluationScheduler(evaluate, self.record, lambda: len(self.seen), tick)
+        # game_id -> subscriber queues; None subscribes to every game
+        self.subscribers: Dict[Optional[str], Set[asyncio.Queue]] = {}
+        self.stats = {'polls': 0, 'changes': 0, 'unchanged': 0, 'inferences': 0,
+                      'events_sent': 0, 'events_dropped': 0, 'last_poll_ms': 0.0}
+        self.task: Optional[asyncio.Task] = None
+
+    # ==================== Lifecycle ====================
+
+    def start(self):
+        if self.task is None:
+            self.scheduler.start()
+            self.task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self.task is not None:
+            self.task.cancel()
+            try:
+                await self.task
+            except asyncio.CancelledError:
+                pass
+            self.task = None
+        await self.scheduler.stop()
+
+    async def _run(self):
+        while True:
+            start = time.perf_counter()
+            try:
+                await self.poll_once()
+            except Exception as e:
+                print(f"Live poller error: {e}")
+            self.stats['last_poll_ms'] = (time.perf_counter() - start) * 1000
+            await asyncio.sleep(max(0.0, self.interval - (time.perf_counter() - start)))
+
+    # ==================== Polling ====================
+
+    async def poll_once(self):
+        """Fetch every live game once and publish the ones whose situation changed"""
+        self.stats['polls'] += 1
+        details = await self.client.get_all_game_details()
+
+        updates = []
+        for game_id, state in details.items():
+            if state is None:  # fetch failed; keep the last known snapshot
+                continue
+            changed = changed_fields(self.seen.get(game_id), state)
+            self.seen[game_id] = state
+            if not changed:
+                # Clock-only movement: keep the latest state but skip inference and push
+                if game_id in self.games:
+                    self.games[game_id].state = state
+                self.stats['unchanged'] += 1
+                continue
+            updates.append((game_id, state, changed))
+
+        # Games no longer live (final or dropped off the scoreboard)
+        for game_id in [g for g in self.seen if g not in details]:
+            del self.seen[game_id]
+            self.scheduler.discard(game_id)
+            snapshot = self.games.pop(game_id, None)
+            if snapshot is not None:
+                self.publish(game_id, snapshot.event('final'))
+
+        await self.apply_updates(updates)
+
+    async def apply_updates(self, updates: List[tuple]):
+        """Queue changed games for the next batched evaluation (evaluated at once if not running)"""
+        for game_id, state, changed in updates:
+            self.scheduler.submit(game_id, state, changed)
+        if updates and self.scheduler.task is None:
+            await self.scheduler.tick()
+
+    def record(self, game_id: str, state: Dict, predictions: Optional[Dict], changed: List[str]):
+        """Store and publish an evaluated situation (dropped if the game ended meanwhile)"""
+        if game_id not in self.seen:
+            return
+        self.stats['inferences'] += 1
+        snapshot = self.games.get(game_id)
+        if snapshot is None:
+            snapshot = self.games[game_id] = GameSnapshot(game_id, state)
+        snapshot.state, snapshot.predictions = state, predictions
+        snapshot.seq += 1
+        snapshot.updated_at = time.time()
+        self.stats['changes'] += 1
+        self.publish(game_id, snapshot.event('update', changed))
+
+    # ==================== Subscriptions ====================
+
+    def subscribe(self, game_id: Optional[str] = None) -> asyncio.Queue:
+        """
+        Register a subscriber queue, pre-filled with the current snapshot(s)
+
+        Args:
+            game_id: Game to follow, or None for every live game
+
+        Returns:
+            Queue of event dictionaries
+        """
+        queue = asyncio.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+        self.subscribers.setdefault(game_id, set()).add(queue)
+        current = [self.games[game_id]] if game_id in self.games else \
+            list(self.games.values()) if game_id is None else []
+        for snapshot in current:
+            self._offer(queue, snapshot.event('snapshot'))
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue, game_id: Optional[str] = None):
+        queues = self.subscribers.get(game_id)
+        if queues is not None:
+            queues.discard(queue)
+            if not queues:
+                del self.subscribers[game_id]
+
+    def publish(self, game_id: str, event: Dict):
+        for queue in self.subscribers.get(game_id, set()) | self.subscribers.get(None, set()):
+            self._offer(queue, event)
+
+    def _offer(self, queue: asyncio.Queue, event: Dict):
+        """Enqueue without ever blocking the poller; a slow subscriber loses its oldest event"""
+        if queue.full():
+            queue.get_nowait()
+            self.stats['events_dropped'] += 1
+        queue.put_nowait(event)
+        self.stats['events_sent'] += 1
+
+    def summary(self) -> Dict:
+        return {
+            **self.stats,
+            'games_tracked': len(self.seen),
+            'subscribers': sum(len(q) for q in self.subscribers.values()),
+            'evaluation': self.scheduler.summary(),
+            'upstream': self.client.stats.as_dict(),
+        }
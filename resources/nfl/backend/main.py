@@ -3,17 +3,23 @@ FastAPI Backend Server for NFL AI Coach
 Serves predictions from all 5 PyTorch models via REST API
 """
 
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Request, WebSocket, WebSocketDisconnect
+from fastapi.encoders import jsonable_encoder
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel, Field
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, Field, ValidationError
 from typing import List, Dict, Optional
 import torch
 import numpy as np
 from pathlib import Path
 import joblib
+import asyncio
+import json
+import os
 
 from models import create_model
-from live_game_api import NFLLiveDataAPI
+from live_client import AsyncLiveDataClient
+from live_poller import LivePoller
 
 # Paths
 MODEL_DIR = Path(__file__).parent.parent / "models"
@@ -43,6 +49,14 @@ MODELS = {}
 SCALERS = {}
 ENCODERS = {}
 
+# Shared ESPN client (one connection pool and response cache for all requests)
+live_client: Optional[AsyncLiveDataClient] = None
+
+# Background poller pushing live-game changes to WebSocket/SSE subscribers
+LIVE_POLLER_ENABLED = os.environ.get("LIVE_POLLER", "1") != "0"
+SSE_KEEPALIVE_SECONDS = 15.0
+poller: Optional[LivePoller] = None
+
 
 # ==================== Pydantic Models for Request/Response ====================
 
@@ -179,6 +193,25 @@ async def load_models():
         print("You may need to train the models first by running: python backend/train.py")
 
 
+@app.on_event("startup")
+async def open_live_client():
+    """Create the pooled ESPN client (ESPN_BASE_URL points it at a stand-in) and start the poller"""
+    global live_client, poller
+    live_client = AsyncLiveDataClient()
+    poller = LivePoller(live_client, predict_live_batch)
+    if LIVE_POLLER_ENABLED:
+        poller.start()
+    print(f"Live data source: {live_client.base_url} (poller {'every %gs' % poller.interval if LIVE_POLLER_ENABLED else 'off'})")
+
+
+@app.on_event("shutdown")
+async def close_live_client():
+    if poller is not None:
+        await poller.stop()
+    if live_client is not None:
+        await live_client.close()
+
+
 # ==================== Helper Functions ====================
 
 def game_state_to_features(state: GameState, model_type: str) -> np.ndarray:
@@ -251,6 +284,164 @@ def game_state_to_features(state: GameState, model_type: str) -> np.ndarray:
     return feature_array
 
 
+def run_model(model_type: str, features: np.ndarray):
+    """
+    Scale a feature matrix and run one model over every row in a single forward pass
+
+    Args:
+        model_type: Key in MODELS / SCALERS
+        features: Unscaled features, one row per game state
+
+    Returns:
+        Class probabilities per row (offensive, personnel), pass / win probability
+        per row (defensive, win_prob), or (conversion, field goal) probabilities (fourth_down)
+    """
+    features_scaled = SCALERS[model_type].transform(features)
+    features_tensor = torch.FloatTensor(features_scaled).to(device)
+
+    with torch.no_grad():
+        if model_type in ('offensive', 'personnel'):
+            model, _ = MODELS[model_type]
+            return model.predict_proba(features_tensor).cpu().numpy()
+        if model_type == 'fourth_down':
+            predictions = MODELS['fourth_down'].predict(features_tensor)
+            return (predictions['conversion_prob'].cpu().numpy()[:, 0],
+                    predictions['fg_success_prob'].cpu().numpy()[:, 0])
+        return MODELS[model_type].predict_proba(features_tensor).cpu().numpy()[:, 0]
+
+
+def offensive_response(probs: np.ndarray) -> OffensivePlayResponse:
+    """Offensive play recommendation from the play-type probabilities"""
+    _, label_encoder = MODELS['offensive']
+    play_types = label_encoder.classes_
+    probabilities = {play: float(prob) for play, prob in zip(play_types, probs)}
+
+    recommended_idx = np.argmax(probs)
+    confidence = float(probs[recommended_idx])
+
+    return OffensivePlayResponse(
+        recommended_play=play_types[recommended_idx],
+        probabilities=probabilities,
+        expected_epa=0.5 * confidence,  # Simplified EPA calculation
+        confidence=confidence
+    )
+
+
+def defensive_response(pass_prob: float) -> DefensiveResponse:
+    """Defensive recommendation from the opponent's pass probability"""
+    pass_prob = float(pass_prob)
+
+    # Simple defensive recommendation
+    if pass_prob > 0.65:
+        recommended_defense = "Nickel / Prevent"
+    elif pass_prob < 0.35:
+        recommended_defense = "Base / Run Defend"
+    else:
+        recommended_defense = "Balanced Base Defense"
+
+    return DefensiveResponse(
+        predicted_play_type="pass" if pass_prob > 0.5 else "run",
+        pass_probability=pass_prob,
+        run_probability=1.0 - pass_prob,
+        recommended_defense=recommended_defense
+    )
+
+
+def fourth_down_response(conv_prob: float, fg_prob: float, state: GameState) -> FourthDownResponse:
+    """4th down decision from the conversion and field goal probabilities"""
+    conv_prob, fg_prob = float(conv_prob), float(fg_prob)
+
+    # Decision logic
+    expected_values = {
+        'go_for_it': conv_prob * 3.0,  # Simplified: assume TD value
+        'field_goal': fg_prob * 3.0 if state.yard_line < 35 else 0.0,
+        'punt': 1.5  # Expected field position value
+    }
+
+    return FourthDownResponse(
+        recommendation=max(expected_values, key=expected_values.get),
+        go_for_it_prob=conv_prob,
+        field_goal_prob=fg_prob if state.yard_line < 35 else None,
+        expected_values=expected_values
+    )
+
+
+def win_probability_response(win_prob: float) -> WinProbabilityResponse:
+    """Win probability and leverage for the team in possession"""
+    win_prob = float(win_prob)
+
+    # Determine leverage (how important this play is)
+    if 0.45 <= win_prob <= 0.55:
+        leverage = "High"
+    elif 0.35 <= win_prob <= 0.65:
+        leverage = "Medium"
+    else:
+        leverage = "Low"
+
+    return WinProbabilityResponse(
+        possession_team_win_prob=win_prob * 100,
+        opponent_win_prob=(1 - win_prob) * 100,
+        leverage=leverage
+    )
+
+
+def personnel_response(probs: np.ndarray, state: GameState) -> PersonnelResponse:
+    """Personnel grouping recommendation from the grouping probabilities"""
+    _, label_encoder = MODELS['personnel']
+    personnel_groups = label_encoder.classes_
+    probabilities = {group: float(prob) for group, prob in zip(personnel_groups, probs)}
+
+    return PersonnelResponse(
+        recommended_personnel=personnel_groups[np.argmax(probs)],
+        probabilities=probabilities,
+        reasoning=f"Best for {state.down} & {state.distance} at yard line {state.yard_line}"
+    )
+
+
+# Result key in /predict/all for each model, in response order
+RESULT_KEYS = {
+    'offensive': 'offensive',
+    'defensive': 'defensive',
+    'fourth_down': 'fourth_down',
+    'win_prob': 'win_probability',
+    'personnel': 'personnel',
+}
+
+
+def evaluate_states(states: List[GameState]) -> List[Dict]:
+    """
+    Every loaded model for many game states at once: one forward pass per model
+    over all states (the 4th down model over the 4th-down states only)
+
+    Args:
+        states: Game states, e.g. the current situation of every live game
+
+    Returns:
+        One /predict/all-style dictionary of responses per state
+    """
+    results = [{} for _ in states]
+    for model_type, key in RESULT_KEYS.items():
+        if model_type not in MODELS:
+            continue
+        rows = [i for i, state in enumerate(states) if model_type != 'fourth_down' or state.down == 4]
+        if not rows:
+            continue
+
+        outputs = run_model(model_type, np.vstack([game_state_to_features(states[i], model_type) for i in rows]))
+        for j, i in enumerate(rows):
+            if model_type == 'offensive':
+                results[i][key] = offensive_response(outputs[j])
+            elif model_type == 'defensive':
+                results[i][key] = defensive_response(outputs[j])
+            elif model_type == 'fourth_down':
+                results[i][key] = fourth_down_response(outputs[0][j], outputs[1][j], states[i])
+            elif model_type == 'win_prob':
+                results[i][key] = win_probability_response(outputs[j])
+            else:
+                results[i][key] = personnel_response(outputs[j], states[i])
+    return results
+
+
 # ==================== API Endpoints ====================
 
 @app.get("/")
@@ -281,30 +472,8 @@ async def predict_offensive_play(state: GameState):
         raise HTTPException(status_code=503, detail="Model not loaded. Train models first.")
 
     try:
-        # Prepare features
-        features = game_state_to_features(state, 'offensive')
-        features_scaled = SCALERS['offensive'].transform(features)
-
-        # Predict
-        model, label_encoder = MODELS['offensive']
-        with torch.no_grad():
-            features_tensor = torch.FloatTensor(features_scaled).to(device)
-            probs = model.predict_proba(features_tensor).cpu().numpy()[0]
-
-        # Get play recommendations
-        play_types = label_encoder.classes_
-        probabilities = {play: float(prob) for play, prob in zip(play_types, probs)}
-
-        recommended_idx = np.argmax(probs)
-        recommended_play = play_types[recommended_idx]
-        confidence = float(probs[recommended_idx])
-
-        return OffensivePlayResponse(
-            recommended_play=recommended_play,
-            probabilities=probabilities,
-            expected_epa=0.5 * confidence,  # Simplified EPA calculation
-            confidence=confidence
-        )
+        probs = run_model('offensive', game_state_to_features(state, 'offensive'))[0]
+        return offensive_response(probs)
 
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Prediction error: {str(e)}")
@@ -317,31 +486,8 @@ async def predict_defensive_play(state: GameState):
         raise HTTPException(status_code=503, detail="Model not loaded")
 
     try:
-        features = game_state_to_features(state, 'defensive')
-        features_scaled = SCALERS['defensive'].transform(features)
-
-        model = MODELS['defensive']
-        with torch.no_grad():
-            features_tensor = torch.FloatTensor(features_scaled).to(device)
-            pass_prob = float(model.predict_proba(features_tensor).cpu().numpy()[0][0])
-
-        run_prob = 1.0 - pass_prob
-        predicted_play = "pass" if pass_prob > 0.5 else "run"
-
-        # Simple defensive recommendation
-        if pass_prob > 0.65:
-            recommended_defense = "Nickel / Prevent"
-        elif pass_prob < 0.35:
-            recommended_defense = "Base / Run Defend"
-        else:
-            recommended_defense = "Balanced Base Defense"
-
-        return DefensiveResponse(
-            predicted_play_type=predicted_play,
-            pass_probability=pass_prob,
-            run_probability=run_prob,
-            recommended_defense=recommended_defense
-        )
+        pass_prob = run_model('defensive', game_state_to_features(state, 'defensive'))[0]
+        return defensive_response(pass_prob)
 
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Prediction error: {str(e)}")
@@ -357,32 +503,8 @@ async def predict_fourth_down(state: GameState):
         raise HTTPException(status_code=503, detail="Model not loaded")
 
     try:
-        features = game_state_to_features(state, 'fourth_down')
-        features_scaled = SCALERS['fourth_down'].transform(features)
-
-        model = MODELS['fourth_down']
-        with torch.no_grad():
-            features_tensor = torch.FloatTensor(features_scaled).to(device)
-            predictions = model.predict(features_tensor)
-
-        conv_prob = float(predictions['conversion_prob'].cpu().numpy()[0][0])
-        fg_prob = float(predictions['fg_success_prob'].cpu().numpy()[0][0])
-
-        # Decision logic
-        expected_values = {
-            'go_for_it': conv_prob * 3.0,  # Simplified: assume TD value
-            'field_goal': fg_prob * 3.0 if state.yard_line < 35 else 0.0,
-            'punt': 1.5  # Expected field position value
-        }
-
-        recommendation = max(expected_values, key=expected_values.get)
-
-        return FourthDownResponse(
-            recommendation=recommendation,
-            go_for_it_prob=conv_prob,
-            field_goal_prob=fg_prob if state.yard_line < 35 else None,
-            expected_values=expected_values
-        )
+        conv_probs, fg_probs = run_model('fourth_down', game_state_to_features(state, 'fourth_down'))
+        return fourth_down_response(conv_probs[0], fg_probs[0], state)
 
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Prediction error: {str(e)}")
@@ -395,27 +517,8 @@ async def predict_win_probability(state: GameState):
         raise HTTPException(status_code=503, detail="Model not loaded")
 
     try:
-        features = game_state_to_features(state, 'win_prob')
-        features_scaled = SCALERS['win_prob'].transform(features)
-
-        model = MODELS['win_prob']
-        with torch.no_grad():
-            features_tensor = torch.FloatTensor(features_scaled).to(device)
-            win_prob = float(model.predict_proba(features_tensor).cpu().numpy()[0][0])
-
-        # Determine leverage (how important this play is)
-        if 0.45 <= win_prob <= 0.55:
-            leverage = "High"
-        elif 0.35 <= win_prob <= 0.65:
-            leverage = "Medium"
-        else:
-            leverage = "Low"
-
-        return WinProbabilityResponse(
-            possession_team_win_prob=win_prob * 100,
-            opponent_win_prob=(1 - win_prob) * 100,
-            leverage=leverage
-        )
+        win_prob = run_model('win_prob', game_state_to_features(state, 'win_prob'))[0]
+        return win_probability_response(win_prob)
 
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Prediction error: {str(e)}")
@@ -428,28 +531,8 @@ async def predict_personnel(state: GameState):
         raise HTTPException(status_code=503, detail="Model not loaded")
 
     try:
-        features = game_state_to_features(state, 'personnel')
-        features_scaled = SCALERS['personnel'].transform(features)
-
-        model, label_encoder = MODELS['personnel']
-        with torch.no_grad():
-            features_tensor = torch.FloatTensor(features_scaled).to(device)
-            probs = model.predict_proba(features_tensor).cpu().numpy()[0]
-
-        personnel_groups = label_encoder.classes_
-        probabilities = {group: float(prob) for group, prob in zip(personnel_groups, probs)}
-
-        recommended_idx = np.argmax(probs)
-        recommended_personnel = personnel_groups[recommended_idx]
-
-        # Simple reasoning
-        reasoning = f"Best for {state.down} & {state.distance} at yard line {state.yard_line}"
-
-        return PersonnelResponse(
-            recommended_personnel=recommended_personnel,
-            probabilities=probabilities,
-            reasoning=reasoning
-        )
+        probs = run_model('personnel', game_state_to_features(state, 'personnel'))[0]
+        return personnel_response(probs, state)
 
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Prediction error: {str(e)}")
@@ -459,46 +542,75 @@ async def predict_personnel(state: GameState):
 async def predict_all(state: GameState):
     """Get all predictions at once"""
     try:
-        results = {}
+        return evaluate_states([state])[0]
 
-        if 'offensive' in MODELS:
-            results['offensive'] = await predict_offensive_play(state)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Prediction error: {str(e)}")
 
-        if 'defensive' in MODELS:
-            results['defensive'] = await predict_defensive_play(state)
 
-        if state.down == 4 and 'fourth_down' in MODELS:
-            results['fourth_down'] = await predict_fourth_down(state)
+async def predict_live_batch(states: List[Dict]) -> List[Optional[Dict]]:
+    """
+    All model outputs for a batch of parsed live game states
 
-        if 'win_prob' in MODELS:
-            results['win_probability'] = await predict_win_probability(state)
+    Args:
+        states: Game state dictionaries from the live client
 
-        if 'personnel' in MODELS:
-            results['personnel'] = await predict_personnel(state)
+    Returns:
+        One /predict/all-style result per state (None where a state is not a valid GameState)
+    """
+    game_states, valid = [], []
+    for i, state in enumerate(states):
+        try:
+            game_states.append(GameState(**state))
+            valid.append(i)
+        except ValidationError as e:
+            print(f"Skipping inference for unusable live state: {e.errors()[0]['msg']}")
 
+    results: List[Optional[Dict]] = [None] * len(states)
+    if not game_states:
         return results
-
+    try:
+        for i, result in zip(valid, evaluate_states(game_states)):
+            results[i] = jsonable_encoder(result)
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Prediction error: {str(e)}")
+        print(f"Live inference failed: {e}")
+    return results
 
 
 @app.get("/live-games")
 async def get_live_games():
     """Get all live NFL games from ESPN API"""
     try:
-        api = NFLLiveDataAPI()
-        games = api.get_live_games()
+        games = await live_client.get_live_games()
         return {"games": games, "count": len(games)}
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error fetching live games: {str(e)}")
 
 
+@app.get("/live-games/details")
+async def get_live_game_details():
+    """Get detailed game state for every live game, fetched from ESPN in parallel"""
+    try:
+        details = await live_client.get_all_game_details()
+        return {"games": {game_id: state for game_id, state in details.items() if state is not None},
+                "count": len(details)}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error fetching game details: {str(e)}")
+
+
+@app.get("/live-games/stats")
+async def get_live_client_stats():
+    """Upstream request, 304 and cache-hit counters of the shared ESPN client"""
+    return live_client.stats.as_dict()
+
+
 @app.get("/game/{game_id}")
 async def get_game_state(game_id: str):
-    """Get detailed game state for a specific game from ESPN API"""
+    """Get detailed game state for a specific game (from the poller when it tracks the game)"""
+    if poller is not None and game_id in poller.games:
+        return poller.games[game_id].state
     try:
-        api = NFLLiveDataAPI()
-        game_state = api.get_game_details(game_id)
+        game_state = await live_client.get_game_details(game_id)
 
         if game_state is None:
             raise HTTPException(status_code=404, detail="Game not found or data unavailable")
@@ -510,6 +622,72 @@ async def get_game_state(game_id: str):
         raise HTTPException(status_code=500, detail=f"Error fetching game details: {str(e)}")
 
 
+# ==================== Live Push (WebSocket / SSE) ====================
+
+@app.get("/live/games")
+async def get_tracked_games():
+    """Latest state and model outputs of every game the poller tracks (no upstream call)"""
+    return {"games": [s.event('snapshot') for s in poller.games.values()], "count": len(poller.games)}
+
+
+@app.get("/live/stats")
+async def get_poller_stats():
+    """Poll, change, inference and subscriber counters"""
+    return poller.summary()
+
+
+@app.get("/live/stream")
+async def stream_live_updates(request: Request, game_id: Optional[str] = None):
+    """Server-Sent Events: current snapshot(s), then one event per situation change"""
+    queue = poller.subscribe(game_id)
+
+    async def events():
+        try:
+            while not await request.is_disconnected():
+                try:
+                    event = await asyncio.wait_for(queue.get(), timeout=SSE_KEEPALIVE_SECONDS)
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"
+                    continue
+                yield f"event: {event['type']}\nid: {event['game_id']}:{event['seq']}\ndata: {json.dumps(event)}\n\n"
+        finally:
+            poller.unsubscribe(queue, game_id)
+
+    return StreamingResponse(events(), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+
+@app.websocket("/live/ws")
+async def live_updates_ws(websocket: WebSocket, game_id: Optional[str] = None):
+    """WebSocket: current snapshot(s), then one message per situation change"""
+    await websocket.accept()
+    queue = poller.subscribe(game_id)
+    # Clients only listen, so reading is how a quiet game notices a closed socket
+    closed = asyncio.create_task(wait_for_disconnect(websocket))
+    try:
+        while True:
+            next_event = asyncio.create_task(queue.get())
+            done, _ = await asyncio.wait({next_event, closed}, return_when=asyncio.FIRST_COMPLETED)
+            if closed in done:
+                next_event.cancel()
+                break
+            await websocket.send_json(next_event.result())
+    except (WebSocketDisconnect, RuntimeError, OSError):
+        # Sending raced a close: RuntimeError from Starlette, ClientDisconnected (OSError) from uvicorn
+        pass
+    finally:
+        closed.cancel()
+        poller.unsubscribe(queue, game_id)
+
+
+async def wait_for_disconnect(websocket: WebSocket):
+    """Consume (and ignore) client messages until the socket closes"""
+    while True:
+        message = await websocket.receive()
+        if message['type'] == 'websocket.disconnect':
+            return
+
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000, reload=True)
@@ -0,0 +1,8 @@
+import sys
+from pathlib import Path
+
+# The legacy backend's modules import each other as top-level modules (see main.py).
+# Appended, not prepended: its main, train, data_loader, ... share names with
+# backend/, whose tests run in the same session. Tests here import only the
+# live_* modules and espn_fixture_server, which exist only in this directory.
+sys.path.append(str(Path(__file__).resolve().parent.parent))
@@ -0,0 +1,111 @@
+import asyncio
+import json
+
+import httpx
+import pytest
+
+from espn_fixture_server import FIXTURE_DIR, create_app
+from live_client import AsyncLiveDataClient
+from live_game_api import SUMMARY_PATH
+
+GAME_ID = '401547001'
+
+
+def run(test, ttl=0.0, latency_ms=0.0):
+    """Run test(client, app) against an in-process fixture server"""
+    async def main():
+        app = create_app(latency_ms=latency_ms)
+        client = AsyncLiveDataClient(base_url='http://espn.test', ttl=ttl,
+                                     transport=httpx.ASGITransport(app=app))
+        try:
+            return await test(client, app)
+        finally:
+            await client.close()
+    return asyncio.run(main())
+
+
+async def fetch_summary(client, game_id=GAME_ID):
+    return await client.fetch_json(SUMMARY_PATH, {'event': game_id})
+
+
+def test_stale_copy_is_revalidated_with_a_304():
+    async def test(client, app):
+        first = await fetch_summary(client)
+        second = await fetch_summary(client)
+        assert second == first
+        assert client.stats.requests == 2 and client.stats.not_modified == 1
+        assert app.state.store.stats['not_modified'] == 1
+
+    run(test)
+
+
+def test_changed_document_replaces_the_cached_copy():
+    async def test(client, app):
+        doc = await fetch_summary(client)
+        doc = json.loads(json.dumps(doc))
+        doc['header']['competitions'][0]['situation']['distance'] = 9
+        app.state.store.put(f'summary_{GAME_ID}', doc)
+        assert (await fetch_summary(client)) == doc
+        assert client.stats.not_modified == 0
+
+    run(test)
+
+
+def test_fresh_copy_is_served_without_contacting_upstream():
+    async def test(client, app):
+        first = await fetch_summary(client)
+        assert (await fetch_summary(client)) is first
+        assert client.stats.requests == 1 and client.stats.cache_hits == 1
+        assert app.state.store.stats['requests'] == 1
+
+    run(test, ttl=60.0)
+
+
+def test_concurrent_fetches_share_one_request():
+    async def test(client, app):
+        results = await asyncio.gather(*(fetch_summary(client) for _ in range(10)))
+        assert all(r == results[0] for r in results)
+        assert client.stats.requests == 1 and client.stats.coalesced == 9
+        assert app.state.store.stats['requests'] == 1
+        assert not client.inflight
+
+    run(test, latency_ms=50)
+
+
+def test_failed_fetch_is_shared_and_not_cached():
+    async def test(client, app):
+        results = await asyncio.gather(*(fetch_summary(client, 'missing') for _ in range(3)),
+                                       return_exceptions=True)
+        assert all(isinstance(r, httpx.HTTPStatusError) for r in results)
+        assert client.stats.requests == 1 and client.stats.errors == 1
+        assert not client.inflight and not client.cache
+        assert await client.get_game_details('missing') is None
+
+    run(test, latency_ms=20)
+
+
+def test_all_game_details_covers_the_live_games():
+    async def test(client, app):
+        details = await client.get_all_game_details()
+        assert set(details) == {'401547001', '401547002'}
+        assert all(d is not None and d['home_team'] for d in details.values())
+        assert len(await client.get_all_game_details(live_only=False)) == 3
+
+    run(test)
+
+
+def test_cancelled_leader_fails_its_coalesced_callers():
+    async def test(client, app):
+        leader = asyncio.create_task(fetch_summary(client))
+        await asyncio.sleep(0.01)
+        follower = asyncio.create_task(fetch_summary(client))
+        await asyncio.sleep(0.01)
+        assert client.stats.coalesced == 1
+        leader.cancel()
+        with pytest.raises(ConnectionError):
+            await asyncio.wait_for(follower, timeout=1.0)
+        assert leader.cancelled() and not client.inflight
+        # The next caller starts a fresh fetch
+        assert (await fetch_summary(client))['header']
+
+    run(test, latency_ms=200)
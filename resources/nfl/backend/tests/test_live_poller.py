@@ -0,0 +1,203 @@
+import asyncio
+import json
+
+import httpx
+
+from espn_fixture_server import create_app
+from live_client import AsyncLiveDataClient
+from live_poller import CHANGE_FIELDS, EvaluationScheduler, LivePoller, changed_fields
+
+LIVE_GAMES = {'401547001', '401547002'}
+
+STATE = {'down': 3, 'distance': 4, 'yard_line': 38, 'home_score': 14, 'away_score': 10,
+         'possession': 'SF', 'time_remaining': 1800, 'quarter': 3}
+
+
+def test_new_game_changes_every_field():
+    assert changed_fields(None, STATE) == list(CHANGE_FIELDS)
+
+
+def test_clock_movement_is_not_a_change():
+    assert changed_fields(STATE, {**STATE, 'time_remaining': 1795, 'quarter': 4}) == []
+
+
+def test_situation_changes_are_listed_in_field_order():
+    new = {**STATE, 'possession': 'DAL', 'down': 1, 'distance': 10}
+    assert changed_fields(STATE, new) == ['down', 'distance', 'possession']
+
+
+def run_poller(test):
+    """Run test(poller, store, batches) with a fixture-backed client and a recording evaluate"""
+    async def main():
+        app = create_app()
+        client = AsyncLiveDataClient(base_url='http://espn.test', ttl=0.0,
+                                     transport=httpx.ASGITransport(app=app))
+        batches = []
+
+        async def evaluate(states):
+            batches.append(states)
+            return [{'down': s['down']} for s in states]
+
+        poller = LivePoller(client, evaluate)
+        try:
+            await test(poller, app.state.store, batches)
+        finally:
+            await poller.stop()
+            await client.close()
+    asyncio.run(main())
+
+
+def edit(store, name, change):
+    doc = json.loads(store.docs[name])
+    change(doc)
+    store.put(name, doc)
+
+
+def drain(queue):
+    events = []
+    while not queue.empty():
+        events.append(queue.get_nowait())
+    return events
+
+
+def test_poller_publishes_only_situation_changes():
+    async def test(poller, store, batches):
+        everything = poller.subscribe()
+        await poller.poll_once()
+        events = drain(everything)
+        assert {e['game_id'] for e in events} == LIVE_GAMES
+        assert all(e['type'] == 'update' and e['changed'] == list(CHANGE_FIELDS) for e in events)
+        assert len(batches) == 1 and len(batches[0]) == 2
+
+        # Clock only: the snapshot follows the clock but nothing is evaluated or pushed
+        def tick(doc):
+            doc['header']['competitions'][0]['status']['displayClock'] = '0:01'
+        edit(store, 'summary_401547001', tick)
+        await poller.poll_once()
+        assert drain(everything) == [] and len(batches) == 1
+        assert poller.games['401547001'].state['time_remaining'] == poller.seen['401547001']['time_remaining']
+        assert poller.stats['unchanged'] == 2
+
+        # A new down: only that game is re-evaluated and published
+        one_game = poller.subscribe('401547001')
+        assert [e['type'] for e in drain(one_game)] == ['snapshot']
+
+        def first_down(doc):
+            doc['header']['competitions'][0]['situation'].update(distance=10, downDistanceText='1st & 10')
+        edit(store, 'summary_401547001', first_down)
+        await poller.poll_once()
+        events = drain(everything)
+        assert [(e['game_id'], e['seq']) for e in events] == [('401547001', 2)]
+        assert 'distance' in events[0]['changed']
+        assert drain(one_game) == events
+        assert [len(b) for b in batches] == [2, 1]
+
+    run_poller(test)
+
+
+def test_game_leaving_the_scoreboard_is_published_as_final():
+    async def test(poller, store, batches):
+        queue = poller.subscribe('401547002')
+        await poller.poll_once()
+        drain(queue)
+
+        def drop(doc):
+            doc['events'] = [e for e in doc['events'] if e['id'] != '401547002']
+        edit(store, 'scoreboard', drop)
+        await poller.poll_once()
+        assert [e['type'] for e in drain(queue)] == ['final']
+        assert '401547002' not in poller.games and '401547002' not in poller.seen
+
+    run_poller(test)
+
+
+def test_slow_subscriber_loses_its_oldest_events():
+    async def test(poller, store, batches):
+        queue = poller.subscribe('401547001')
+        for seq in range(queue.maxsize + 5):
+            poller.publish('401547001', {'seq': seq})
+        assert queue.full() and queue.get_nowait()['seq'] == 5
+        assert poller.stats['events_dropped'] == 5
+        poller.unsubscribe(queue, '401547001')
+        assert poller.summary()['subscribers'] == 0
+
+    run_poller(test)
+
+
+def make_scheduler(tracked=3, min_interval=0.0):
+    calls, results = [], []
+
+    async def evaluate(states):
+        calls.append([s['down'] for s in states])
+        return [{'down': s['down']} for s in states]
+
+    scheduler = EvaluationScheduler(evaluate, lambda *result: results.append(result), lambda: tracked, min_interval)
+    return scheduler, calls, results
+
+
+def test_resubmitting_a_pending_game_keeps_the_latest_state_and_every_change():
+    async def test():
+        scheduler, calls, results = make_scheduler()
+        scheduler.submit('a', {**STATE, 'down': 1}, ['down', 'distance'])
+        scheduler.submit('b', {**STATE, 'down': 2}, ['home_score'])
+        scheduler.submit('a', {**STATE, 'down': 3}, ['distance', 'possession'])
+        assert scheduler.stats['superseded'] == 1
+
+        await scheduler.tick()
+        assert calls == [[3, 2]]
+        assert [(g, s['down'], p, c) for g, s, p, c in results] == [
+            ('a', 3, {'down': 3}, ['down', 'distance', 'possession']),
+            ('b', 2, {'down': 2}, ['home_score']),
+        ]
+        summary = scheduler.summary()
+        assert summary['ticks'] == 1 and summary['rows'] == 2 and summary['pending'] == 0
+        assert summary['occupancy_mean'] == 2 / 3
+
+        # Nothing pending: no evaluation at all
+        await scheduler.tick()
+        assert len(calls) == 1
+
+    asyncio.run(test())
+
+
+def test_discarded_game_is_not_evaluated():
+    async def test():
+        scheduler, calls, results = make_scheduler()
+        scheduler.submit('a', STATE, ['down'])
+        scheduler.submit('b', STATE, ['down'])
+        scheduler.discard('a')
+        await scheduler.tick()
+        assert [g for g, *_ in results] == ['b']
+
+    asyncio.run(test())
+
+
+def test_running_scheduler_batches_updates_that_arrive_between_ticks():
+    async def test():
+        scheduler, calls, results = make_scheduler(min_interval=0.05)
+        scheduler.start()
+        try:
+            scheduler.submit('a', {**STATE, 'down': 1}, ['down'])
+            await asyncio.sleep(0.01)  # first tick runs at once, then waits min_interval
+            for game, down in (('a', 2), ('b', 3), ('c', 4)):
+                scheduler.submit(game, {**STATE, 'down': down}, ['down'])
+            await asyncio.sleep(0.1)
+        finally:
+            await scheduler.stop()
+        assert calls == [[1], [2, 3, 4]]
+        assert scheduler.summary()['max_batch'] == 3
+
+    asyncio.run(test())
+
+
+def test_results_for_games_that_ended_meanwhile_are_dropped():
+    async def test(poller, store, batches):
+        await poller.poll_once()
+        poller.scheduler.submit('401547002', poller.seen['401547002'], ['down'])
+        del poller.seen['401547002']
+        queue = poller.subscribe('401547002')
+        drain(queue)
+        await poller.scheduler.tick()
+        assert drain(queue) == []
+
+    run_poller(test)